@@ -3,7 +3,9 @@ from analysis.resultset import ResultSet
 from parsing.expressions.scalar_expression import TableIdentifierExpression
 from parsing.expressions.scalar_expression import ScalarExpression, ColumnIdentifierExpression
 from parsing.expressions.select_expression import SelectExpression
+from parsing.keywords import Keyword
 from parsing.tokenizer import Tokenizer
+from parsing.walker import find
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -100,7 +102,8 @@ class Tracer:
 
     def trace(self, column: str = None, column_index: int = None, resultset_index: int = None) -> 'ScalarExpression':
         self.resultsets: list[ResultSet] = []
-        for expression in self.block.expressions:
+        # Only SELECTs produce result sets, so only they need parsing.
+        for expression in self.block.statements(Keyword.SELECT):
             if expression.produces_resultset:
                 self.resultsets.append(expression)
         if len(self.resultsets) == 0:
@@ -127,8 +130,7 @@ class Tracer:
     def get_columns(self, resultset: ResultSet):
         columns_list = resultset.columns()
         columns = {}
-        for column in resultset.columns():
-            from parsing.expressions.scalar_expression import ScalarExpression
+        for column in columns_list:
             if isinstance(column, ScalarExpression) and column.has_name:
                 columns[column.get_name().lower()] = column
             else:
@@ -157,7 +159,12 @@ class Tracer:
             return identifier.uppercase()
         
     def find_temp_table(self, identifier: str):
-        for expression in self.block.expressions:
-            if isinstance(expression, SelectExpression) and expression.into != None:
-                if expression.into.dest.token.value.lower() == identifier.lower():
-                    return expression
\ No newline at end of file
+        # SELECT ... INTO can be nested in blocks; no other statement holds one.
+        if self.block.index is not None:
+            return next((select for select in self.block.index.references(identifier) if isinstance(select, SelectExpression)), None)
+        identifier = identifier.lower()
+        for statement in self.block.statements(Keyword.SELECT, Keyword.BEGIN, Keyword.IF, Keyword.WHILE):
+            select = find(statement, SelectExpression,
+                lambda select: select.into is not None and select.into.dest.token.value.lower() == identifier)
+            if select is not None:
+                return select
\ No newline at end of file
@@ -0,0 +1,128 @@
+import random
+
+# Deterministic synthetic T-SQL for the benchmarks. Every workload sticks to
+# the syntax the parser handles today, so the same corpus can be tokenized,
+# parsed and rendered.
+
+TABLES = ['dbo.Customers', 'dbo.Orders', 'dbo.OrderLines', 'sales.Invoices', 'audit.Events']
+COLUMNS = ['Id', 'CustomerId', 'Name', 'Amount', 'Quantity', 'Status', 'CreatedOn', 'Region']
+WORDS = ['alpha', 'bravo', 'charlie', 'delta', 'echo', 'foxtrot', 'golf', 'hotel', 'india', 'juliet']
+
+def _value(rng: random.Random) -> str:
+    kind = rng.randrange(4)
+    if kind == 0:
+        return str(rng.randrange(1_000_000))
+    elif kind == 1:
+        return f'{rng.randrange(10_000)}.{rng.randrange(100):02}'
+    elif kind == 2:
+        return f"'{' '.join(rng.choices(WORDS, k=rng.randint(1, 4)))}'"
+    else:
+        return 'null'
+
+def _condition(rng: random.Random, depth: int) -> str:
+    if depth == 0:
+        column = rng.choice(COLUMNS)
+        operator = rng.choice(['=', '<>', '<', '>', '<=', '>=', '!='])
+        return f'{column} {operator} {_value(rng)}' if rng.randrange(5) else f'{column} is not null'
+    operator = rng.choice(['and', 'or'])
+    return f'({_condition(rng, depth - 1)} {operator} {_condition(rng, depth - 1)})'
+
+def _case(rng: random.Random, depth: int) -> str:
+    if depth == 0:
+        return _value(rng)
+    return f'case when {_condition(rng, 2)} then {_case(rng, depth - 1)} else {_value(rng)} end'
+
+def inserts(rng: random.Random, statements: int) -> str:
+    # A seed data file: one INSERT ... VALUES per row.
+    lines = []
+    for i in range(statements):
+        table = TABLES[i % len(TABLES)]
+        columns = rng.sample(COLUMNS[1:], 4)
+        values = ', '.join(_value(rng) for _ in columns)
+        lines.append(f"insert into {table} (Id, {', '.join(columns)}) values ({i + 1}, {values})")
+    return '\n'.join(lines) + '\n'
+
+def expressions(rng: random.Random, statements: int) -> str:
+    # Deeply nested CASE expressions and boolean conditions.
+    lines = []
+    for _ in range(statements):
+        lines.append(
+            f'select {_case(rng, rng.randint(3, 6))} as Result, {rng.choice(COLUMNS)}\n'
+            f'from {rng.choice(TABLES)} t\n'
+            f'where {_condition(rng, rng.randint(2, 4))}'
+        )
+    return '\n'.join(lines) + '\n'
+
+def procedures(rng: random.Random, statements: int) -> str:
+    # One cursor loop procedure for every ten statements asked for.
+    blocks = []
+    for i in range(max(1, statements // 10)):
+        table = rng.choice(TABLES)
+        column = rng.choice(COLUMNS[1:])
+        blocks.append(
+            f'declare @id{i} int\n'
+            f'declare @total{i} int\n'
+            f'set @total{i} = 0\n'
+            f'declare cursor{i} cursor for select Id from {table} where {_condition(rng, 1)}\n'
+            f'open cursor{i}\n'
+            f'fetch next from cursor{i} into @id{i}\n'
+            f'while @@fetch_status = 0\n'
+            f'begin\n'
+            f'    update {table} set {column} = {_value(rng)} where Id = @id{i}\n'
+            f'    set @total{i} = @total{i} + 1\n'
+            f'    fetch next from cursor{i} into @id{i}\n'
+            f'end\n'
+            f'close cursor{i}\n'
+            f'deallocate cursor{i}\n'
+        )
+    return 'go\n'.join(blocks)
+
+def comments(rng: random.Random, statements: int) -> str:
+    # More comment lines than code.
+    lines = []
+    for i in range(statements):
+        lines.append(f'update {rng.choice(TABLES)} -- {" ".join(rng.choices(WORDS, k=6))}')
+        lines.append(f'set {rng.choice(COLUMNS[1:])} = {_value(rng)} -- {" ".join(rng.choices(WORDS, k=4))}')
+        for _ in range(rng.randint(1, 4)):
+            lines.append(f'-- {" ".join(rng.choices(WORDS, k=rng.randint(3, 12)))}')
+        lines.append(f'where Id = {i + 1}')
+        lines.append('--' + '-' * rng.randint(20, 78))
+    return '\n'.join(lines) + '\n'
+
+def strings(rng: random.Random, statements: int) -> str:
+    # Long string literals, as in stored HTML, JSON or generated messages.
+    lines = []
+    for i in range(statements):
+        text = ' '.join(rng.choices(WORDS, k=rng.randint(100, 1000)))
+        lines.append(f'declare @text{i} varchar(8000)')
+        lines.append(f"set @text{i} = '{text}'")
+    return '\n'.join(lines) + '\n'
+
+WORKLOADS = {
+    'inserts': inserts,
+    'expressions': expressions,
+    'procedures': procedures,
+    'comments': comments,
+    'strings': strings,
+}
+
+def generate(workload: str, statements: int, seed: int=0) -> str:
+    return WORKLOADS[workload](random.Random(seed), statements)
+
+# Stress workloads: one statement nested depth levels deep, the way generated
+# reporting SQL nests, to check that depth is bounded by memory alone.
+
+def nested_parentheses(depth: int) -> str:
+    return f"select {'(' * depth}Amount + 1{')' * depth} as Total from dbo.Orders\n"
+
+def nested_case(depth: int) -> str:
+    return f"select {'case when Status = 1 then ' * depth}Amount{' else 0 end' * depth} as Total from dbo.Orders\n"
+
+def nested_blocks(depth: int) -> str:
+    return f"{'if @id > 0\nbegin\n' * depth}set @id = @id - 1\n{'end\n' * depth}"
+
+DEEP_WORKLOADS = {
+    'parentheses': nested_parentheses,
+    'case': nested_case,
+    'blocks': nested_blocks,
+}
@@ -0,0 +1,128 @@
+import argparse
+import json
+import time
+import tracemalloc
+from typing import Callable
+from benchmarks.corpus import DEEP_WORKLOADS, WORKLOADS, generate
+from formatting import UpperCaseFormatter
+from parsing.expressions.clause import Clause
+from parsing.parser import Parser
+from parsing.tokenizer import Tokenizer
+
+# Measures the three stages of the parsing stack separately, and casing from
+# tokens alone (format) for comparison with the last of them:
+#
+#   python -m benchmarks.run --statements 5000 --json
+#   python -m benchmarks.run --depth 10000
+#
+# Times are the best of --repeat runs; peak memory is taken from a separate
+# run under tracemalloc, which would otherwise slow the timed runs down.
+# Retained memory is what the tokens and the tree still hold once parsing is
+# done, reported per token.
+
+def measure(stage: Callable[[object], object], repeat: int, setup: Callable[[], object]=lambda: None) -> tuple[float, int]:
+    # setup runs outside the measurement; its result is passed to stage.
+    best = float('inf')
+    for _ in range(repeat):
+        argument = setup()
+        start = time.perf_counter()
+        stage(argument)
+        best = min(best, time.perf_counter() - start)
+    argument = setup()
+    tracemalloc.start()
+    try:
+        stage(argument)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+def retained(build: Callable[[], object]) -> int:
+    # Bytes still allocated when build returns, while its result is alive.
+    tracemalloc.start()
+    try:
+        result = build()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return current
+
+def benchmark(workload: str, sql: str, repeat: int, regex: bool) -> dict:
+    tokens = Tokenizer(sql, regex=regex).parse()
+    block = Parser(tokens).parse()
+    # Whitespace between statements is kept as bare clauses.
+    count = sum(type(expression) is not Clause for expression in block.expressions)
+    # The parser retypes the tokens it reads, so each parse gets a fresh list.
+    stages = {
+        'tokenizer': (lambda _: Tokenizer(sql, regex=regex).parse(), lambda: None),
+        'parser': (lambda tokens: Parser(tokens).parse(), lambda: Tokenizer(sql, regex=regex).parse()),
+        'uppercase': (lambda _: block.uppercase(), lambda: None),
+        'format': (lambda _: UpperCaseFormatter().format(sql), lambda: None),
+    }
+    result = {
+        'workload': workload,
+        'characters': len(sql),
+        'tokens': len(tokens),
+        'statements': count,
+        'stages': {},
+    }
+    tree = retained(lambda: Parser(Tokenizer(sql, regex=regex).parse()).parse())
+    result['retained_memory_bytes'] = tree
+    result['bytes_per_token'] = tree / len(tokens)
+    for name, (stage, setup) in stages.items():
+        seconds, peak = measure(stage, repeat, setup)
+        result['stages'][name] = {
+            'seconds': seconds,
+            'tokens_per_second': len(tokens) / seconds,
+            'statements_per_second': count / seconds,
+            'peak_memory_bytes': peak,
+        }
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the tokenizer, parser, uppercase renderer and token-level formatter on synthetic T-SQL.')
+    parser.add_argument('-w', '--workload', action='append', choices=list(WORKLOADS) + list(DEEP_WORKLOADS), dest='workloads',
+        help='Workload to run (default: all); may be given more than once')
+    parser.add_argument('-n', '--statements', type=int, default=2000, help='Statements per workload (default: 2000)')
+    parser.add_argument('-d', '--depth', type=int, default=None,
+        help='Run the nesting stress workloads at this depth instead (e.g. 10000)')
+    parser.add_argument('-s', '--seed', type=int, default=0, help='Seed for the corpus generator (default: 0)')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='Timed runs per stage; the best is reported (default: 3)')
+    parser.add_argument('--char-engine', action='store_false', dest='regex', help='Tokenize with the character engine')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    available = DEEP_WORKLOADS if args.depth is not None else WORKLOADS
+    for workload in args.workloads or []:
+        if workload not in available:
+            parser.error(f"workload '{workload}' needs {'no ' if args.depth is not None else ''}--depth")
+    if args.depth is not None:
+        workloads = args.workloads or DEEP_WORKLOADS
+        corpus = {workload: DEEP_WORKLOADS[workload](args.depth) for workload in workloads}
+    else:
+        workloads = args.workloads or WORKLOADS
+        corpus = {workload: generate(workload, args.statements, args.seed) for workload in workloads}
+    results = [benchmark(workload, sql, args.repeat, args.regex) for workload, sql in corpus.items()]
+    if args.json:
+        print(json.dumps({
+            'statements': args.statements,
+            'depth': args.depth,
+            'seed': args.seed,
+            'regex': args.regex,
+            'results': results
+        }, indent=2))
+        return
+    print(f"{'workload':<12} {'stage':<10} {'tokens/s':>12} {'statements/s':>13} {'peak MiB':>9}")
+    for result in results:
+        for name, stage in result['stages'].items():
+            print(f"{result['workload']:<12} {name:<10} {stage['tokens_per_second']:>12,.0f} "
+                f"{stage['statements_per_second']:>13,.0f} {stage['peak_memory_bytes'] / (1 << 20):>9.2f}")
+    print()
+    print(f"{'workload':<12} {'tokens':>10} {'retained MiB':>13} {'bytes/token':>12}")
+    for result in results:
+        print(f"{result['workload']:<12} {result['tokens']:>10,} "
+            f"{result['retained_memory_bytes'] / (1 << 20):>13.2f} {result['bytes_per_token']:>12,.0f}")
+
+if __name__ == '__main__':
+    main()
@@ -1,50 +1,311 @@
+import glob
+import hashlib
+import os
+import shutil
+import tempfile
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, TextIO
+from parsing.cache import parser_version
+from parsing.expressions.clause import Clause
+from parsing.parser import Parser
 from parsing.tokenizer import Tokenizer, Token
 
-KEYWORDS = [
-    'WHEN',
-    'MAX',
-    'PROGRAMS',
-    'LEN',
-    'GROUP',
-    'BY',
-    'DATE',
-    'SUBSTRING',
-    'GETDATE',
-    '1',
-    'DISTINCT',
-    'NAME',
-    'REPLACE',
-    'NVARCHAR',
-    'ON',
-    'USE',
-    'THEN',
-    'WHERE',
-    'RIGHT',
-    'OR',
-    'AS',
-    'DECLARE',
-    'FROM',
-    'CONCAT',
-    'JOIN',
-    'AND',
-    'FORMAT',
-    'INSERT',
-    'TABLE',
-    'INTO',
-    'SELECT',
-    'END',
-    'CAST',
-    'CASE',
-    'IN',
-]
-
-class UpperCaseFormatter:
+# Casing a script from its tokens alone, without parsing it, so any script can
+# be cased however much of it the parser understands. Only words the table
+# below calls keywords change case; identifiers, strings, variables and
+# comments are kept as written.
+#
+# A word's class says when it is a keyword:
+#
+#   RESERVED    always, unless it names a member (o.[key], next to a '.')
+#   FUNCTION    when it is called: max(...), getdate()
+#   TYPE        where a type is declared: after a variable, AS or a column name
+#   CONTEXTUAL  after one of the words in AFTER: FETCH NEXT, CROSS APPLY
+#
+# Words that need more context than that to tell from identifiers are not in
+# the table, and are cased by the parser (uppercase --parse) if at all.
+
+RESERVED = 'RESERVED'
+FUNCTION = 'FUNCTION'
+TYPE = 'TYPE'
+CONTEXTUAL = 'CONTEXTUAL'
+
+KEYWORDS: dict[str, str] = {}
+
+KEYWORDS.update((word, RESERVED) for word in '''
+    add all alter and any as asc authorization backup begin between break browse
+    bulk by cascade case check checkpoint close clustered coalesce collate column
+    commit compute constraint contains containstable continue convert create cross
+    current current_date current_time current_timestamp current_user cursor
+    database dbcc deallocate declare default delete deny desc disk distinct
+    distributed double drop dump else end errlvl escape except exec execute exists
+    exit external fetch file fillfactor for foreign freetext freetexttable from
+    full function go goto grant group having holdlock identity identity_insert
+    identitycol if in index inner insert intersect into is join key kill left like
+    lineno load merge national nocheck nonclustered not null nullif of off offsets
+    on open opendatasource openquery openrowset openxml option or order outer over
+    percent pivot plan precision primary print proc procedure public raiserror read
+    readtext reconfigure references replication restore restrict return revert
+    revoke right rollback rowcount rowguidcol rule save schema securityaudit select
+    session_user set setuser shutdown some statistics system_user table tablesample
+    textsize then to top tran transaction trigger truncate try_convert tsequal union
+    unique unpivot update updatetext use user values varying view waitfor when
+    where while with writetext
+'''.split())
+
+KEYWORDS.update((word, FUNCTION) for word in '''
+    abs avg cast ceiling charindex choose concat concat_ws count count_big dateadd
+    datediff datefromparts datename datepart day eomonth floor format getdate
+    getutcdate iif isnull isnumeric len lower ltrim min month newid
+    object_id patindex power rank replace replicate reverse round row_number rtrim
+    scope_identity sign space sqrt str string_agg stuff substring sum
+    sysdatetime trim try_cast upper year
+'''.split())
+
+KEYWORDS.update((word, TYPE) for word in '''
+    bigint binary bit char date datetime datetime2 datetimeoffset decimal float
+    geography geometry hierarchyid image int money nchar ntext numeric nvarchar
+    real rowversion smalldatetime smallint smallmoney sql_variant sysname text time
+    timestamp tinyint uniqueidentifier varbinary varchar xml
+'''.split())
+
+AFTER: dict[str, frozenset[str]] = {
+    'absolute': frozenset(['fetch']),
+    'apply': frozenset(['cross', 'outer']),
+    'catch': frozenset(['begin', 'end']),
+    'first': frozenset(['fetch']),
+    'last': frozenset(['fetch']),
+    'max': frozenset(['(']),
+    'next': frozenset(['fetch']),
+    'nocount': frozenset(['set']),
+    'prior': frozenset(['fetch']),
+    'relative': frozenset(['fetch']),
+    'try': frozenset(['begin', 'end']),
+}
+
+for word in AFTER:
+    KEYWORDS.setdefault(word, CONTEXTUAL)
+
+class CaseFormatter:
+    # Folds the keywords of a script with FOLD, at the speed of the tokenizer.
+
+    FOLD: Callable[[str], str] = None
+
     def format(self, sql: str) -> str:
-        tokens = Tokenizer(sql).parse()
-        formatted_sql = []
-        for token in tokens:
-            if token.type in (Token.WORD) and token.value.upper() in KEYWORDS:
-                formatted_sql.append(token.value.upper())
+        return ''.join(self._pieces(sql))
+
+    def write(self, sql: str, stream: TextIO):
+        stream.write(self.format(sql))
+
+    def _pieces(self, sql: str) -> list[str]:
+        tokens = list(Tokenizer(sql).scan())
+        fold = type(self).FOLD
+        pieces = []
+        # The significant token before the current one, and the one before that.
+        previous = before = None
+        for i, token in enumerate(tokens):
+            if token.type in Token.TRIVIA:
+                pieces.append(token.value)
+                continue
+            if token.type == Token.WORD and self._is_keyword(token, tokens, i, previous, before):
+                pieces.append(fold(token.value))
             else:
-                formatted_sql.append(token.value)
-        return ''.join(formatted_sql)
\ No newline at end of file
+                pieces.append(token.value)
+            previous, before = token, previous
+        return pieces
+
+    @staticmethod
+    def _is_keyword(token: Token, tokens: list[Token], i: int, previous: Token, before: Token) -> bool:
+        kind = KEYWORDS.get(token.lower)
+        if kind is None:
+            return False
+        following = next((token for token in tokens[i + 1:i + 8] if token.type not in Token.TRIVIA), None)
+        if (previous is not None and previous.value == '.') or (following is not None and following.value == '.'):
+            return False
+        if kind == RESERVED:
+            return True
+        called = following is not None and following.value == '('
+        if kind == FUNCTION:
+            return called
+        if kind == TYPE:
+            return called or previous is not None and (
+                previous.type == Token.VARIABLE
+                or previous.lower == 'as'
+                # A column definition: (Name type, or , Name type
+                or (previous.type in (Token.WORD, Token.QUOTED_IDENTIFIER) and KEYWORDS.get(previous.lower) is None
+                    and before is not None and before.value in ('(', ','))
+            )
+        if token.lower == 'max' and called:
+            return True
+        return previous is not None and previous.lower in AFTER[token.lower]
+
+class UpperCaseFormatter(CaseFormatter):
+    FOLD = str.upper
+
+class LowerCaseFormatter(CaseFormatter):
+    FOLD = str.lower
+
+FORMATTERS: dict[str, type[CaseFormatter]] = {
+    Clause.UPPERCASE: UpperCaseFormatter,
+    Clause.LOWERCASE: LowerCaseFormatter,
+}
+
+def format_sql(sql: str, casing: str, parse: bool=False) -> str:
+    # casing is Clause.UPPERCASE or Clause.LOWERCASE; with parse, the script
+    # is cased from its parse tree instead of its tokens.
+    if parse:
+        tokenizer = Tokenizer(sql, regex=True)
+        return getattr(Parser(tokenizer.parse(), tokenizer.lines).parse(), casing)()
+    return FORMATTERS[casing]().format(sql)
+
+# Files are read and written as they are: line endings are not translated, and
+# bytes that are not UTF-8 come back out unchanged.
+def read_sql(path: str) -> str:
+    with open(path, 'r', encoding='utf-8', errors='surrogateescape', newline='') as f:
+        return f.read()
+
+def write_sql(path: str, sql: str):
+    # Atomically: the file is either left alone or replaced whole.
+    directory = os.path.dirname(os.path.abspath(path))
+    with tempfile.NamedTemporaryFile('w', dir=directory, suffix='.tmp', delete=False,
+            encoding='utf-8', errors='surrogateescape', newline='') as f:
+        try:
+            f.write(sql)
+        except:
+            f.close()
+            os.unlink(f.name)
+            raise
+    if os.path.exists(path):
+        shutil.copymode(path, f.name)
+    else:
+        # Temporary files are private; a new file gets the usual mode.
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(f.name, 0o666 & ~umask)
+    os.replace(f.name, path)
+
+def expand(patterns: Iterable[str]) -> list[str]:
+    # Files named directly, the .sql files under directories, and the files
+    # globs match (** included), each once and in order.
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths.extend(sorted(str(path) for path in Path(pattern).rglob('*.sql') if path.is_file()))
+        elif any(char in pattern for char in '*?['):
+            paths.extend(sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path)))
+        else:
+            paths.append(pattern)
+    return list(dict.fromkeys(paths))
+
+def formatter_version() -> str:
+    # Formatting changes with this module or with the parser.
+    digest = hashlib.sha256(parser_version().encode())
+    digest.update(Path(__file__).read_bytes())
+    return digest.hexdigest()
+
+def content_key(salt: str, sql: bytes) -> str:
+    digest = hashlib.sha256(salt.encode())
+    digest.update(sql)
+    return digest.hexdigest()
+
+class FormatCache:
+    # Hashes of file contents that are already formatted, so a run over files
+    # that have not changed since the last one reads each of them once and
+    # formats none. Keys cover the casing and the formatter's own version.
+
+    FILE = 'formatted'
+    # Past this many keys, only those seen by the latest run are kept.
+    LIMIT = 1 << 18
+
+    def __init__(self, directory: str, casing: str, parse: bool=False, version: str=None):
+        self.path = Path(directory) / FormatCache.FILE
+        self.salt = f'{version or formatter_version()}:{casing}:{parse}'
+        self.seen: set[str] = set()
+        try:
+            self.keys = set(self.path.read_text().split())
+        except Exception:
+            self.keys = set()
+
+    def key(self, sql: bytes) -> str:
+        return content_key(self.salt, sql)
+
+    def __contains__(self, key: str) -> bool:
+        if key in self.keys:
+            self.seen.add(key)
+            return True
+        return False
+
+    def add(self, key: str):
+        self.keys.add(key)
+        self.seen.add(key)
+
+    def save(self):
+        keys = self.keys if len(self.keys) <= FormatCache.LIMIT else self.seen
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile('w', dir=self.path.parent, suffix='.tmp', delete=False) as f:
+            f.write(''.join(f'{key}\n' for key in keys))
+        os.replace(f.name, self.path)
+
+def _format_file(job: tuple[str, str, bool, bool, str | None]) -> tuple[str, bool, str | None, str | None]:
+    # (path, changed, key of the content the file is left with if it is
+    # formatted, error). Runs in the pool, so it takes and returns plain values.
+    path, casing, parse, write, salt = job
+    try:
+        sql = read_sql(path)
+        formatted = format_sql(sql, casing, parse)
+        changed = formatted != sql
+        if changed and write:
+            write_sql(path, formatted)
+    except Exception as e:
+        return path, False, None, f'{type(e).__name__}: {e}'
+    key = None
+    if salt is not None and (write or not changed):
+        key = content_key(salt, formatted.encode('utf-8', 'surrogateescape'))
+    return path, changed, key, None
+
+class FileFormatter:
+    # Cases many files at once, in a process pool.
+
+    def __init__(self, casing: str, parse: bool=False, jobs: int=None, executor: Executor=None, cache: FormatCache=None):
+        self.casing = casing
+        self.parse = parse
+        self.jobs = jobs or os.cpu_count() or 1
+        self.executor = executor
+        self.cache = cache
+
+    def run(self, paths: list[str], write: bool=False) -> tuple[list[str], list[tuple[str, str]]]:
+        # The files that were changed (or, without write, would be) and the
+        # (file, error) of those that could not be formatted, both in order.
+        cache = self.cache
+        pending = []
+        for path in paths:
+            try:
+                if cache is not None and cache.key(Path(path).read_bytes()) in cache:
+                    continue
+            except OSError:
+                pass
+            pending.append(path)
+        jobs = [(path, self.casing, self.parse, write, cache and cache.salt) for path in pending]
+        if self.executor is not None:
+            results = list(self.executor.map(_format_file, jobs))
+        elif self.jobs == 1 or len(jobs) < 2:
+            results = list(map(_format_file, jobs))
+        else:
+            workers = min(self.jobs, len(jobs))
+            # Batches of files per task: thousands of small files would
+            # otherwise cost more in messages than in formatting.
+            with ProcessPoolExecutor(workers) as executor:
+                results = list(executor.map(_format_file, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+        changed, errors = [], []
+        for path, was_changed, key, error in results:
+            if error is not None:
+                errors.append((path, error))
+                continue
+            if was_changed:
+                changed.append(path)
+            if cache is not None and key is not None:
+                cache.add(key)
+        if cache is not None:
+            cache.save()
+        return changed, errors
@@ -1,12 +1,14 @@
 import argparse
 import json
+import sys
 from analysis.tracer import Tracer
 import analysis.dataservice
 from db_conn import DbConn
+from formatting import FileFormatter, FormatCache, expand, format_sql, read_sql, write_sql
 from scripting.dataservice import DataService
 from scripting.node import Builder
-from parsing.parser import Parser
-from parsing.tokenizer import Tokenizer
+from parsing.cache import ParseCache, parse_sql
+from parsing.expressions.clause import Clause
 from scripting.delete_scripter import DeleteScripter
 from scripting.insert_scripter import InsertScripter
 
@@ -19,6 +21,45 @@ def get_sql_connection(db_name) -> DbConn:
     # Return pyodbc connection
     return pyodbc.connect(conn_str)
 
+def parse_file(path: str, jobs: int=None, cache_dir: str=None, lazy: bool=False):
+    sql = open(path, 'r').read()
+    return parse_sql(sql, jobs, lazy, ParseCache(cache_dir) if cache_dir else None)
+
+def case_files(parser: argparse.ArgumentParser, args: argparse.Namespace) -> int:
+    casing = Clause.UPPERCASE if args.action == 'uppercase' else Clause.LOWERCASE
+    paths = expand(args.files)
+    if not paths:
+        parser.error('no files to format')
+    if args.check and args.in_place:
+        parser.error('--check and --in-place cannot be used together')
+    if args.check or args.in_place:
+        if args.output:
+            parser.error('-o/--output cannot be used with --check or --in-place')
+        cache = FormatCache(args.cache_dir, casing, args.parse) if args.cache_dir else None
+        changed, errors = FileFormatter(casing, args.parse, args.jobs, cache=cache).run(paths, write=args.in_place)
+        for path in changed:
+            print(f"{'reformatted' if args.in_place else 'would reformat'} {path}")
+        for path, error in errors:
+            print(f"error: {path}: {error}", file=sys.stderr)
+        return 1 if errors or (args.check and changed) else 0
+
+    if len(paths) != 1:
+        parser.error('several files need --check or --in-place')
+    if args.parse:
+        block = parse_file(paths[0], args.jobs, args.cache_dir)
+        if args.output:
+            write_sql(args.output, getattr(block, casing)())
+        else:
+            block.write(sys.stdout, casing)
+            print()
+    else:
+        formatted = format_sql(read_sql(paths[0]), casing)
+        if args.output:
+            write_sql(args.output, formatted)
+        else:
+            print(formatted)
+    return 0
+
 def main():
     parser = argparse.ArgumentParser(description='Generate SQL scripts for inserting or deleting rows with related data.')
     subparsers = parser.add_subparsers(dest='action')
@@ -43,13 +84,20 @@ def main():
         dest='reference_tables')
     delete_parser.add_argument('-t', '--transaction', action='store_true', help='Wrap delete statements in a transaction')
 
-    uppercase_parser = subparsers.add_parser('uppercase')
-    uppercase_parser.add_argument('file', help='Input SQL file')
-    uppercase_parser.add_argument('-o', '--output', help='Output SQL file (optional)', default=None)
-
-    lowercase_parser = subparsers.add_parser('lowercase')
-    lowercase_parser.add_argument('file', help='Input SQL file')
-    lowercase_parser.add_argument('-o', '--output', help='Output SQL file (optional)', default=None)
+    for action in ('uppercase', 'lowercase'):
+        case_parser = subparsers.add_parser(action)
+        case_parser.add_argument('files', nargs='+', metavar='file',
+            help='Input SQL files, directories (every .sql file under them) or globs')
+        case_parser.add_argument('-o', '--output', help='Output SQL file, for a single input (optional)', default=None)
+        case_parser.add_argument('--check', action='store_true',
+            help='Write nothing; list the files that would change, and exit 1 if there are any')
+        case_parser.add_argument('-i', '--in-place', action='store_true', dest='in_place', help='Rewrite the files that change')
+        case_parser.add_argument('--parse', action='store_true',
+            help='Parse each script and case it from the parse tree, instead of from its tokens alone')
+        case_parser.add_argument('-j', '--jobs',
+            help='Format files in parallel with this many processes (0: one per core); for a single file with --parse, parse its GO batches in parallel',
+            type=int, default=None)
+        case_parser.add_argument('--cache-dir', help='Directory to cache parsed and formatted files in (optional)', default=None, dest='cache_dir')
 
     query_parser = subparsers.add_parser('query')
     query_parser.add_argument('db_name', help='Name of the database to connect to')
@@ -65,13 +113,13 @@ def main():
         help='Connection string to trace views', 
         default=None,
         dest='connection_string')
+    trace_parser.add_argument('-j', '--jobs', help='Parse GO batches in parallel with this many processes (0: one per core)', type=int, default=None)
+    trace_parser.add_argument('--cache-dir', help='Directory to cache parsed files in (optional)', default=None, dest='cache_dir')
 
     args = parser.parse_args()
 
-    if args.action == 'uppercase':
-        tokens = Tokenizer(open(args.file, 'r').read()).parse()
-        output = Parser(tokens).parse()
-        print(output.uppercase())
+    if args.action in ['uppercase', 'lowercase']:
+        sys.exit(case_files(parser, args))
 
     elif args.action == 'query':
         conn = get_sql_connection(args.db_name)
@@ -91,11 +139,6 @@ def main():
         for _, definition in results:
             print(definition.replace('\r\n', '\n'))
 
-    elif args.action == 'lowercase':
-        tokens = Tokenizer(open(args.file, 'r').read()).parse()
-        output = Parser(tokens).parse()
-        print(output.lowercase())
-
     elif args.action in ['insert', 'delete']:
         conn = get_sql_connection(args.db_name)
         node = Builder(DataService(conn), args.reference_tables).build_node(args.schema, args.table_name, args.id)
@@ -106,9 +149,7 @@ def main():
         dataservice = None
         if args.connection_string:
             dataservice = analysis.dataservice.DataService(get_sql_connection(args.connection_string))
-        tokens = Tokenizer(open(args.file, 'r').read()).parse()
-        parser = Parser(tokens)
-        output = parser.parse()
+        output = parse_file(args.file, args.jobs, args.cache_dir, lazy=True)
         print(Tracer(output, dataservice).trace(args.column, args.column_index, args.result_set))
 
 if __name__ == "__main__":
@@ -0,0 +1,95 @@
+import functools
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from parsing.expressions.block_expression import STATEMENTS, BlockExpression
+from parsing.expressions.scalar_expression import FUNCTIONS
+from parsing.keywords import KEYWORD_IDS
+from parsing.parallel import ParallelParser
+from parsing.parser import Parser
+from parsing.tokenizer import Token, Tokenizer
+
+@functools.cache
+def source_version() -> str:
+    # A hash of the parsing package's own source, so that any change to the
+    # tokenizer or the expression classes invalidates every cached tree.
+    digest = hashlib.sha256()
+    root = Path(__file__).parent
+    for path in sorted(root.rglob('*.py')):
+        digest.update(path.relative_to(root).as_posix().encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+def parser_version() -> str:
+    # The source, and the keywords, statements and functions registered with
+    # it so far: registering one changes how the same script parses.
+    digest = hashlib.sha256(source_version().encode())
+    for word, keyword in sorted(KEYWORD_IDS.items()):
+        digest.update(f'{word}={keyword}\n'.encode())
+    for table in (STATEMENTS, FUNCTIONS):
+        for keyword, consume in sorted(table.items()):
+            digest.update(f'{keyword}={consume.__module__}.{consume.__qualname__}\n'.encode())
+    return digest.hexdigest()
+
+class ParseCache:
+
+    def __init__(self, directory: str, version: str=None):
+        self.directory = Path(directory)
+        self.version = version
+
+    def key(self, sql: str) -> str:
+        # Without a version of its own, the cache follows the registrations.
+        digest = hashlib.sha256((self.version or parser_version()).encode())
+        digest.update(sql.encode('utf-8', 'surrogatepass'))
+        return digest.hexdigest()
+
+    def path(self, sql: str) -> Path:
+        return self.directory / f'{self.key(sql)}.pickle'
+
+    def get(self, sql: str) -> tuple[list[Token] | None, BlockExpression] | None:
+        try:
+            with open(self.path(sql), 'rb') as f:
+                return pickle.load(f)
+        except Exception:
+            # Missing, truncated or otherwise unreadable: parse again.
+            return None
+
+    def put(self, sql: str, tokens: list[Token] | None, block: BlockExpression):
+        # Tokens and tree are pickled together so the tree keeps sharing the
+        # tokens; tokens is None when the tree was parsed without a token list.
+        # Pickling recurses once per level of the tree, so a deeply nested
+        # script may not pickle; it is then simply not cached.
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=self.directory, suffix='.tmp', delete=False) as f:
+            try:
+                pickle.dump((tokens, block), f, pickle.HIGHEST_PROTOCOL)
+            except BaseException as e:
+                f.close()
+                os.unlink(f.name)
+                if isinstance(e, (RecursionError, pickle.PicklingError)):
+                    return
+                raise
+        os.replace(f.name, self.path(sql))
+
+    def parse(self, sql: str, jobs: int=None) -> BlockExpression:
+        return parse_sql(sql, jobs, cache=self)
+
+def parse_sql(sql: str, jobs: int=None, lazy: bool=False, cache: ParseCache=None) -> BlockExpression:
+    # The tree of a script, from cache if it has one. Otherwise the script is
+    # parsed, its GO batches in parallel if jobs is not 1 (0: one per core),
+    # and cached. The cache keeps whole trees, so only an uncached parse is lazy.
+    if cache is not None:
+        cached = cache.get(sql)
+        if cached is not None:
+            return cached[1]
+    if jobs is not None and jobs != 1:
+        tokens, block = None, ParallelParser(sql, jobs or None).parse()
+    else:
+        tokenizer = Tokenizer(sql)
+        tokens = tokenizer.parse()
+        block = Parser(tokens, tokenizer.lines, lazy=lazy and cache is None).parse()
+    if cache is not None:
+        cache.put(sql, tokens, block)
+    return block
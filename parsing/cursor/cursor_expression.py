@@ -6,6 +6,7 @@ from parsing.reader import Reader
 from parsing.tokenizer import Token
 
 class FetchExpression(Clause):
+    __slots__ = ('cursor', 'next', 'variables')
 
     def __init__(self, fetch: TokenContext, _next: TokenContext, _from: TokenContext, cursor: TokenContext, into: TokenContext, variables: list[TokenContext]):
         super().__init__([fetch, _next, _from, cursor, into, *variables])
@@ -40,6 +41,7 @@ class FetchExpression(Clause):
         return FetchExpression(fetch, _next, _from, cursor, into, variables)
 
 class OpenExpression(Clause):
+    __slots__ = ('cursor',)
 
     def __init__(self, open: TokenContext, cursor: TokenContext):
         super().__init__([open, cursor])
@@ -53,6 +55,7 @@ class OpenExpression(Clause):
         )
 
 class CursorExpression(Clause):
+    __slots__ = ('cursor_name',)
 
     def __init__(
             self,
@@ -74,6 +77,7 @@ class CursorExpression(Clause):
         self.cursor_name = cursor_name
 
 class CloseCursorExpression(Clause):
+    __slots__ = ('cursor',)
 
     def __init__(self, close, cursor):
         super().__init__([close, cursor])
@@ -86,6 +90,7 @@ class CloseCursorExpression(Clause):
         return CloseCursorExpression(close, cursor)
 
 class DeallocateCursorExpression(Clause):
+    __slots__ = ('cursor',)
 
     def __init__(self, close, cursor):
         super().__init__([close, cursor])
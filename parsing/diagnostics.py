@@ -0,0 +1,15 @@
+class Diagnostic:
+
+    def __init__(self, message: str, line: int, column: int, context: str):
+        # line and column are one-based, or None when the tokens carry no offsets.
+        self.message = message
+        self.line = line
+        self.column = column
+        self.context = context
+
+    def __str__(self):
+        location = f"line {self.line}, column {self.column}" if self.line is not None else "unknown location"
+        return f"{location}: {self.message}\n{self.context}"
+
+    def __repr__(self):
+        return f"Diagnostic({self.line}, {self.column}, {self.message!r})"
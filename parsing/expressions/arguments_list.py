@@ -5,6 +5,7 @@ from parsing.reader import Reader
 from parsing.tokenizer import Token
 
 class ArgumentsListExpression(Clause):
+    __slots__ = ('arguments',)
 
     def __init__(self, open_parenthesis: TokenContext, comma_separated_arguments: list[TokenContext | Clause], closing_parenthesis: TokenContext):
         from parsing.expressions.scalar_expression import ScalarExpression
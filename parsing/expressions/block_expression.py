@@ -1,3 +1,4 @@
+from typing import Callable, Generator, Iterator
 from parsing.cursor.cursor_expression import CloseCursorExpression, CursorExpression, DeallocateCursorExpression, FetchExpression, OpenExpression
 from parsing.expressions.clause import Clause
 from parsing.expressions.datatype import DataTypeClause
@@ -11,76 +12,89 @@ from parsing.expressions.token_context import TokenContext
 from parsing.expressions.transactions import BeginTransactionExpression, CommitTransactionExpression
 from parsing.expressions.use_expression import UseExpression
 from parsing.expressions.while_expression import WhileExpression
+from parsing.keywords import Keyword, register_keyword
+from parsing.node_index import NodeIndex
 from parsing.reader import Reader
 from parsing.tokenizer import Token
 from parsing.update import UpdateExpression
 
 class BlockExpression(Clause):
+    __slots__ = ('expressions', 'index')
 
-    def __init__(self, expressions: list[Clause]):
+    def __init__(self, expressions: list[Clause], index: NodeIndex=None):
         super().__init__(expressions)
         self.expressions = expressions
+        self.index = index
 
     @staticmethod
-    def consume(reader: Reader):
+    def consume(reader: Reader, outermost: bool=False):
+        return reader.run(BlockExpression.steps(reader, outermost))
+
+    @staticmethod
+    def steps(reader: Reader, outermost: bool=False) -> Generator:
+        # Every block refers to the parse's index, if there is one; the
+        # outermost adds its statements to it, nested blocks and all.
         clauses: list[Clause|TokenContext] = []
-        while not reader.eof and reader.curr_value_lower != 'end':
-            if reader.curr.type in (Token.WHITESPACE, Token.NEWLINE):
+        index = reader.index
+        while not reader.eof and reader.curr_keyword != Keyword.END:
+            if reader.curr.type in (Token.WHITESPACE, Token.NEWLINE, Token.COMMENT):
                 clauses.append(Clause([reader.read()]))
                 continue
+            elif reader.diagnostics is None:
+                clauses.append((yield BlockExpression._consume_statement(reader)))
             else:
-                clauses.append(BlockExpression.consume_top_level_expression(reader))
+                start = reader.checkpoint()
+                try:
+                    clauses.append((yield BlockExpression._consume_statement(reader)))
+                except Exception as e:
+                    reader.diagnose(e)
+                    reader.restore(start)
+                    clauses.append(UnparsedExpression.consume(reader))
+            if outermost and index is not None:
+                # The statement is final here, whatever was backtracked over.
+                index.add(clauses[-1])
             if reader.curr_value_lower == ';':
                 clauses.append(reader.expect_symbol(';'))
-        return BlockExpression(clauses)
+        return BlockExpression(clauses, index)
     
+    @staticmethod
+    def scan(reader: Reader) -> 'BlockExpression':
+        # The block with its statements found but not parsed: each is parsed
+        # the first time it is read from expressions.
+        statements = StatementList(reader, reader.checkpoint())
+        statements.scan(statements.start)
+        return BlockExpression(statements)
+
+    def statements(self, *keywords: int) -> Iterator[Clause]:
+        # The block's statements, or only those starting with one of keywords.
+        # Statements of a scanned block are only parsed when they are yielded.
+        expressions = self.expressions
+        i = 0
+        while i < len(expressions):
+            entry = list.__getitem__(expressions, i)
+            keyword = entry.keyword if isinstance(entry, LazyStatement) else _first_keyword(entry)
+            if keyword is not None and (not keywords or keyword in keywords):
+                yield expressions[i]
+                # Reading a statement can move the scanned ones around it.
+                if list.__getitem__(expressions, i) is not entry:
+                    i = next((j for j, other in enumerate(list.__iter__(expressions)) if other is entry), i)
+            i += 1
+
     @staticmethod
     def consume_top_level_expression(reader: Reader):
-        if reader.curr.type == Token.WORD:
-            value = reader.curr_value_lower
-            if value == 'go':
-                return GoExpression.consume(reader)
-            elif value == 'use':
-                return UseExpression.consume(reader)
-            elif value == 'declare':
-                return BlockExpression._consume_declare(reader)
-            elif value == 'insert':
-                return InsertExpression.consume(reader)
-            elif value == 'select':
-                return SelectExpression.consume(reader)
-            elif value == 'begin':
-                pos = reader._position
-                reader.expect_word()
-                if reader.curr_value_lower in ('tran', 'transaction'):
-                    reader._position = pos
-                    return BeginTransactionExpression.consume(reader)
-                else:
-                    reader._position = pos
-                    return BeginEndBlock.consume(reader)
-            elif value == 'commit':
-                return CommitTransactionExpression.consume(reader)
-            elif value == 'close':
-                return CloseCursorExpression.consume(reader)
-            elif value == 'deallocate':
-                return DeallocateCursorExpression.consume(reader)
-            elif value == 'set':
-                return SetExpression.consume(reader)
-            elif value == 'while':
-                return WhileExpression.consume(reader)
-            elif value == 'open':
-                return OpenExpression.consume(reader)
-            elif value == 'fetch':
-                return FetchExpression.consume(reader)
-            elif value == 'update':
-                return UpdateExpression.consume(reader)
-            elif value == 'if':
-                return IfExpression.consume(reader)
-            elif value == 'delete':
-                return DeleteExpression.consume(reader)
-            else:
-                raise ValueError(f"Unexpected token '{reader.curr.__repr__()}'")
+        return reader.run(BlockExpression._consume_statement(reader))
+
+    def _consume_statement(reader: Reader) -> Clause | Generator:
+        consume = STATEMENTS.get(reader.curr_keyword) if reader.curr.type == Token.WORD else None
+        if consume is None:
+            raise ValueError(f"Unexpected token '{reader.curr.__repr__()}' at {reader.location()}")
+        return consume(reader)
+
+    def _consume_begin(reader: Reader):
+        if reader.peek_keyword() in (Keyword.TRAN, Keyword.TRANSACTION):
+            return BeginTransactionExpression.consume(reader)
         else:
-            raise ValueError(f"Unexpected token '{reader.curr.__repr__()}'")
+            return BeginEndBlock.steps(reader)
     
     def _consume_declare(reader: Reader):
         declare = reader.expect_word('declare')
@@ -104,7 +118,225 @@ class BlockExpression(Clause):
             datatype = DataTypeClause.consume(reader)
             return DeclareVariableExpression(declare, variable, as_token, datatype)
 
+def _first_keyword(entry: Clause | TokenContext) -> int | None:
+    # The keyword a statement starts with; None for whitespace and ';'.
+    if isinstance(entry, TokenContext) or type(entry) is Clause:
+        return None
+    while isinstance(entry, Clause):
+        entry = next((token for token in entry.tokens if token is not None), None)
+    if isinstance(entry, TokenContext):
+        entry = entry.token
+    return entry.keyword if isinstance(entry, Token) else None
+
+class LazyStatement:
+    # A statement found by the boundary scan: its first keyword and the span
+    # of tokens it covers, up to the next significant token after it.
+    __slots__ = ('keyword', 'start', 'end', 'expression')
+
+    def __init__(self, keyword: int, start: int, end: int):
+        self.keyword = keyword
+        self.start = start
+        self.end = end
+        self.expression: Clause = None
+
+class StatementList(list):
+    # The expressions of a scanned block. Statements are found with a scan of
+    # keywords and nesting alone and parsed when first read. The scan can be
+    # wrong (a column called OPEN, a statement registered later): a statement
+    # that does not end where the scan said is kept, and the rest of the block
+    # is scanned again from where it did end, which is what the ordinary parse
+    # would do. An error is only reported once the statements before it have
+    # been parsed, in order, and none after it.
+
+    # Statement keywords that carry on the statement before them, once.
+    CONTINUATIONS = {
+        Keyword.UPDATE: Keyword.SET,
+        Keyword.INSERT: Keyword.SELECT,
+    }
+
+    def __init__(self, reader: Reader, start: int):
+        super().__init__()
+        self.reader = reader
+        self.start = start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        entry = super().__getitem__(index)
+        while isinstance(entry, LazyStatement) and entry.expression is None:
+            self._parse(entry)
+            entry = super().__getitem__(index)
+        return entry.expression if isinstance(entry, LazyStatement) else entry
+
+    def __iter__(self):
+        i = 0
+        while i < len(self):
+            yield self[i]
+            i += 1
+
+    def scan(self, position: int, index: int=0, keep: bool=True):
+        # Scans from position to the end of the block, replacing the entries
+        # from index on. Statements found again keep their parse.
+        reader = self.reader
+        tokens = reader.tokens
+        kept = {(entry.start, entry.end): entry for entry in super().__getitem__(slice(index, None))
+            if isinstance(entry, LazyStatement)} if keep else {}
+        entries = []
+        reader.restore(position)
+        # Recovering, a stray END is a statement to skip rather than the end of the script.
+        while not reader.eof and (reader.curr_keyword != Keyword.END or reader.diagnostics is not None):
+            if reader.curr.type in Token.TRIVIA:
+                entries.append(Clause([reader.read()]))
+                continue
+            start = reader.checkpoint()
+            end = StatementList._statement_end(tokens, start)
+            entries.append(kept.pop((start, end), None) or LazyStatement(reader.curr_keyword, start, end))
+            reader.restore(end)
+            if reader.curr_value_lower == ';':
+                entries.append(reader.expect_symbol(';'))
+        # Tokens of the parses dropped may be read again.
+        for entry in kept.values():
+            if entry.expression is not None:
+                StatementList._retype(tokens, entry.start, entry.end)
+        super().__setitem__(slice(index, None), entries)
+
+    def _index(self, entry: LazyStatement) -> int:
+        return next(i for i, other in enumerate(super().__iter__()) if other is entry)
+
+    def _parse(self, entry: LazyStatement):
+        reader = self.reader
+        position = reader.checkpoint()
+        try:
+            reader.restore(entry.start)
+            try:
+                entry.expression = reader.run(BlockExpression._consume_statement(reader))
+            except Exception as e:
+                if not self._in_order(entry):
+                    self._parse_to(entry.start)
+                    return
+                StatementList._retype(reader.tokens, entry.start, max(entry.end, reader.checkpoint()))
+                if reader.diagnostics is None:
+                    raise ValueError(f"{reader.context(after=0)}\n{e}") from e
+                reader.diagnose(e, entry.start)
+                reader.restore(entry.start)
+                entry.expression = UnparsedExpression.consume(reader)
+            if reader.checkpoint() != entry.end:
+                entry.end = reader.checkpoint()
+                self.scan(entry.end, self._index(entry) + 1)
+        finally:
+            reader.restore(position)
+
+    def _in_order(self, entry: LazyStatement) -> bool:
+        # Whether entry is the first statement not yet parsed.
+        parsed = True
+        for other in super().__iter__():
+            if isinstance(other, LazyStatement):
+                if other is entry:
+                    parsed = False
+                elif (other.expression is not None) != parsed:
+                    return False
+        return True
+
+    def _parse_to(self, position: int):
+        # Starts again from the top of the block, discarding every parse, and
+        # parses statements in order until the one at position.
+        tokens = self.reader.tokens
+        StatementList._retype(tokens, self.start, len(tokens))
+        self.scan(self.start, keep=False)
+        i = 0
+        while i < len(self):
+            entry = super().__getitem__(i)
+            if isinstance(entry, LazyStatement):
+                if entry.start >= position:
+                    break
+                self[i]
+            i += 1
+
+    @staticmethod
+    def _retype(tokens: list[Token], start: int, end: int):
+        # The parser retypes the words it reads; these tokens are to be read again.
+        for token in tokens[start:end]:
+            if token.type in (Token.KEYWORD, Token.IDENTIFIER):
+                token.type = Token.WORD
+
+    @staticmethod
+    def _significant(tokens: list[Token], position: int) -> int:
+        while position < len(tokens) and tokens[position].type in Token.TRIVIA:
+            position += 1
+        return position
+
+    @staticmethod
+    def _statement_end(tokens: list[Token], position: int) -> int:
+        # IF and WHILE own the statement after their condition, and IF the one
+        # after ELSE too; a stack of owners keeps long ELSE IF chains flat.
+        owners = []
+        while True:
+            keyword = tokens[position].keyword
+            if keyword in (Keyword.IF, Keyword.WHILE):
+                owners.append(keyword)
+                position = StatementList._skip(tokens, position + 1, Keyword.NONE)
+                if position >= len(tokens):
+                    return position
+                continue
+            position = StatementList._skip(tokens, position + 1, keyword)
+            while owners:
+                if owners.pop() == Keyword.IF and position < len(tokens) and tokens[position].keyword == Keyword.ELSE:
+                    position = StatementList._significant(tokens, position + 1)
+                    break
+            else:
+                return position
+            if position >= len(tokens):
+                return position
+
+    @staticmethod
+    def _skip(tokens: list[Token], position: int, keyword: int) -> int:
+        # Skips the rest of a statement that starts with keyword (NONE for an IF
+        # or WHILE condition), up to the next statement keyword, ';', ELSE or
+        # END outside parentheses and BEGIN/CASE ... END.
+        def opens_block(position: int) -> bool:
+            following = StatementList._significant(tokens, position + 1)
+            return following >= len(tokens) or tokens[following].keyword not in (Keyword.TRAN, Keyword.TRANSACTION)
+        block = keyword == Keyword.BEGIN and opens_block(position - 1)
+        depth = 1 if block else 0
+        parentheses = 0
+        continuation = StatementList.CONTINUATIONS.get(keyword)
+        previous = keyword
+        count = len(tokens)
+        while position < count:
+            token = tokens[position]
+            if token.type in Token.TRIVIA:
+                position += 1
+                continue
+            current = token.keyword
+            if token.type == Token.SYMBOL:
+                if token.value == '(':
+                    parentheses += 1
+                elif token.value == ')':
+                    parentheses -= 1
+                elif token.value == ';' and parentheses <= 0 and depth == 0:
+                    break
+            elif current == Keyword.CASE or (current == Keyword.BEGIN and depth > 0 and opens_block(position)):
+                depth += 1
+            elif current == Keyword.END:
+                if depth == 0:
+                    break
+                depth -= 1
+                if block and depth == 0:
+                    position += 1
+                    break
+            elif depth == 0 and parentheses <= 0:
+                if current == continuation:
+                    continuation = None
+                elif current == Keyword.SELECT and previous == Keyword.FOR:
+                    pass
+                elif current in STATEMENTS or current == Keyword.ELSE:
+                    break
+            previous = current
+            position += 1
+        return StatementList._significant(tokens, position)
+
 class GoExpression(Clause):
+    __slots__ = ()
 
     def __init__(self, go):
         super().__init__([go])
@@ -113,7 +345,36 @@ class GoExpression(Clause):
     def consume(reader: Reader):
         return GoExpression(reader.expect_word('go'))
 
+class UnparsedExpression(Clause):
+    # A statement the parser could not read, kept verbatim so the script still
+    # renders; the reason is in the reader's diagnostics.
+    __slots__ = ()
+
+    def __init__(self, tokens: list[Token]):
+        super().__init__(tokens)
+
+    def uppercase(self):
+        return str(self)
+
+    def lowercase(self):
+        return str(self)
+
+    @staticmethod
+    def consume(reader: Reader):
+        # Everything up to the next statement boundary: a ';' (included), GO,
+        # END or the keyword of a statement the parser knows.
+        tokens = [reader.read()]
+        while not reader.eof:
+            if reader.curr.type == Token.SYMBOL and reader.curr.value == ';':
+                tokens.append(reader.read())
+                break
+            if reader.curr.type == Token.WORD and (reader.curr_keyword == Keyword.END or reader.curr_keyword in STATEMENTS):
+                break
+            tokens.append(reader.read())
+        return UnparsedExpression(tokens)
+
 class IfExpression(Clause):
+    __slots__ = ('condition', 'conditional_expression', 'else_expression')
 
     def __init__(
             self, 
@@ -124,15 +385,22 @@ class IfExpression(Clause):
             else_expression: Clause
         ):
         super().__init__([_if, condition, conditional_expression, _else, else_expression])
+        self.condition = condition
+        self.conditional_expression = conditional_expression
+        self.else_expression = else_expression
 
     @staticmethod
     def consume(reader: Reader):
+        return reader.run(IfExpression.steps(reader))
+
+    @staticmethod
+    def steps(reader: Reader) -> Generator:
         _if = reader.expect_word('if')
         condition = BooleanExpression.consume(reader)
-        conditional_expression = BlockExpression.consume_top_level_expression(reader)
+        conditional_expression = yield BlockExpression._consume_statement(reader)
         if reader.curr_value_lower == 'else':
             _else = reader.expect_word('else')
-            else_expression = BlockExpression.consume_top_level_expression(reader)
+            else_expression = yield BlockExpression._consume_statement(reader)
         else:
             _else = None
             else_expression = None
@@ -142,6 +410,7 @@ class IfExpression(Clause):
 
 
 class BeginEndBlock(Clause):
+    __slots__ = ('block',)
 
     def __init__(self, begin: TokenContext, block: BlockExpression, end: TokenContext):
         super().__init__([begin, block, end])
@@ -149,8 +418,37 @@ class BeginEndBlock(Clause):
 
     @staticmethod
     def consume(reader: Reader):
+        return reader.run(BeginEndBlock.steps(reader))
+
+    @staticmethod
+    def steps(reader: Reader) -> Generator:
         return BeginEndBlock(
             reader.expect_word('begin'),
-            BlockExpression.consume(reader),
+            (yield BlockExpression.steps(reader)),
             reader.expect_word('end'),
-        )
\ No newline at end of file
+        )
+
+# Statement keyword -> consumer. Dispatch is a single lookup on the keyword id
+# the tokenizer already assigned, however many statements are registered. A
+# consumer returns either the statement or a generator of steps for Reader.run.
+STATEMENTS: dict[int, Callable[[Reader], Clause]] = {
+    Keyword.GO: GoExpression.consume,
+    Keyword.USE: UseExpression.consume,
+    Keyword.DECLARE: BlockExpression._consume_declare,
+    Keyword.INSERT: InsertExpression.consume,
+    Keyword.SELECT: SelectExpression.consume,
+    Keyword.BEGIN: BlockExpression._consume_begin,
+    Keyword.COMMIT: CommitTransactionExpression.consume,
+    Keyword.CLOSE: CloseCursorExpression.consume,
+    Keyword.DEALLOCATE: DeallocateCursorExpression.consume,
+    Keyword.SET: SetExpression.consume,
+    Keyword.WHILE: WhileExpression.steps,
+    Keyword.OPEN: OpenExpression.consume,
+    Keyword.FETCH: FetchExpression.consume,
+    Keyword.UPDATE: UpdateExpression.consume,
+    Keyword.IF: IfExpression.steps,
+    Keyword.DELETE: DeleteExpression.consume,
+}
+
+def register_statement(word: str, consume: Callable[[Reader], Clause]):
+    STATEMENTS[register_keyword(word)] = consume
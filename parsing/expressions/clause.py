@@ -1,28 +1,82 @@
 from parsing.expressions.token_context import TokenContext
-from typing import Self
+from typing import Self, TextIO
 
 class Clause:
+    # Trees hold a node for nearly every token, so nodes have slots rather
+    # than a __dict__; subclasses declare the attributes they add.
+    __slots__ = ('tokens', 'produces_resultset')
+
+    # Casing policies for write: the method each token is rendered with.
+    PRESERVE = '__str__'
+    UPPERCASE = 'uppercase'
+    LOWERCASE = 'lowercase'
+
+    # How each policy folds the tokens that do not keep their case.
+    FOLDS = {PRESERVE: None, UPPERCASE: str.upper, LOWERCASE: str.lower}
+
+    # Pieces of text buffered before they are written to a stream.
+    CHUNK = 4096
 
     def __init__(self, tokens: list[TokenContext | Self ]):
         self.tokens = tokens
         self.produces_resultset = False
     
     def __str__(self):
-        return ''.join(map(str, filter(lambda t: t is not None, self.tokens)))
+        return self._render('__str__')
     
     def uppercase(self) -> str:
-        try:
-            return ''.join(token.uppercase() for token in self.tokens if token != None)
-        except Exception as e:
-            print(self.__class__.__name__, 'exception.')
-            raise e
+        return self._render('uppercase')
 
     def lowercase(self) -> str:
-        try:
-            return ''.join(token.lowercase() for token in self.tokens if token != None)
-        except Exception as e:
-            print(self.__class__.__name__, 'exception.')
-            raise e
+        return self._render('lowercase')
+
+    def write(self, stream: TextIO, casing: str=PRESERVE):
+        # Renders straight to stream in one walk of the tree; the text is
+        # written in chunks as it goes and never held whole.
+        if getattr(type(self), casing) is not getattr(Clause, casing):
+            stream.write(getattr(self, casing)())
+        else:
+            self._render(casing, stream)
+
+    def _render(self, method: str, stream: TextIO=None) -> str | None:
+        # Walks the tree with an explicit stack, so rendering does not recurse
+        # however deeply clauses nest. Clauses that render themselves
+        # differently are asked to.
+        inherited = getattr(Clause, method)
+        chunk = Clause.CHUNK if stream is not None else -1
+        # TokenContexts, nearly every leaf, are rendered here piece by piece,
+        # the way their own methods would.
+        fold = Clause.FOLDS.get(method, inherited)
+        cased = TokenContext.CASED
+        parts = []
+        stack = [(self, iter(self.tokens))]
+        while stack:
+            clause, tokens = stack[-1]
+            for token in tokens:
+                if token is None:
+                    continue
+                if type(token) is TokenContext and fold is not inherited:
+                    leaf = token.token
+                    parts.append(leaf.render(leaf.value if fold is None or token.type in cased else fold(leaf.value)))
+                    for trivia in token.whitespace:
+                        parts.append(trivia.value if fold is not None else str(trivia))
+                elif isinstance(token, Clause) and getattr(type(token), method) is inherited:
+                    stack.append((token, iter(token.tokens)))
+                    break
+                else:
+                    try:
+                        parts.append(getattr(token, method)())
+                    except Exception as e:
+                        e.add_note(f'While rendering {clause.__class__.__name__}')
+                        raise
+                if len(parts) >= chunk > 0:
+                    stream.write(''.join(parts))
+                    parts.clear()
+            else:
+                stack.pop()
+        if stream is None:
+            return ''.join(parts)
+        stream.write(''.join(parts))
 
     def get_resultset(self):
         raise NotImplementedError()
\ No newline at end of file
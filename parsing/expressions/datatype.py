@@ -4,6 +4,7 @@ from parsing.reader import Reader
 from parsing.tokenizer import Token
 
 class TextDataTypeClause(Clause):
+    __slots__ = ('datatype', 'length', 'type')
     TEXT_TYPES = ('CHAR', 'NCHAR', 'VARCHAR', 'NVARCHAR', 'TEXT', 'NTEXT')
     def __init__(self, datatype: TokenContext, open_paren: TokenContext, length: TokenContext, close_paren: TokenContext):
         assert datatype.token.value.upper() in self.TEXT_TYPES
@@ -13,6 +14,7 @@ class TextDataTypeClause(Clause):
         self.type = 'text'
 
 class DataTypeClause(Clause):
+    __slots__ = ('datatype', 'type')
     def __init__(self, datatype: TokenContext):
         super().__init__([datatype])
         self.datatype = datatype
@@ -7,6 +7,7 @@ from parsing.tokenizer import Token
 
 
 class DeclareVariableExpression(Clause):
+    __slots__ = ('declare', 'variable', 'datatype')
     def __init__(self, declare: TokenContext, variable: TokenContext, as_token: TokenContext, datatype: Clause, end_of_statement: list[Token]):
         super().__init__([declare, variable, as_token, datatype] + end_of_statement)
         self.declare = declare
@@ -17,6 +18,7 @@ class DeclareVariableExpression(Clause):
         return f"DeclareClause(variable='{self.variable}', datatype='{self.datatype}')"
 
 class DefineTableExpression(Clause):
+    __slots__ = ('open_paren', 'columns', 'close_paren')
     def __init__(self, open_paren: TokenContext, columns: list[tuple[TokenContext, Clause]], close_paren: TokenContext):
         tokens: list[TokenContext] = [open_paren]
         for column in columns:
@@ -31,6 +33,7 @@ class DefineTableExpression(Clause):
         return reader.expect_word('')
 
 class DeclareTableVariableExpression(Clause):
+    __slots__ = ('name', 'table_definition')
     def __init__(self, 
         declare: TokenContext,
         name: TokenContext, 
@@ -46,6 +49,7 @@ class DeclareTableVariableExpression(Clause):
         return f"DeclareTableVariableClause(variable='{self.variable}', table_definition={self.table_definition})"
     
 class DeclareVariableExpression(Clause):
+    __slots__ = ('declare', 'variable', 'datatype')
     def __init__(self, declare: TokenContext, variable: TokenContext, as_token: TokenContext, datatype: Clause):
         super().__init__([declare, variable, as_token, datatype])
         self.declare = declare
@@ -67,6 +71,7 @@ class DeclareVariableExpression(Clause):
             return DeclareVariableExpression(declare, variable, as_token, datatype)
 
 class VariableExpression(Clause):
+    __slots__ = ('var',)
 
     def __init__(self, var):
         super().__init__([var])
@@ -77,6 +82,7 @@ class VariableExpression(Clause):
         return VariableExpression(reader.expect(Token.VARIABLE))
 
 class SetExpression(Clause):
+    __slots__ = ('variable_assignment',)
 
     def __init__(self, set, variable_assignment):
         super().__init__([set, variable_assignment])
@@ -4,6 +4,7 @@ from parsing.reader import Reader
 
 
 class DeleteExpression(Clause):
+    __slots__ = ('table', 'predicate')
 
     def __init__(self, delete, _from, table, where, predicate):
         super().__init__([delete, _from, table, where, predicate])
@@ -7,6 +7,7 @@ from parsing.reader import Reader
 from parsing.tokenizer import Token
 
 class InsertColumnsExpression(Clause):
+    __slots__ = ('columns',)
 
     def __init__(self, opening_parenthesis, comma_separated_columns, closing_parenthesis):
         super().__init__([opening_parenthesis] + comma_separated_columns + [closing_parenthesis])
@@ -14,24 +15,16 @@ class InsertColumnsExpression(Clause):
             token for i, token in enumerate(comma_separated_columns) if i % 2 == 0
         ]
 
-    def uppercase(self):
-        return ''.join(
-            str(token) if token in self.columns else token.uppercase() for token in self.tokens
-        )
-    
-    def lowercase(self):
-        return ''.join(
-            str(token) if token in self.columns else token.lowercase() for token in self.tokens
-        )
-
     @staticmethod
     def consume(reader: Reader):
         opening_parenthesis = reader.expect_symbol('(')
         comma_separated_columns = []
         while True:
-            comma_separated_columns.append(
-                reader.expect_any_of([Token.WORD, Token.QUOTED_IDENTIFIER])
-            )
+            column = reader.expect_any_of([Token.WORD, Token.QUOTED_IDENTIFIER])
+            # Column names keep their case.
+            if column.type == Token.WORD:
+                column.type = Token.IDENTIFIER
+            comma_separated_columns.append(column)
             if reader.curr_value_lower == ')':
                 return InsertColumnsExpression(
                     opening_parenthesis,
@@ -43,6 +36,7 @@ class InsertColumnsExpression(Clause):
 
 
 class InsertExpression(Clause):
+    __slots__ = ()
 
     def __init__(
             self,
@@ -1,16 +1,29 @@
 from parsing.expressions.arguments_list import ArgumentsListExpression
 from parsing.expressions.declare_expression import VariableExpression
 from parsing.tokenizer import Token
-from typing import Self
+from typing import Callable, Generator, Self
 from parsing.expressions.clause import Clause
 from parsing.expressions.datatype import DataTypeClause
 from parsing.expressions.token_context import TokenContext
+from parsing.keywords import Keyword, register_keyword
 from parsing.reader import Reader
 
+COMPARISON_OPERATORS = frozenset(['=', '!=', '<', '>', '<>', '<=', '>=', '!<', '!>'])
+
+# Binding powers, loosest first. NOT binds its operand up to (but not
+# including) AND; comparisons take an additive expression on either side.
+OR = 1
+AND = 2
+NOT = 3
+COMPARISON = 4
+ADDITIVE = 5
+MULTIPLICATIVE = 6
+
 class ScalarExpression(Clause):
+    __slots__ = ('type', 'has_name')
 
     def __init__(self, type: str, tokens: list[TokenContext|Clause]):
-        super().__init__(list(filter(lambda t: t, tokens)))
+        super().__init__(tokens)
         self.type = type
         self.has_name = False
 
@@ -24,166 +37,122 @@ class ScalarExpression(Clause):
         return self.__class__(*tokens)
 
     @staticmethod
-    def consume(reader: Reader):
-        return ScalarExpression.consume_possible_or(reader)
+    def consume(reader: Reader, binding_power: int=0):
+        return reader.run(ScalarExpression.steps(reader, binding_power))
 
     @staticmethod
-    def consume_possible_or(reader: Reader):
-        left = ScalarExpression.consume_possible_and(reader)
-        while reader.curr_value_lower == 'or':
-            left = BooleanOperationExpression(
-                left, 
-                BooleanOperatorExpression.consume(reader),
-                ScalarExpression.consume_possible_and(reader))
-        return left
-    
-    @staticmethod
-    def consume_possible_and(reader: Reader):
-        # Handle NOT at the beginning
-        _not = reader.consume_optional_word('not')
-        left = ScalarExpression.consume_possible_comparison(reader)
-        if _not:
-            left = NotExpression(_not, left)
-        while reader.curr_value_lower == 'and':
-            left = BooleanOperationExpression(
-                left, 
-                BooleanOperatorExpression.consume(reader),
-                ScalarExpression.consume_possible_comparison(reader))
-        return left
-
-    @staticmethod
-    def consume_possible_comparison(reader: Reader):
-        left = ScalarExpression.consume_possible_addition_or_subtraction(reader)
-        if reader.curr_value_lower == 'is':
-            left =  IsExpression(
-                left,
-                reader.expect_word('is'),
-                reader.consume_optional_word('not'),
-                ScalarExpression._consume(reader)
-            )
-        else: 
-            boolean_operator = reader.consume_symbol_from([
-                '=', '!=', '<', '>',
-                '<>', '<=', '>='
-            ])
-            if boolean_operator:
+    def steps(reader: Reader, binding_power: int=0) -> Generator:
+        # Precedence climbing: parse a prefix, then keep folding in infix
+        # operators that bind tighter than binding_power. Operands are yielded
+        # to Reader.run, so parentheses and CASE nest without recursing.
+        if reader.curr_keyword == Keyword.NOT:
+            _not = reader.expect_word('not')
+            left = NotExpression(_not, (yield ScalarExpression.steps(reader, NOT)))
+        else:
+            left = yield ScalarExpression._consume(reader)
+        while not reader.eof:
+            token = reader.curr
+            keyword = token.keyword
+            if keyword == Keyword.OR or keyword == Keyword.AND:
+                power = OR if keyword == Keyword.OR else AND
+                if power <= binding_power:
+                    break
                 left = BooleanOperationExpression(
                     left,
-                    BooleanOperatorExpression(boolean_operator),
-                    ScalarExpression.consume(reader)
-                )
-            elif reader.curr_value_lower in ['in', 'not', 'like']:
+                    BooleanOperatorExpression(reader.expect_word()),
+                    (yield ScalarExpression.steps(reader, power)))
+            elif token.type == Token.SYMBOL:
+                value = token.value
+                if value in ('+', '-', '*', '/'):
+                    power = ADDITIVE if value in ('+', '-') else MULTIPLICATIVE
+                    if power <= binding_power:
+                        break
+                    left = (AdditionSubtractionExpression if power == ADDITIVE else MultiplicationDivisionExpression)(
+                        left,
+                        reader.expect_symbol(value),
+                        (yield ScalarExpression.steps(reader, power)))
+                elif value[0] in '=<>!' and COMPARISON > binding_power:
+                    boolean_operator = reader.consume_symbol_from(COMPARISON_OPERATORS)
+                    if boolean_operator is None:
+                        break
+                    left = BooleanOperationExpression(
+                        left,
+                        BooleanOperatorExpression(boolean_operator),
+                        (yield ScalarExpression.steps(reader, COMPARISON)))
+                else:
+                    break
+            elif keyword in (Keyword.IS, Keyword.IN, Keyword.LIKE, Keyword.NOT) and COMPARISON > binding_power:
+                if keyword == Keyword.IS:
+                    left = IsExpression(
+                        left,
+                        reader.expect_word('is'),
+                        reader.consume_optional_word('not'),
+                        (yield ScalarExpression._consume(reader))
+                    )
+                    continue
+                if keyword == Keyword.NOT and reader.peek_keyword() not in (Keyword.IN, Keyword.LIKE):
+                    break
                 _not = reader.consume_optional_word('not')
-                if reader.curr_value_lower == 'in':
+                if reader.curr_keyword == Keyword.IN:
                     _in = reader.expect_word('in')
-                    pos = reader._position
-                    reader.expect_symbol('(')
-                    if reader.curr_value_lower == 'select':
-                        reader._position = pos
+                    if reader.at(Token.SYMBOL, '(') and reader.peek_keyword() == Keyword.SELECT:
                         expression = ParentheticalExpression.consume(reader)
                     else:
-                        reader._position = pos
                         expression = ArgumentsListExpression.consume(reader)
-                    left = InExpression(
-                        left,
-                        _not,
-                        _in,
-                        expression
-                    )
-                elif reader.curr_value_lower == 'like':
+                    left = InExpression(left, _not, _in, expression)
+                else:
                     left = LikeExpression(
                         left,
                         _not,
                         reader.expect_word('like'),
-                        ScalarExpression.consume(reader),
+                        (yield ScalarExpression.steps(reader, COMPARISON)),
                     )
-                elif _not != None:
-                        left = NotExpression(
-                            _not,
-                            ScalarExpression.consume_possible_and(reader)
-                        )
+            else:
+                break
         assert isinstance(left, ScalarExpression) \
             or isinstance(left, VariableExpression), \
                 f'Invalid expression: {left.__class__.__name__}'
         return left
-
-    @staticmethod
-    def consume_possible_addition_or_subtraction(reader: Reader) -> Self:
-        left = ScalarExpression._consume(reader)
-        while reader.curr_value_lower in ['+', '-']:
-            left =  AdditionSubtractionExpression(
-                left,
-                reader.expect_symbol(reader.curr_value_lower),
-                ScalarExpression._consume(reader)
-            )
-        return left
         
-    @classmethod
-    def _consume(cls, reader: Reader) -> Self:
+    @staticmethod
+    def _consume(reader: Reader) -> Generator:
         if reader.curr.type == Token.QUOTED_IDENTIFIER:
             if reader.curr_value_lower.startswith("["):
                 return ColumnIdentifierExpression.consume(reader)
             elif reader.curr_value_lower.startswith("'"):
                 return StringLiteralExpression.consume(reader)
         elif reader.curr.type == Token.WORD:
-            if reader.curr.value.lower() == 'cast':
-                return CastExpression.consume(reader)
-            elif reader.curr.value.lower() == 'concat':
-                return ConcatExpression.consume(reader)
-            elif reader.curr.value.lower() == 'right':
-                return RightExpression.consume(reader)
-            elif reader.curr.value.lower() == 'case':
-                return CaseExpression.consume(reader)
-            elif reader.curr.value.lower() == 'substring':
-                return SubstringExpression.consume(reader)
-            elif reader.curr_value_lower == 'len':
-                return LenExpression.consume(reader)
-            elif reader.curr_value_lower == 'replace':
-                return ReplaceExpression.consume(reader)
-            elif reader.curr_value_lower == 'format':
-                return FormatExpression.consume(reader)
-            elif reader.curr_value_lower == 'year':
-                return YearExpression.consume(reader)
-            elif reader.curr_value_lower == 'getdate':
-                return GetDateExpression.consume(reader)
-            elif reader.curr_value_lower == 'scope_identity':
-                return ScopeIdentityExpression.consume(reader)
-            elif reader.curr_value_lower == 'abs':
-                return AbsExpression.consume(reader)
-            elif reader.curr_value_lower == 'max':
-                return MaxExpression.consume(reader)
-            elif reader.curr_value_lower == 'object_id':
-                return ObjectIdExpression.consume(reader)
-            elif reader.curr_value_lower == 'isnull':
-                return IsNullExpression.consume(reader)
-            elif reader.curr_value_lower == 'exists':
-                return ExistsExpression.consume(reader)
-            else:
-                return ColumnIdentifierExpression.consume(reader)
+            return (yield FUNCTIONS.get(reader.curr_keyword, ColumnIdentifierExpression.consume)(reader))
         elif reader.curr.type == Token.NUMBER:
             return NumberLiteralExpression.consume(reader)
         elif reader.curr.type == Token.SYMBOL:
             if reader.curr_value_lower == '(':
-                return ParentheticalScalarExpression.consume(reader)
+                return ParentheticalScalarExpression((yield ParentheticalExpression.steps(reader)))
             if reader.curr_value_lower == '-':
-                return NegativeExpression.consume(reader)
+                return (yield NegativeExpression.steps(reader))
         elif reader.curr.type == Token.VARIABLE:
             return VariableExpression.consume(reader)
         raise ValueError(f'Invalid token type {reader.curr.type} ({reader.curr_value_lower})')
 
 class NegativeExpression(ScalarExpression):
+    __slots__ = ()
 
     def __init__(self, minus, expression):
         super().__init__('number', [minus, expression])
 
     @staticmethod
     def consume(reader: Reader):
+        return reader.run(NegativeExpression.steps(reader))
+
+    @staticmethod
+    def steps(reader: Reader) -> Generator:
         return NegativeExpression(
             reader.expect_symbol('-'),
-            ScalarExpression.consume(reader),
+            (yield ScalarExpression.steps(reader, MULTIPLICATIVE)),
         )
     
 class ScopeIdentityExpression(ScalarExpression):
+    __slots__ = ()
 
     def __init__(self, scope_identity, opening_parentheses, closing_parentheses):
         super().__init__('number', [scope_identity, opening_parentheses, closing_parentheses])
@@ -197,12 +166,14 @@ class ScopeIdentityExpression(ScalarExpression):
         )
     
 class NotExpression(ScalarExpression):
+    __slots__ = ('expression',)
 
     def __init__(self, _not, expression: ScalarExpression):
         super().__init__('boolean', [_not, expression])
         self.expression = expression
 
 class GetDateExpression(ScalarExpression):
+    __slots__ = ()
 
     def __init__(self, getdate, opening_parenthesis, closing_parenthesis):
         super().__init__('date', [getdate, opening_parenthesis, closing_parenthesis])
@@ -216,6 +187,7 @@ class GetDateExpression(ScalarExpression):
         )
 
 class ParentheticalExpression(Clause):
+    __slots__ = ('expression',)
 
     def __init__(self, opening_parenthesis, expression, closing_parenthesis):
         super().__init__([opening_parenthesis, expression, closing_parenthesis])
@@ -223,12 +195,16 @@ class ParentheticalExpression(Clause):
 
     @staticmethod
     def consume(reader: Reader):
+        return reader.run(ParentheticalExpression.steps(reader))
+
+    @staticmethod
+    def steps(reader: Reader) -> Generator:
         from parsing.expressions.select_expression import SelectExpression
         opening_parenthesis = reader.expect_symbol('(')
         if reader.curr_value_lower == 'select':
             expression = SelectExpression.consume(reader)
         else:
-            expression = ScalarExpression.consume(reader)
+            expression = yield ScalarExpression.steps(reader)
         return ParentheticalExpression(
             opening_parenthesis,
             expression,
@@ -236,6 +212,7 @@ class ParentheticalExpression(Clause):
         )
 
 class ParentheticalScalarExpression(ScalarExpression):
+    __slots__ = ('paranthetical_expression',)
 
     def __init__(self, paranthetical_expression: ParentheticalExpression):
         from parsing.expressions.select_expression import SelectExpression
@@ -264,6 +241,7 @@ class ParentheticalScalarExpression(ScalarExpression):
         )
 
 class YearExpression(ScalarExpression):
+    __slots__ = ('year',)
 
     def __init__(self, year: TokenContext, args: ArgumentsListExpression):
         super().__init__('number', [year, args])
@@ -276,6 +254,7 @@ class YearExpression(ScalarExpression):
         return YearExpression(year, args)
         
 class FormatExpression(ScalarExpression):
+    __slots__ = ('expression', 'format_string')
 
     def __init__(self, format: TokenContext, args: ArgumentsListExpression):
         super().__init__('text', [format, args])
@@ -288,6 +267,16 @@ class FormatExpression(ScalarExpression):
         return FormatExpression(format, args)
         
 class AdditionSubtractionExpression(ScalarExpression):
+    __slots__ = ('left', 'operator', 'right')
+
+    def __init__(self, left: ScalarExpression, operator: TokenContext, right: ScalarExpression):
+        super().__init__('number', [left, operator, right])
+        self.left = left
+        self.operator = operator
+        self.right = right
+
+class MultiplicationDivisionExpression(ScalarExpression):
+    __slots__ = ('left', 'operator', 'right')
 
     def __init__(self, left: ScalarExpression, operator: TokenContext, right: ScalarExpression):
         super().__init__('number', [left, operator, right])
@@ -296,6 +285,7 @@ class AdditionSubtractionExpression(ScalarExpression):
         self.right = right
 
 class LenExpression(ScalarExpression):
+    __slots__ = ()
     def __init__(self, len, open_paren: TokenContext, expression: ScalarExpression, closed_paren: TokenContext):
         super().__init__('number', [len, open_paren, expression, closed_paren])
 
@@ -308,6 +298,7 @@ class LenExpression(ScalarExpression):
         return LenExpression(len, open_paren, expression, closing_paren)
 
 class NumberLiteralExpression(ScalarExpression):
+    __slots__ = ('number',)
     def __init__(self, number: TokenContext):
         super().__init__('number', [number])
         self.number = number
@@ -317,6 +308,7 @@ class NumberLiteralExpression(ScalarExpression):
         return NumberLiteralExpression(reader.expect(Token.NUMBER))
     
 class StringLiteralExpression(ScalarExpression):
+    __slots__ = ()
 
     def __init__(self, string: TokenContext):
         super().__init__('text', [string])
@@ -326,6 +318,7 @@ class StringLiteralExpression(ScalarExpression):
         return StringLiteralExpression(reader.expect(Token.QUOTED_IDENTIFIER))
 
 class IdentifierExpression(ScalarExpression):
+    __slots__ = ()
 
     @classmethod
     def _consume_identifiers(cls, reader: Reader) -> Self:
@@ -348,6 +341,7 @@ class IdentifierExpression(ScalarExpression):
 
 
 class ColumnIdentifierExpression(ScalarExpression):
+    __slots__ = ('database', 'schema', 'table', 'column')
     def __init__(self, database, comma1, schema, comma2, table, comma3, column):
         super().__init__('any', [database, comma1, schema, comma2, table, comma3, column])
         self.database = database
@@ -363,11 +357,11 @@ class ColumnIdentifierExpression(ScalarExpression):
     def from_parts(database: TokenContext | None, schema: TokenContext | None, table: TokenContext | None, column: TokenContext) -> Self:
         return ColumnIdentifierExpression(
             database.strip() if database else None,
-            TokenContext(Token(Token.SYMBOL, '.'), []) if database else None,
+            TokenContext(Token(Token.SYMBOL, '.'), ()) if database else None,
             schema.strip() if schema else None,
-            TokenContext(Token(Token.SYMBOL, '.'), []) if schema else None,
+            TokenContext(Token(Token.SYMBOL, '.'), ()) if schema else None,
             table.strip() if table else None,
-            TokenContext(Token(Token.SYMBOL, '.'), []) if table else None,
+            TokenContext(Token(Token.SYMBOL, '.'), ()) if table else None,
             column.strip()
         )
 
@@ -396,6 +390,7 @@ class ColumnIdentifierExpression(ScalarExpression):
         return ColumnIdentifierExpression(*identifiers)
 
 class TableIdentifierExpression(Clause):
+    __slots__ = ('database', 'schema', 'table')
 
     def __init__(self, database: TokenContext | None, period1, schema: TokenContext | None, period2, table: TokenContext):
         super().__init__([database, period1, schema, period2, table])
@@ -433,6 +428,7 @@ class TableIdentifierExpression(Clause):
         return TableIdentifierExpression(*identifiers)
 
 class ReplaceExpression(ScalarExpression):
+    __slots__ = ('string', 'pattern', 'new_string')
     def __init__(self, replace: TokenContext, arguments: ArgumentsListExpression):
         super().__init__('text', [replace, arguments])
         [self.string, self.pattern, self.new_string] = arguments.arguments
@@ -445,6 +441,7 @@ class ReplaceExpression(ScalarExpression):
         return ReplaceExpression(replace, arguments)
 
 class RightExpression(ScalarExpression):
+    __slots__ = ('inner_expression',)
     def __init__(
         self,
         right: TokenContext,
@@ -468,6 +465,7 @@ class RightExpression(ScalarExpression):
         return RightExpression(right, open_parenthesis, inner_expression, comma, number, right_parenthesis)
 
 class CastExpression(ScalarExpression):
+    __slots__ = ('datatype', 'val')
     def __init__(
         self, 
         cast: TokenContext, 
@@ -493,6 +491,7 @@ class CastExpression(ScalarExpression):
         
 
 class ConcatExpression(ScalarExpression):
+    __slots__ = ('expressions',)
     def __init__(
         self,
         concat: TokenContext,
@@ -500,7 +499,7 @@ class ConcatExpression(ScalarExpression):
         comma_separated_expressions: list[TokenContext | ScalarExpression],
         closing_parenthesis: TokenContext
     ):
-        self.expressions: list[ScalarExpression] = filter(lambda e: e.value != 'comma',  comma_separated_expressions)
+        self.expressions: list[ScalarExpression] = [e for e in comma_separated_expressions if not isinstance(e, TokenContext)]
         super().__init__('text', [concat, open_parenthesis, *comma_separated_expressions, closing_parenthesis])
 
     @classmethod
@@ -517,11 +516,13 @@ class ConcatExpression(ScalarExpression):
                 return ConcatExpression(concat, open_parenthesis, terms, closing_parenthesis)
 
 class BooleanExpression(ScalarExpression):
+    __slots__ = ()
 
     def __init__(self, tokens):
         super().__init__('boolean', tokens)
 
 class IsExpression(BooleanExpression):
+    __slots__ = ('left', 'right', '_not')
 
     def __init__(self, left, _is, _not, right):
         super().__init__([left, _is, _not, right])
@@ -530,6 +531,7 @@ class IsExpression(BooleanExpression):
         self._not = _not
 
 class LikeExpression(ScalarExpression):
+    __slots__ = ('left', '_not', 'right')
 
     def __init__(self, left, _not, like, right):
         super().__init__('boolean', [left, _not, like, right])
@@ -538,6 +540,7 @@ class LikeExpression(ScalarExpression):
         self.right = right
 
 class InExpression(BooleanExpression):
+    __slots__ = ('val', '_in', 'args')
 
     def __init__(
             self, 
@@ -552,6 +555,7 @@ class InExpression(BooleanExpression):
         self.args = args
         
 class ExistsExpression(BooleanExpression):
+    __slots__ = ('nested_select',)
 
     def __init__(self, exists, nested_select):
         super().__init__([exists, nested_select])
@@ -565,6 +569,7 @@ class ExistsExpression(BooleanExpression):
         )
         
 class BooleanOperatorExpression(Clause):
+    __slots__ = ('operator',)
 
     def __init__(self, operator: TokenContext):
         super().__init__([operator])
@@ -572,16 +577,7 @@ class BooleanOperatorExpression(Clause):
 
     @staticmethod
     def consume(reader: Reader):
-        patterns = [
-            '=',
-            '>',
-            '<'
-            '<>',
-            '>=',
-            '<=',
-            '!=',
-        ]
-        match = reader.consume_symbol_from(patterns)
+        match = reader.consume_symbol_from(COMPARISON_OPERATORS)
         if match:
             return BooleanOperatorExpression(match)
         elif reader.curr_value_lower in ['and', 'or']:
@@ -591,6 +587,7 @@ class BooleanOperatorExpression(Clause):
         
         
 class BooleanOperationExpression(BooleanExpression):
+    __slots__ = ('left', 'operator', 'right')
 
     def __init__(self, left: ScalarExpression, operator: BooleanOperatorExpression, right: ScalarExpression):
         super().__init__([left, operator, right])
@@ -599,6 +596,7 @@ class BooleanOperationExpression(BooleanExpression):
         self.right = right
 
 class CaseWhenExpression(Clause):
+    __slots__ = ('predicate', 'result')
 
     def __init__(self, when: TokenContext, predicate: BooleanExpression, then: TokenContext, result: ScalarExpression):
         super().__init__([when, predicate, then, result])
@@ -607,14 +605,19 @@ class CaseWhenExpression(Clause):
 
     @classmethod
     def consume(cls, reader: Reader) -> Self:
-            when = reader.expect_word('when')
-            predicate = ScalarExpression.consume(reader)
-            assert predicate.type == 'boolean', "CASE WHEN predicate must be a boolean expression"
-            then = reader.expect_word('then')
-            result = ScalarExpression.consume(reader)
-            return CaseWhenExpression(when, predicate, then, result)
+        return reader.run(CaseWhenExpression.steps(reader))
+
+    @staticmethod
+    def steps(reader: Reader) -> Generator:
+        when = reader.expect_word('when')
+        predicate = yield ScalarExpression.steps(reader)
+        assert predicate.type == 'boolean', "CASE WHEN predicate must be a boolean expression"
+        then = reader.expect_word('then')
+        result = yield ScalarExpression.steps(reader)
+        return CaseWhenExpression(when, predicate, then, result)
 
 class DefaultCaseExpression(Clause):
+    __slots__ = ('result',)
 
     def __init__(self, default: TokenContext, result: ScalarExpression):
         super().__init__([default, result])
@@ -622,35 +625,44 @@ class DefaultCaseExpression(Clause):
 
     @staticmethod
     def consume(reader: Reader):
+        return reader.run(DefaultCaseExpression.steps(reader))
+
+    @staticmethod
+    def steps(reader: Reader) -> Generator:
         assert reader.curr_value_lower in ('else', 'default')
         return DefaultCaseExpression(
             reader.expect_word(),
-            ScalarExpression.consume(reader)
+            (yield ScalarExpression.steps(reader))
         )
 
 class CaseExpression(ScalarExpression):
+    __slots__ = ('cases', 'default')
 
     def __init__(self, case: TokenContext, cases: list[CaseWhenExpression], default: DefaultCaseExpression, end: TokenContext):
-        super().__init__(None, [case, *cases, end])
+        super().__init__(None, [case, *cases, default, end])
         self.cases = cases
         self.default = default
 
     @classmethod
     def consume(cls, reader: Reader) -> Self:
+        return reader.run(CaseExpression.steps(reader))
+
+    @staticmethod
+    def steps(reader: Reader) -> Generator:
         case = reader.expect_word('case')
-        token = reader.curr.value
         cases: list[CaseWhenExpression] = []
         default = None
         while True:
-            cases.append(CaseWhenExpression.consume(reader))
+            cases.append((yield CaseWhenExpression.steps(reader)))
             if reader.curr_value_lower in ('else', 'default'):
-                default = DefaultCaseExpression.consume(reader)
+                default = yield DefaultCaseExpression.steps(reader)
                 assert reader.curr_value_lower == 'end'
             if reader.curr_value_lower == 'end':
                 end = reader.expect_word('end')
                 return CaseExpression(case, cases, default, end)
 
 class ComparisonExpression(BooleanExpression):
+    __slots__ = ('left', 'operation', 'right')
 
     def __init__(self, left: ScalarExpression, operation: BooleanOperatorExpression, right: ScalarExpression):
         super().__init__([left, operation, right])
@@ -659,6 +671,7 @@ class ComparisonExpression(BooleanExpression):
         self.right = right
     
 class SubstringExpression(ScalarExpression):
+    __slots__ = ()
 
     def __init__(
             self, 
@@ -679,6 +692,7 @@ class SubstringExpression(ScalarExpression):
         )
 
 class AbsExpression(ScalarExpression):
+    __slots__ = ('arg',)
 
     def __init__(self, abs: TokenContext, args: ArgumentsListExpression):
         super().__init__('number', [abs, args])
@@ -692,6 +706,7 @@ class AbsExpression(ScalarExpression):
         )
     
 class MaxExpression(ScalarExpression):
+    __slots__ = ('arg',)
 
     def __init__(self, max: TokenContext, args: ArgumentsListExpression):
         [self.arg] = args.arguments
@@ -706,6 +721,7 @@ class MaxExpression(ScalarExpression):
         )
 
 class ObjectIdExpression(ScalarExpression):
+    __slots__ = ('name',)
 
     def __init__(self, object_id: TokenContext, arg: ArgumentsListExpression):
         super().__init__('number', [object_id, arg])
@@ -719,6 +735,7 @@ class ObjectIdExpression(ScalarExpression):
         )
 
 class IsNullExpression(ScalarExpression):
+    __slots__ = ('expression', 'coalescing')
 
     def __init__(self, isnull, args: ArgumentsListExpression):
         [self.expression, self.coalescing] = args.arguments
@@ -732,6 +749,7 @@ class IsNullExpression(ScalarExpression):
         )
 
 class AliasedScalarIdentifierExpression(ScalarExpression):
+    __slots__ = ('expression', 'alias')
 
     def __init__(self, expression: ScalarExpression, _as: TokenContext, alias: TokenContext):
         super().__init__(expression.type, [expression, _as, alias])
@@ -743,4 +761,29 @@ class AliasedScalarIdentifierExpression(ScalarExpression):
         return self.alias.token.value
 
     def trace(self, tracer):
-        return self.expression.trace(tracer)
\ No newline at end of file
+        return self.expression.trace(tracer)
+
+# Keyword -> consumer for the words that start a scalar expression other than
+# a column: builtin functions, CASE and EXISTS. A consumer returns either the
+# expression or a generator of steps for Reader.run.
+FUNCTIONS: dict[int, Callable[[Reader], ScalarExpression]] = {
+    Keyword.CAST: CastExpression.consume,
+    Keyword.CONCAT: ConcatExpression.consume,
+    Keyword.RIGHT: RightExpression.consume,
+    Keyword.CASE: CaseExpression.steps,
+    Keyword.SUBSTRING: SubstringExpression.consume,
+    Keyword.LEN: LenExpression.consume,
+    Keyword.REPLACE: ReplaceExpression.consume,
+    Keyword.FORMAT: FormatExpression.consume,
+    Keyword.YEAR: YearExpression.consume,
+    Keyword.GETDATE: GetDateExpression.consume,
+    Keyword.SCOPE_IDENTITY: ScopeIdentityExpression.consume,
+    Keyword.ABS: AbsExpression.consume,
+    Keyword.MAX: MaxExpression.consume,
+    Keyword.OBJECT_ID: ObjectIdExpression.consume,
+    Keyword.ISNULL: IsNullExpression.consume,
+    Keyword.EXISTS: ExistsExpression.consume,
+}
+
+def register_function(word: str, consume: Callable[[Reader], ScalarExpression]):
+    FUNCTIONS[register_keyword(word)] = consume
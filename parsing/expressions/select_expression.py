@@ -12,6 +12,7 @@ if TYPE_CHECKING:
     from parsing.expressions.scalar_expression import BooleanExpression, IdentifierExpression, TableIdentifierExpression, ScalarExpression, AliasedScalarIdentifierExpression
 
 class SelectExpression(Clause):
+    __slots__ = ('top_n', 'distinct', 'projection', 'into', '_from', '_predicate', 'groupby', 'orderby', 'tracer')
 
     def __init__(
             self, 
@@ -37,6 +38,8 @@ class SelectExpression(Clause):
             _from, 
             where, 
             predicate,
+            groupby,
+            orderby,
         ])
         self.top_n = top_n
         self.distinct = distinct
@@ -51,11 +54,12 @@ class SelectExpression(Clause):
 
     @classmethod
     def consume(cls, reader: Reader):
-        from parsing.expressions.scalar_expression import ScalarExpression, BooleanExpression, AliasedScalarIdentifierExpression
+        from parsing.expressions.scalar_expression import MULTIPLICATIVE, ScalarExpression, BooleanExpression, AliasedScalarIdentifierExpression
         select = reader.expect_word('select')
         top = reader.consume_optional_word('top')
         if top:
-            top_n = ScalarExpression.consume(reader)
+            # Operators would run on into the projection: top 10 * from t.
+            top_n = ScalarExpression.consume(reader, MULTIPLICATIVE)
         else:
             top_n = None
         distinct = reader.consume_optional_word('distinct')
@@ -77,7 +81,7 @@ class SelectExpression(Clause):
                     reader.expect_symbol('='),
                     ScalarExpression.consume(reader)
                 )
-            elif reader.curr_value_lower not in (',', 'from', 'into'):
+            elif not reader.eof and reader.curr_value_lower not in (',', 'from', 'into', 'go'):
                 expression = AliasedScalarIdentifierExpression(
                     expression,
                     None,
@@ -133,6 +137,7 @@ class SelectExpression(Clause):
         return self._predicate
     
 class GroupByExpression(Clause):
+    __slots__ = ('columns',)
 
     def __init__(
         self, 
@@ -158,6 +163,7 @@ class GroupByExpression(Clause):
         return GroupByExpression(group, by, columns)
 
 class ApplyExpression(Clause):
+    __slots__ = ('apply_type', 'expression')
 
     def __init__(
         self,
@@ -170,6 +176,7 @@ class ApplyExpression(Clause):
         self.expression = expression
   
 class JoinExpression(Clause):
+    __slots__ = ('join_type', 'table', 'condition')
 
     def __init__(
         self, 
@@ -187,7 +194,8 @@ class JoinExpression(Clause):
     @staticmethod
     def consume(reader: Reader):
         from parsing.expressions.scalar_expression import BooleanExpression, TableIdentifierExpression, AliasedScalarIdentifierExpression
-        join_type = reader.consume_optional_words('left', 'outer') \
+        left_outer = reader.consume_optional_words('left', 'outer')
+        join_type = (Clause(left_outer) if left_outer else None) \
             or reader.consume_optional_word('left') \
             or reader.consume_optional_word('inner') \
             or reader.consume_optional_word('outer') \
@@ -209,6 +217,7 @@ class JoinExpression(Clause):
             return ApplyExpression(join_type, join, table)
 
 class FromExpression(Clause):
+    __slots__ = ('table', 'joins')
 
     def __init__(self, _from: TokenContext, table: TableIdentifierExpression, joins: list[JoinExpression]):
         super().__init__([_from, table, *joins])
@@ -223,7 +232,7 @@ class FromExpression(Clause):
             raise ValueError(f"Invalid token: '{reader.curr.value}' ({reader.curr.type})")
         table = TableIdentifierExpression.consume(reader)
         # todo: gah
-        if not reader.eof and reader.curr_value_lower not in ['where', 'order', 'group', 'join', 'inner', 'left', ')', 'select', 'outer']:
+        if not reader.eof and reader.curr_value_lower not in ['where', 'order', 'group', 'join', 'inner', 'left', ')', 'select', 'outer', 'go']:
             table = AliasedTableExpression(
                 table, 
                 reader.consume_optional_word('as'),
@@ -247,6 +256,7 @@ class FromExpression(Clause):
         return table
 
 class IntoExpression(Clause):
+    __slots__ = ('dest',)
 
     def __init__(self, into, dest):
         super().__init__([into, dest])
@@ -260,6 +270,7 @@ class IntoExpression(Clause):
         )
     
 class AliasedTableExpression(Clause):
+    __slots__ = ('table', 'alias')
     def __init__(
         self, 
         table: TableIdentifierExpression, 
@@ -271,12 +282,14 @@ class AliasedTableExpression(Clause):
         self.alias = alias
 
 class OrderByColumnExpression(Clause):
+    __slots__ = ('column', 'asc')
     def __init__(self, column, asc, comma):
         super().__init__([column, asc, comma])
         self.column = column
         self.asc = asc
 
 class OrderByExpression(Clause):
+    __slots__ = ('columns',)
     def __init__(
         self,
         order: TokenContext,
@@ -293,10 +306,11 @@ class OrderByExpression(Clause):
         by = reader.expect_word('by')
         columns = []
         while True:
-            column = ScalarExpression.consume(reader),
+            column = ScalarExpression.consume(reader)
             asc = reader.consume_optional_word('asc') or reader.consume_optional_word('desc')
             if reader.curr_value_lower == ',':
                 columns.append(OrderByColumnExpression(column, asc, reader.expect_symbol(',')))
             else:
                 columns.append(OrderByColumnExpression(column, asc, None))
-                break
\ No newline at end of file
+                break
+        return OrderByExpression(order, by, columns)
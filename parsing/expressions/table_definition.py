@@ -6,6 +6,7 @@ from parsing.reader import Reader
 from parsing.tokenizer import Token
 
 class IdentityExpression(Clause):
+    __slots__ = ('initial', 'increment')
 
     def __init__(self, identity: TokenContext, args: ArgumentsListExpression):
         super().__init__([identity, args])
@@ -19,6 +20,7 @@ class IdentityExpression(Clause):
         )
     
 class PrimaryKeyExpression(Clause):
+    __slots__ = ()
 
     def __init__(self, primary: TokenContext, key: TokenContext):
         super().__init__([primary, key])
@@ -31,6 +33,7 @@ class PrimaryKeyExpression(Clause):
         )
 
 class NotNullExpression(Clause):
+    __slots__ = ()
     
     def __init__(self, _not: TokenContext, null: TokenContext):
         super().__init__([_not, null])
@@ -43,6 +46,7 @@ class NotNullExpression(Clause):
         )
 
 class ColumnDefinitionExpression(Clause):
+    __slots__ = ('name', 'datatype', 'attributes')
 
     def __init__(self, name: TokenContext, datatype: DataTypeClause, attributes: list[Clause]):
         super().__init__([name, datatype] + attributes)
@@ -71,6 +75,7 @@ class ColumnDefinitionExpression(Clause):
         )
 
 class TableDefinitionExpression(Clause):
+    __slots__ = ('columns',)
 
     def __init__(
         self,
@@ -1,28 +1,34 @@
 from parsing.tokenizer import Token
-from typing import Generator
+from typing import Iterable
 
 
 class TokenContext:
+    __slots__ = ('token', 'whitespace', 'type')
 
-    def __init__(self, token: Token, whitespace: Generator[Token], type: str=None):
+    # Types of token that keep their case when a script is upper- or lowercased.
+    CASED = frozenset([Token.VARIABLE, Token.COMMENT, Token.QUOTED_IDENTIFIER, Token.IDENTIFIER])
+
+    def __init__(self, token: Token, whitespace: Iterable[Token], type: str=None):
         self.token = token
-        self.whitespace = list(whitespace)
+        # Most tokens are followed by no trivia or a single space; an empty
+        # tuple is shared and a short one is smaller than a list.
+        self.whitespace = tuple(whitespace)
         self.type = type or token.type
 
     def __str__(self):
-        return f"{self.token.value}{''.join(str(token) for token in self.whitespace)}"
+        return f"{self.token.render(self.token.value)}{''.join(str(token) for token in self.whitespace)}"
     
     def uppercase(self):
-        if self.type in [Token.VARIABLE, Token.COMMENT, Token.QUOTED_IDENTIFIER, Token.IDENTIFIER]:
-            return self.token.value + ''.join(token.value for token in self.whitespace)
+        if self.type in TokenContext.CASED:
+            return self.token.render(self.token.value) + ''.join(token.value for token in self.whitespace)
         else:
-            return self.token.value.upper() + ''.join(token.value for token in self.whitespace)
+            return self.token.render(self.token.value.upper()) + ''.join(token.value for token in self.whitespace)
         
     def lowercase(self):
-        if self.type in [Token.VARIABLE, Token.COMMENT, Token.QUOTED_IDENTIFIER, Token.IDENTIFIER]:
-            return self.token.value + ''.join(token.value for token in self.whitespace)
+        if self.type in TokenContext.CASED:
+            return self.token.render(self.token.value) + ''.join(token.value for token in self.whitespace)
         else:
-            return self.token.value.lower() + ''.join(token.value for token in self.whitespace)
+            return self.token.render(self.token.value.lower()) + ''.join(token.value for token in self.whitespace)
     
     def strip(self):
-        return TokenContext(self.token, [])
\ No newline at end of file
+        return TokenContext(self.token.strip(), ())
\ No newline at end of file
@@ -4,6 +4,7 @@ from parsing.tokenizer import Token
 
 
 class BeginTransactionExpression(Clause):
+    __slots__ = ()
 
     def __init__(self, begin, tran, tranname):
         super().__init__([begin, tran, tranname])
@@ -24,6 +25,7 @@ class BeginTransactionExpression(Clause):
         )
     
 class CommitTransactionExpression(Clause):
+    __slots__ = ('tranname',)
 
     def __init__(self, commit, transaction, tranname):
         super().__init__([commit, transaction, tranname])
@@ -6,6 +6,7 @@ from parsing.tokenizer import Token
 
 
 class UseExpression(Clause):
+    __slots__ = ('use', 'database')
     def __init__(self, use: TokenContext, database: TableIdentifierExpression):
         super().__init__([use, database])
         self.use = use
@@ -9,6 +9,7 @@ if TYPE_CHECKING:
     from parsing.expressions.scalar_expression import ScalarExpression
 
 class VariableAssignmentExpression(Clause):
+    __slots__ = ('var', 'val')
 
     def __init__(self, var: TokenContext, equals: TokenContext, val: ScalarExpression):
         super().__init__([var, equals, val])
@@ -1,9 +1,11 @@
 from parsing.expressions.clause import Clause
 from parsing.expressions.scalar_expression import BooleanExpression
 from parsing.reader import Reader
+from typing import Generator
 
 
 class WhileExpression(Clause):
+    __slots__ = ('predicate', 'block')
 
     def __init__(self, _while, predicate, block):
         super().__init__([_while, predicate, block])
@@ -12,9 +14,13 @@ class WhileExpression(Clause):
 
     @staticmethod
     def consume(reader: Reader):
+        return reader.run(WhileExpression.steps(reader))
+
+    @staticmethod
+    def steps(reader: Reader) -> Generator:
         from parsing.expressions.block_expression import BeginEndBlock
         return WhileExpression(
             reader.expect_word('while'),
             BooleanExpression.consume(reader),
-            BeginEndBlock.consume(reader)
+            (yield BeginEndBlock.steps(reader))
         )
\ No newline at end of file
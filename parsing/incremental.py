@@ -0,0 +1,159 @@
+from bisect import bisect_right
+from parsing.expressions.block_expression import BlockExpression
+from parsing.expressions.clause import Clause
+from parsing.expressions.token_context import TokenContext
+from parsing.keywords import Keyword
+from parsing.parser import Parser
+from parsing.reader import Reader
+from parsing.tokenizer import Token, Tokenizer
+
+# Parses a script again after an edit by tokenizing and parsing only the
+# top-level statements around it. Every other statement is kept as it was, the
+# same object, so a caller can tell what changed by identity:
+#
+#   parser = IncrementalParser(sql)
+#   block = parser.edit(start, end, 'new text')
+#
+# The statement before the edit is parsed again too, since where a statement
+# ends can depend on the tokens after it; the tokens after the edit keep their
+# objects and only have their offsets moved.
+
+class IncrementalParser:
+
+    def __init__(self, sql: str):
+        self.sql = sql
+        self._parse_all()
+
+    def edit(self, start: int, end: int, text: str) -> BlockExpression:
+        # Replaces sql[start:end] with text and returns the new block.
+        sql = self.sql[:start] + text + self.sql[end:]
+        if not self.starts:
+            self.sql = sql
+            return self._parse_all()
+        try:
+            window, first, last = self._window(sql, start, end, len(text) - (end - start))
+        except Exception:
+            # The text is taken whatever happens; the next edit parses it whole.
+            self.sql = sql
+            self.starts = self.block = None
+            raise
+        if window is None:
+            self.sql = sql
+            return self._parse_all()
+        tokens, entries, starts = window
+        shift = len(tokens) - (self._following(last) - self.starts[first])
+        delta = len(sql) - len(self.sql)
+        if delta:
+            for token in self.tokens[self.starts[first] + len(tokens):]:
+                token.start += delta
+        self.starts[first:last + 1] = starts
+        if shift:
+            for i in range(first + len(starts), len(self.starts)):
+                self.starts[i] += shift
+        expressions = list(self.block.expressions)
+        expressions[first:last + 1] = entries
+        self.sql = sql
+        self.block = BlockExpression(expressions)
+        return self.block
+
+    def _window(self, sql: str, start: int, end: int, delta: int):
+        # The entries to parse again, first to last. An edit on the boundary of
+        # an entry can join its tokens to those of the one before; one that
+        # joins tokens after it runs on, and the window grows to fit.
+        expressions = self.block.expressions
+        first = self._entry_at(start)
+        if first > 0 and self._offset(first) == start:
+            first -= 1
+        # A ';' is read with the statement before it. Without one, where that
+        # statement ends can depend on what follows it.
+        while first > 0 and isinstance(expressions[first], TokenContext):
+            first -= 1
+        if first > 0 and not isinstance(expressions[first - 1], TokenContext):
+            first -= 1
+        last = self._entry_at(end)
+        if last > first and end > start and self._offset(last) == end:
+            last -= 1
+        while isinstance(window := self._reparse(sql, delta, first, last), int):
+            last = window
+        return window, first, last
+
+    def _parse_all(self) -> BlockExpression:
+        self.starts = self.block = None
+        tokenizer = Tokenizer(self.sql, regex=True)
+        tokens = tokenizer.parse()
+        entries, starts = self._parse_entries(Reader(tokens, tokenizer.lines), len(tokens))
+        if entries is None:
+            # A stray END, where the parse stops: leave it to the ordinary parse,
+            # and to a whole parse after every edit.
+            self.block = Parser(Tokenizer(self.sql, regex=True).parse()).parse()
+        else:
+            self.tokens, self.starts, self.block = tokens, starts, BlockExpression(entries)
+        return self.block
+
+    def _parse_entries(self, reader: Reader, end: int) -> tuple[list[Clause | TokenContext], list[int]]:
+        # As BlockExpression.steps, up to token end, noting where each entry starts.
+        entries = []
+        starts = []
+        while reader.checkpoint() < end:
+            if reader.curr_keyword == Keyword.END:
+                return None, None
+            starts.append(reader.checkpoint())
+            if reader.curr.type in Token.TRIVIA:
+                entries.append(Clause([reader.read()]))
+                continue
+            try:
+                entries.append(reader.run(BlockExpression._consume_statement(reader)))
+            except Exception as e:
+                raise ValueError(f"{reader.context(after=0)}\n{e}") from e
+            if reader.checkpoint() < end and reader.curr_value_lower == ';':
+                starts.append(reader.checkpoint())
+                entries.append(reader.expect_symbol(';'))
+        return entries, starts
+
+    def _reparse(self, sql: str, delta: int, first: int, last: int):
+        # Tokenizes and parses entries first to last again, as they are in sql.
+        # Returns the new tokens, the entries and where they start; None for a
+        # stray END; or, when a token or statement runs on past last, the entry
+        # it runs into, to try again up to. The new tokens replace the old in
+        # self.tokens only if it succeeds.
+        end = self._offset(last + 1) + delta
+        tokenizer = Tokenizer(sql, regex=True)
+        tokens = tokenizer.parse_range(self._offset(first), end)
+        if tokens and tokens[-1].start + len(tokens[-1].value) > end:
+            return self._entry_at(tokens[-1].start + len(tokens[-1].value) - delta - 1)
+        start = self.starts[first]
+        following = self._following(last)
+        old = self.tokens[start:following]
+        self.tokens[start:following] = tokens
+        reader = Reader(self.tokens, tokenizer.lines)
+        reader.restore(start)
+        try:
+            entries, starts = self._parse_entries(reader, start + len(tokens))
+        except ValueError:
+            self.tokens[start:start + len(tokens)] = old
+            # An error past the window may only be down to tokens read by the old
+            # parse; they are tokenized afresh with the window grown to them.
+            if reader.checkpoint() <= start + len(tokens):
+                raise
+            return bisect_right(self.starts, reader.checkpoint() - start - len(tokens) + following - 1) - 1
+        if entries is None or reader.checkpoint() > start + len(tokens):
+            self.tokens[start:start + len(tokens)] = old
+            if entries is None:
+                return None
+            return bisect_right(self.starts, reader.checkpoint() - start - len(tokens) + following - 1) - 1
+        return tokens, entries, starts
+
+    def _following(self, entry: int) -> int:
+        # The token the entry after entry starts at.
+        return self.starts[entry + 1] if entry + 1 < len(self.starts) else len(self.tokens)
+
+    def _offset(self, entry: int) -> int:
+        # Where entry starts in the text; len(sql) past the last one.
+        if entry >= len(self.starts):
+            return len(self.sql)
+        return self.tokens[self.starts[entry]].start
+
+    def _entry_at(self, offset: int) -> int:
+        # The entry the character at offset belongs to.
+        index = bisect_right(range(len(self.starts)), offset, key=self._offset) - 1
+        return min(max(index, 0), len(self.starts) - 1)
@@ -0,0 +1,109 @@
+import sys
+
+
+class Keyword:
+
+    NONE = 0
+    ABS = 1
+    AND = 2
+    APPLY = 3
+    AS = 4
+    ASC = 5
+    BEGIN = 6
+    BY = 7
+    CASE = 8
+    CAST = 9
+    CLOSE = 10
+    COMMIT = 11
+    CONCAT = 12
+    CURSOR = 13
+    DEALLOCATE = 14
+    DECLARE = 15
+    DEFAULT = 16
+    DELETE = 17
+    DESC = 18
+    DISTINCT = 19
+    ELSE = 20
+    END = 21
+    EXISTS = 22
+    FETCH = 23
+    FIRST = 24
+    FOR = 25
+    FORMAT = 26
+    FROM = 27
+    GETDATE = 28
+    GO = 29
+    GROUP = 30
+    IDENTITY = 31
+    IF = 32
+    IN = 33
+    INNER = 34
+    INSERT = 35
+    INTO = 36
+    IS = 37
+    ISNULL = 38
+    JOIN = 39
+    KEY = 40
+    LAST = 41
+    LEFT = 42
+    LEN = 43
+    LIKE = 44
+    MAX = 45
+    NEXT = 46
+    NOT = 47
+    NULL = 48
+    OBJECT_ID = 49
+    ON = 50
+    OPEN = 51
+    OR = 52
+    ORDER = 53
+    OUTER = 54
+    PRIMARY = 55
+    PRIOR = 56
+    REPLACE = 57
+    RIGHT = 58
+    SCOPE_IDENTITY = 59
+    SELECT = 60
+    SET = 61
+    SUBSTRING = 62
+    TABLE = 63
+    THEN = 64
+    TOP = 65
+    TRAN = 66
+    TRANSACTION = 67
+    UPDATE = 68
+    USE = 69
+    VALUES = 70
+    WHEN = 71
+    WHERE = 72
+    WHILE = 73
+    YEAR = 74
+
+
+KEYWORD_IDS: dict[str, int] = {
+    name.lower(): value for name, value in vars(Keyword).items() if name.isupper() and value != Keyword.NONE
+}
+
+# Spelling -> (interned lowercase, keyword id). Identifiers repeat heavily in
+# scripts, so each distinct spelling is lowered and looked up only once.
+_words: dict[str, tuple[str, int]] = {}
+_MAX_CACHED_WORDS = 1 << 16
+
+def classify(word: str) -> tuple[str, int]:
+    entry = _words.get(word)
+    if entry is None:
+        if len(_words) >= _MAX_CACHED_WORDS:
+            _words.clear()
+        lower = sys.intern(word.lower())
+        entry = _words[word] = (lower, KEYWORD_IDS.get(lower, Keyword.NONE))
+    return entry
+
+def keyword_id(word: str) -> int:
+    return KEYWORD_IDS.get(word.lower(), Keyword.NONE)
+
+def register_keyword(word: str) -> int:
+    word = word.lower()
+    if word not in KEYWORD_IDS:
+        KEYWORD_IDS[word] = max(KEYWORD_IDS.values()) + 1
+        _words.clear()
+    return KEYWORD_IDS[word]
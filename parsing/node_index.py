@@ -0,0 +1,44 @@
+from parsing.expressions.clause import Clause
+from parsing.expressions.scalar_expression import TableIdentifierExpression
+from parsing.expressions.select_expression import SelectExpression
+from parsing.walker import walk
+
+# An index of a script's clauses, filled in by the parser as it reads each
+# top-level statement (Parser(..., index=True)), so that questions about the
+# whole script are dictionary lookups rather than walks of the tree. There is
+# one index per parse: every block of the script refers to it.
+
+def normalize(name: str) -> str:
+    # dbo.Orders, [dbo].[Orders] and "DBO"."orders" are the same table.
+    return '.'.join(part.strip('[]"`').lower() for part in name.split('.'))
+
+class NodeIndex:
+
+    def __init__(self):
+        # Clause class -> clauses of exactly that class, in source order.
+        self.types: dict[type, list[Clause]] = {}
+        # Normalized table name -> the clauses that name it: table
+        # identifiers, and the SELECTs whose INTO creates it.
+        self.tables: dict[str, list[Clause]] = {}
+
+    def add(self, statement: Clause):
+        # Statements are added once they are final, in source order, and
+        # each clause is walked once, nested blocks included.
+        for clause in walk(statement):
+            self.types.setdefault(type(clause), []).append(clause)
+            if isinstance(clause, TableIdentifierExpression):
+                name = '.'.join(part.token.value for part in (clause.database, clause.schema, clause.table) if part is not None)
+                self.tables.setdefault(normalize(name), []).append(clause)
+            elif isinstance(clause, SelectExpression) and clause.into is not None:
+                self.tables.setdefault(normalize(clause.into.dest.token.value), []).append(clause)
+
+    def add_script(self, block: Clause):
+        # The block of the whole script, which comes before its statements.
+        self.types.setdefault(type(block), []).insert(0, block)
+
+    def nodes(self, *types: type) -> list[Clause]:
+        # The clauses of types and their subclasses; in source order for each class.
+        return [clause for cls, clauses in self.types.items() if issubclass(cls, types) for clause in clauses]
+
+    def references(self, table: str) -> list[Clause]:
+        return self.tables.get(normalize(table), [])
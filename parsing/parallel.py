@@ -0,0 +1,84 @@
+import os
+import pickle
+import re
+from concurrent.futures import Executor, ProcessPoolExecutor
+from parsing.expressions.block_expression import BlockExpression
+from parsing.expressions.clause import Clause
+from parsing.parser import Parser
+from parsing.tokenizer import LineIndex, Tokenizer
+
+# Strings, quoted identifiers and comments are matched whole so that a GO
+# inside them is skipped over. A GO only separates batches when it is alone
+# on its line, apart from whitespace and a trailing comment.
+BATCH_SEPARATOR = re.compile(r"""
+      '[^']*'|"[^"]*"|`[^`]*`|\[[^\]]*\]
+    | --[^\n\r]*
+    | (?:\A|(?<=[\n\r]))[^\S\n\r]*(?P<go>go)(?!\w)[^\S\n\r]*(?:--[^\n\r]*)?(?=[\n\r]|\Z)
+""", re.VERBOSE | re.IGNORECASE)
+
+def find_batches(sql: str) -> list[int]:
+    # Offsets of the GO keywords that separate the script's batches.
+    return [match.start('go') for match in BATCH_SEPARATOR.finditer(sql) if match.group('go') is not None]
+
+def split_batches(sql: str, count: int) -> list[tuple[str, int]]:
+    # Cuts the script at GO boundaries into at most count segments of roughly
+    # equal length; each segment is (text, offset) and starts with its GO.
+    size = len(sql) / count
+    segments = []
+    start = 0
+    for boundary in find_batches(sql):
+        if boundary > start and boundary - start >= size:
+            segments.append((sql[start:boundary], start))
+            start = boundary
+    segments.append((sql[start:], start))
+    return segments
+
+def _parse_segment(segment: tuple[str, int], lines: LineIndex=None) -> list[Clause] | None:
+    # None if the segment does not parse on its own; the serial parse then
+    # reports the error against the whole script.
+    sql, offset = segment
+    try:
+        parser = Parser(Tokenizer(sql, regex=True, offset=offset).parse(), lines)
+        block = parser.parse()
+    except Exception:
+        return None
+    # A segment that stops early (a stray END) parses differently on its own.
+    return block.expressions if parser.reader.eof else None
+
+class ParallelParser:
+
+    def __init__(self, sql: str, jobs: int=None, executor: Executor=None):
+        self.sql = sql
+        self.jobs = jobs or os.cpu_count() or 1
+        self.executor = executor
+
+    def parse(self) -> BlockExpression:
+        # Several segments per worker keeps the pool busy when batches differ in size.
+        segments = split_batches(self.sql, self.jobs * 4)
+        if len(segments) > 1:
+            if self.executor is not None:
+                results = self._parse_segments(self.executor, segments)
+            else:
+                with ProcessPoolExecutor(min(self.jobs, len(segments))) as executor:
+                    results = self._parse_segments(executor, segments)
+            if all(result is not None for result in results):
+                return BlockExpression([clause for result in results for clause in result])
+        # One batch, or a GO that only makes sense in the context of the whole
+        # script (inside BEGIN ... END, say): the serial parse is the answer,
+        # and reports any error against the whole script.
+        tokenizer = Tokenizer(self.sql, regex=True)
+        return Parser(tokenizer.parse(), tokenizer.lines).parse()
+
+    def _parse_segments(self, executor: Executor, segments: list[tuple[str, int]]) -> list[list[Clause] | None]:
+        futures = [executor.submit(_parse_segment, segment) for segment in segments]
+        results = []
+        lines = None
+        for future, segment in zip(futures, segments):
+            try:
+                results.append(future.result())
+            except (RecursionError, pickle.PicklingError):
+                # Trees come back pickled, and pickling recurses once per
+                # level: a batch nested too deep to send is parsed here.
+                lines = lines or LineIndex(self.sql)
+                results.append(_parse_segment(segment, lines))
+        return results
@@ -1,20 +1,44 @@
-from parsing.expressions.block_expression import BlockExpression
+from parsing.diagnostics import Diagnostic
+from parsing.expressions.block_expression import BlockExpression, UnparsedExpression
+from parsing.node_index import NodeIndex
 from parsing.reader import Reader
-from parsing.tokenizer import Token
+from parsing.tokenizer import LineIndex, Token
 
 class Parser():
 
-    def __init__(self, tokens: list[Token]):
-        self.reader = Reader(tokens)
+    def __init__(self, tokens: list[Token], lines: LineIndex=None, recover: bool=False, lazy: bool=False, index: bool=False):
+        # Blocks are indexed (BlockExpression.index) as they are read; a lazily
+        # parsed block is not.
+        self.reader = Reader(tokens, lines, recover, NodeIndex() if index and not lazy else None)
+        # Lazily, statements are only parsed when read, and so are their errors.
+        self.lazy = lazy
+
+    @property
+    def diagnostics(self) -> list[Diagnostic]:
+        return self.reader.diagnostics
 
     def throw(self, err: str | Exception):
         if isinstance(err, str):
-            raise ValueError(f"{self.reader.print()}\n{err}")
+            raise ValueError(f"{self.reader.context(after=0)}\n{err}")
         else:
-            raise ValueError(f"{self.reader.print()}\n{err}") from err
+            raise ValueError(f"{self.reader.context(after=0)}\n{err}") from err
         
     def parse(self) -> BlockExpression:
         try:
-            return BlockExpression.consume(self.reader)
+            if self.lazy:
+                return BlockExpression.scan(self.reader)
+            block = BlockExpression.consume(self.reader, outermost=True)
+            while self.reader.diagnostics is not None and not self.reader.eof:
+                # An END with no BEGIN stops the top-level block.
+                self.reader.diagnose(f"Unexpected token '{self.reader.curr.__repr__()}' at {self.reader.location()}")
+                unparsed = UnparsedExpression.consume(self.reader)
+                if block.index is not None:
+                    block.index.add(unparsed)
+                rest = BlockExpression.consume(self.reader, outermost=True)
+                block.expressions.append(unparsed)
+                block.expressions.extend(rest.expressions)
+            if block.index is not None:
+                block.index.add_script(block)
+            return block
         except Exception as e:
-            self.throw(e)
\ No newline at end of file
+            self.throw(e)
@@ -1,15 +1,35 @@
-from typing import Generator, Self
+from types import GeneratorType
+from typing import TYPE_CHECKING, Collection, Generator, Self, TypeVar
 import typing
+from parsing.diagnostics import Diagnostic
 from parsing.expressions.token_context import TokenContext
-from parsing.tokenizer import Token
+from parsing.keywords import Keyword
+from parsing.tokenizer import LineIndex, Token
 
+if TYPE_CHECKING:
+    from parsing.node_index import NodeIndex
+
+T = TypeVar('T')
 
 class Reader:
 
-    def __init__(self, tokens: list[Token]):
+    # Bounds on the source text quoted in error messages and diagnostics.
+    CONTEXT_TOKENS = 16
+    CONTEXT_CHARS = 160
+
+    def __init__(self, tokens: list[Token], lines: LineIndex=None, recover: bool=False, index: 'NodeIndex'=None):
         self._tokens = tokens
         self._position = 0
         self.state_stack = []
+        self._lines = lines
+        # Collected instead of raised when recovering from errors.
+        self.diagnostics: list[Diagnostic] = [] if recover else None
+        # The index the outermost block adds its statements to, if any.
+        self.index = index
+
+    @property
+    def tokens(self) -> list[Token]:
+        return self._tokens
 
     @property
     def curr(self) -> Token:
@@ -19,11 +39,57 @@ class Reader:
     def curr_value_lower(self) -> str:
         if self.eof:
             return None
-        return self.curr.value.lower()
+        return self.curr.lower
+
+    @property
+    def curr_keyword(self) -> int:
+        if self.eof:
+            return Keyword.NONE
+        return self.curr.keyword
 
     def reset(self):
         self._position = 0
 
+    def checkpoint(self) -> int:
+        return self._position
+
+    def restore(self, checkpoint: int):
+        self._position = checkpoint
+
+    def run(self, steps: Generator | T) -> T:
+        # Runs a rule written as a generator. Whatever the rule yields is run
+        # first and its result sent back in: a generator is a nested rule,
+        # anything else is already a result. Errors are raised at the yield.
+        # Nesting lives on this stack, not the Python stack, so depth is
+        # bounded by memory alone.
+        if not isinstance(steps, GeneratorType):
+            return steps
+        stack = [steps]
+        result, error = None, None
+        while True:
+            try:
+                if error is None:
+                    nested = stack[-1].send(result)
+                else:
+                    nested = stack[-1].throw(error)
+            except StopIteration as stop:
+                stack.pop()
+                result, error = stop.value, None
+                if not stack:
+                    return result
+                continue
+            except Exception as e:
+                stack.pop()
+                if not stack:
+                    raise
+                result, error = None, e
+                continue
+            if isinstance(nested, GeneratorType):
+                stack.append(nested)
+                result, error = None, None
+            else:
+                result, error = nested, None
+
     @property
     def eof(self) -> bool:
         return self._position >= len(self._tokens)
@@ -38,6 +104,41 @@ class Reader:
             end = self._position
         return ''.join(map(str, self._tokens[start: end]))
 
+    def context(self, position: int=None, after: int=CONTEXT_TOKENS) -> str:
+        # The source around position, a few tokens either side and at most
+        # CONTEXT_CHARS long, whatever the size of the script.
+        if position is None:
+            position = self._position
+        before = self.print(position, max(0, position - self.CONTEXT_TOKENS))[-self.CONTEXT_CHARS // 2:]
+        return before + self.print(position + after, position)[:self.CONTEXT_CHARS // 2]
+
+    def diagnose(self, error: Exception | str, position: int=None) -> Diagnostic:
+        if position is None:
+            position = self._position
+        token = self._tokens[min(position, len(self._tokens) - 1)] if self._tokens else None
+        if token is None or token.start is None:
+            line = column = None
+        else:
+            line, column = self.lines.line_and_column(token.start)
+            line, column = line + 1, column + 1
+        diagnostic = Diagnostic(str(error), line, column, self.context(position))
+        if self.diagnostics is not None:
+            self.diagnostics.append(diagnostic)
+        return diagnostic
+
+    @property
+    def lines(self) -> LineIndex:
+        if self._lines is None:
+            self._lines = LineIndex(''.join(map(str, self._tokens)))
+        return self._lines
+
+    def location(self, token: Token=None) -> str:
+        token = token or (None if self.eof else self.curr)
+        if token is None or token.start is None:
+            return f"position {self._position}"
+        line, col = self.lines.line_and_column(token.start)
+        return f"line {line + 1}, column {col + 1}"
+
     def consume_whitespace(self) -> Generator[Token]:
         while not self.eof and self.curr.type in (Token.WHITESPACE, Token.NEWLINE, Token.COMMENT):
             yield self.read()
@@ -45,12 +146,12 @@ class Reader:
     def expect(self, type: str, value:str=None) -> TokenContext:
         token = self.read()
         if token.type != type:
-            if value is not None and token.value.upper() != value.upper():
-                raise Exception(f"Expected token of type {type} with value {value}, got {token.__repr__()} at position {self._position}")
+            if value is not None and token.lower != value.lower():
+                raise Exception(f"Expected token of type {type} with value {value}, got {token.__repr__()} at {self.location(token)}")
             else:
-                raise Exception(f"Expected token of type {type}, got {token.__repr__()} at position {self._position}")
-        elif value is not None and token.value.upper() != value.upper():
-            raise Exception(f"Expected token of type {type} with value {value}, got {token.__repr__()} at position {self._position}")
+                raise Exception(f"Expected token of type {type}, got {token.__repr__()} at {self.location(token)}")
+        elif value is not None and token.lower != value.lower():
+            raise Exception(f"Expected token of type {type} with value {value}, got {token.__repr__()} at {self.location(token)}")
         return TokenContext(token, self.consume_whitespace())
 
     def expect_word(self, value:str=None) -> TokenContext:
@@ -69,16 +170,13 @@ class Reader:
     
     def expect_any_of(self, types: list[str]) -> TokenContext:
         assert self.curr.type in types, f'invalid token: {self.curr.value} ({self.curr.type})' \
-            + f' expected any of {types}'
+            + f' expected any of {types} at {self.location()}'
         return self.expect(self.curr.type)
     
-    def consume_optional_words(self, *values:str) -> TokenContext:
-        tokens = []
-        for value in values:
-            if self.curr_value_lower == value:
-                tokens.append(self.expect_word(value))
-            else: return None
-        return tokens
+    def consume_optional_words(self, *values:str) -> list[TokenContext] | None:
+        if not self.match_words(*values):
+            return None
+        return [self.expect_word(value) for value in values]
 
     def consume_optional_word(self, value:str) -> TokenContext:
         if self.curr_value_lower == value:
@@ -106,21 +204,72 @@ class Reader:
         expressions_or_tokens.append(self.expect_symbol(')'))
         return expressions_or_tokens, parameters
     
-    def _pattern(self, i):
-        tokens = self._tokens[self._position : min(self._position + i, len(self._tokens))]
-        return ''.join([token.value for token in tokens])
-
-    def peek(self, i=1):
-        if self._position + i + 1 >= len(self._tokens):
-            return []
-        return [token.value.lower() for token in self._tokens[self._position + 1, self._position + 1 + i]]
-
-    def consume_symbol_from(self, patterns: list[str]):
-        matches = [pattern for pattern in patterns if pattern == self._pattern(len(pattern))]
-        if len(matches) == 0:
+    # Lookahead. These never consume, raise or build messages, so a rule can
+    # test its alternatives before committing to one. Trivia is skipped: k
+    # counts significant tokens after the current one.
+
+    def _significant(self, position: int) -> int:
+        while position < len(self._tokens) and self._tokens[position].type in Token.TRIVIA:
+            position += 1
+        return position
+
+    def peek(self, k: int=1) -> Token | None:
+        position = self._significant(self._position)
+        for _ in range(k):
+            position = self._significant(position + 1)
+        return self._tokens[position] if position < len(self._tokens) else None
+
+    def peek_keyword(self, k: int=1) -> int:
+        token = self.peek(k)
+        return Keyword.NONE if token is None else token.keyword
+
+    def at(self, type: str, value: str=None, k: int=0) -> bool:
+        token = self.peek(k)
+        return token is not None and token.type == type and (value is None or token.lower == value)
+
+    def match_keywords(self, *keywords: int) -> bool:
+        position = self._position
+        for keyword in keywords:
+            position = self._significant(position)
+            if position >= len(self._tokens) or self._tokens[position].keyword != keyword:
+                return False
+            position += 1
+        return True
+
+    def match_words(self, *values: str) -> bool:
+        position = self._position
+        for value in values:
+            position = self._significant(position)
+            if position >= len(self._tokens) or self._tokens[position].type != Token.WORD \
+                    or self._tokens[position].lower != value:
+                return False
+            position += 1
+        return True
+
+    def consume_symbol_from(self, patterns: Collection[str]):
+        if self.eof or self.curr.type != Token.SYMBOL:
+            return None
+        # Compound operators arrive as a single token. Streams lexed without
+        # them still match, by joining consecutive symbols into the longest pattern.
+        longest = max(map(len, patterns))
+        match = None
+        value = ''
+        position = self._position
+        while len(value) < longest and position < len(self._tokens) and self._tokens[position].type == Token.SYMBOL:
+            token = self._tokens[position]
+            value += token.value
+            position += 1
+            if value in patterns:
+                match, end = value, position
+            if token.trailing:
+                break
+        if match is None:
             return None
-        match = max(matches, key=lambda match: len(match))
-        read = ''
-        while len(read) < len(match):
-            read += self.read().value
-        return TokenContext(Token(Token.SYMBOL, read), self.consume_whitespace())
\ No newline at end of file
+        if end == self._position + 1:
+            token = self.curr
+        else:
+            token = Token(Token.SYMBOL, match, self.curr.start)
+            token.leading = self.curr.leading
+            token.trailing = self._tokens[end - 1].trailing
+        self._position = end
+        return TokenContext(token, self.consume_whitespace())
\ No newline at end of file
@@ -0,0 +1,245 @@
+from bisect import bisect_left
+from typing import Iterator
+from parsing.expressions.block_expression import BlockExpression, StatementList, UnparsedExpression
+from parsing.expressions.clause import Clause
+from parsing.expressions.token_context import TokenContext
+from parsing.parser import Parser
+from parsing.reader import Reader
+from parsing.tokenizer import Token, Tokenizer
+
+# A compact, immutable form of a parse tree, over the token array the
+# tokenizer produced.
+#
+# Green nodes say what a subtree is: its kind (the expression class), its
+# width in tokens and its children. A token leaf is nothing but its width:
+# the significant token, and the whitespace and comments after it. Nothing
+# green refers to a position, so equal subtrees look alike wherever they are.
+#
+# Red nodes (SyntaxNode) are made on demand while walking the tree. They add
+# the parent and the (first, last) span of token indexes, from which text,
+# casing and subtree keys are read off the token array directly.
+
+# The kind of the tokens of an UnparsedExpression, which are kept as written.
+UNPARSED = 'UNPARSED'
+
+# Token types whose case is kept by uppercase and lowercase, as TokenContext does.
+CASED = (Token.VARIABLE, Token.COMMENT, Token.QUOTED_IDENTIFIER, Token.IDENTIFIER, UNPARSED)
+
+class GreenNode:
+    __slots__ = ('kind', 'width', 'children')
+
+    def __init__(self, kind: type, width: int, children: tuple['GreenNode | int', ...]):
+        self.kind = kind
+        self.width = width
+        self.children = children
+
+    def __repr__(self):
+        return f"GreenNode({self.kind.__name__}, {self.width})"
+
+class SyntaxTree:
+
+    def __init__(self, tokens: list[Token], green: GreenNode, kinds: list[str], source: str=None):
+        self.tokens = tokens
+        self.green = green
+        # The token type each leaf was read as, which is what its casing
+        # depends on; trivia keeps its own type.
+        self.kinds = kinds
+        self.source = source
+        self.offset = _start(tokens[0]) if tokens else 0
+
+    @staticmethod
+    def parse(sql: str) -> 'SyntaxTree':
+        tokenizer = Tokenizer(sql)
+        tokens = tokenizer.parse()
+        return SyntaxTree.build(Parser(tokens, tokenizer.lines).parse(), tokens, sql)
+
+    @staticmethod
+    def build(block: Clause, tokens: list[Token], source: str=None) -> 'SyntaxTree':
+        # Lowers a parsed tree onto tokens, the list it was parsed from. The
+        # walk is iterative, so any depth the parser produced can be built.
+        indexes = {id(token): i for i, token in enumerate(tokens)}
+        starts = None
+        kinds = [token.type for token in tokens]
+        position = 0
+        green = None
+        stack = [(block, iter(block.tokens), position, [])]
+        while stack:
+            clause, children, first, built = stack[-1]
+            for child in children:
+                if child is None:
+                    continue
+                if isinstance(child, Clause):
+                    stack.append((child, iter(child.tokens), position, []))
+                    break
+                token = child.token if isinstance(child, TokenContext) else child
+                start = indexes.get(id(token))
+                if start is None and token.type == Token.SYMBOL:
+                    # A compound operator the reader joined from single symbols.
+                    if starts is None:
+                        starts = [token.start for token in tokens]
+                    start = bisect_left(starts, token.start)
+                    end = bisect_left(starts, token.start + len(token.value))
+                elif start is not None:
+                    end = start + 1
+                if start is None or start < position or start >= len(tokens) or tokens[start].start != token.start:
+                    raise ValueError(f"{token!r} is not in the token list, or not in order")
+                if start > position:
+                    # Tokens the parser read past without keeping.
+                    built.append(start - position)
+                if isinstance(child, TokenContext):
+                    kinds[start] = child.type
+                    if child.whitespace:
+                        end = indexes.get(id(child.whitespace[-1]), -1) + 1
+                        if end <= start:
+                            raise ValueError(f"{child.whitespace[-1]!r} is not in the token list, or not in order")
+                elif isinstance(clause, UnparsedExpression):
+                    kinds[start] = UNPARSED
+                built.append(end - start)
+                position = end
+            else:
+                stack.pop()
+                green = GreenNode(type(clause), position - first, tuple(built))
+                if stack:
+                    stack[-1][3].append(green)
+        return SyntaxTree(tokens, green, kinds, source)
+
+    @property
+    def root(self) -> 'SyntaxNode':
+        return SyntaxNode(self, self.green, None, 0)
+
+    def text(self, first: int, last: int) -> str:
+        if first > last:
+            return ''
+        if self.source is not None:
+            return self.source[_start(self.tokens[first]) - self.offset:_end(self.tokens[last]) - self.offset]
+        return ''.join(str(token) for token in self.tokens[first:last + 1])
+
+    def uppercase(self, first: int, last: int) -> str:
+        return ''.join(
+            token.render(token.value if kind in CASED else token.value.upper())
+            for token, kind in zip(self.tokens[first:last + 1], self.kinds[first:last + 1])
+        )
+
+    def lowercase(self, first: int, last: int) -> str:
+        return ''.join(
+            token.render(token.value if kind in CASED else token.value.lower())
+            for token, kind in zip(self.tokens[first:last + 1], self.kinds[first:last + 1])
+        )
+
+class SyntaxNode:
+    __slots__ = ('tree', 'green', 'parent', 'first')
+
+    def __init__(self, tree: SyntaxTree, green: GreenNode | int, parent: 'SyntaxNode | None', first: int):
+        self.tree = tree
+        self.green = green
+        self.parent = parent
+        self.first = first
+
+    def __repr__(self):
+        kind = self.kind if self.is_token else self.kind.__name__
+        return f"SyntaxNode({kind}, {self.first}, {self.last})"
+
+    def __eq__(self, other):
+        return isinstance(other, SyntaxNode) and self.tree is other.tree \
+            and self.green is other.green and self.first == other.first
+
+    def __hash__(self):
+        return hash((id(self.green), self.first))
+
+    def __str__(self):
+        return self.text
+
+    @property
+    def is_token(self) -> bool:
+        return isinstance(self.green, int)
+
+    @property
+    def kind(self) -> type | str:
+        # The expression class of a node, or the type a token was read as.
+        return self.tree.kinds[self.first] if self.is_token else self.green.kind
+
+    @property
+    def width(self) -> int:
+        return self.green if self.is_token else self.green.width
+
+    @property
+    def last(self) -> int:
+        return self.first + self.width - 1
+
+    @property
+    def span(self) -> tuple[int, int]:
+        return self.first, self.last
+
+    @property
+    def token(self) -> Token | None:
+        return self.tree.tokens[self.first] if self.is_token else None
+
+    @property
+    def children(self) -> Iterator['SyntaxNode']:
+        if self.is_token:
+            return
+        position = self.first
+        for child in self.green.children:
+            yield SyntaxNode(self.tree, child, self, position)
+            position += child if isinstance(child, int) else child.width
+
+    def ancestors(self) -> Iterator['SyntaxNode']:
+        node = self.parent
+        while node is not None:
+            yield node
+            node = node.parent
+
+    @property
+    def text(self) -> str:
+        return self.tree.text(self.first, self.last)
+
+    def uppercase(self) -> str:
+        return self.tree.uppercase(self.first, self.last)
+
+    def lowercase(self) -> str:
+        return self.tree.lowercase(self.first, self.last)
+
+    def key(self) -> tuple[type | str, str]:
+        # Equal for subtrees of the same kind and text, wherever they are.
+        return self.kind, self.text
+
+    def expression(self) -> Clause | TokenContext | Token:
+        # The typed view of the node: its statement is read again from the
+        # token array, and the clause at the same place in it returned.
+        path = []
+        node = self
+        while node.parent is not None and node.parent.parent is not None:
+            path.append(next(i for i, child in enumerate(node.parent.children) if child == node))
+            node = node.parent
+        tree = self.tree
+        reader = Reader(tree.tokens)
+        if node.parent is None:
+            StatementList._retype(tree.tokens, node.first, node.last + 1)
+            reader.restore(node.first)
+            expression = BlockExpression.consume(reader)
+        elif node.is_token:
+            return self._leaf()
+        elif node.kind is Clause:
+            # Whitespace and comments between statements.
+            expression = Clause([tree.tokens[node.first]])
+        else:
+            StatementList._retype(tree.tokens, node.first, node.last + 1)
+            reader.restore(node.first)
+            expression = reader.run(BlockExpression._consume_statement(reader))
+        for i in reversed(path):
+            expression = [child for child in expression.tokens if child is not None][i]
+        if (self.is_token and not isinstance(expression, (TokenContext, Token))) \
+                or (not self.is_token and type(expression) is not self.kind):
+            raise ValueError(f"{self!r} was read again as {type(expression).__name__}")
+        return expression
+
+    def _leaf(self) -> TokenContext:
+        tokens = self.tree.tokens
+        return TokenContext(tokens[self.first], tokens[self.first + 1:self.last + 1], self.kind)
+
+def _start(token: Token) -> int:
+    return token.leading[0].start if token.leading else token.start
+
+def _end(token: Token) -> int:
+    last = token.trailing[-1] if token.trailing else token
+    return last.start + len(last.value)
@@ -0,0 +1,106 @@
+from array import array
+import codecs
+import mmap
+from typing import Iterable, Iterator
+from parsing.tokenizer import LineIndex, Token, Tokenizer
+
+
+class TokenStore:
+    # Tokens kept as (type, start, length) columns pointing into the source.
+    # The source is either a str, or a bytes-like buffer (such as an mmap) with
+    # an encoding, in which case offsets are byte offsets. Token objects are
+    # only built when an entry is read.
+
+    TYPES = [
+        Token.QUOTED_IDENTIFIER,
+        Token.WORD,
+        Token.KEYWORD,
+        Token.IDENTIFIER,
+        Token.WHITESPACE,
+        Token.NEWLINE,
+        Token.COMMENT,
+        Token.VARIABLE,
+        Token.TEMP_TABLE,
+        Token.SYMBOL,
+        Token.NUMBER,
+    ]
+    TYPE_IDS = {type: i for i, type in enumerate(TYPES)}
+
+    def __init__(self, source: str | bytes | mmap.mmap, encoding: str=None):
+        self.source = source
+        self.encoding = encoding
+        self.types = array('B')
+        self.starts = array('q')
+        self.lengths = array('I')
+        self._cached_index = -1
+        self._cached_token: Token = None
+        self._lines: LineIndex = None
+
+    @classmethod
+    def from_tokens(cls, tokens: Iterable[Token], source: str) -> 'TokenStore':
+        store = cls(source)
+        for token in tokens:
+            store.append(token.type, token.start, len(token.value))
+        return store
+
+    @classmethod
+    def tokenize(cls, sql: str, regex: bool=True) -> 'TokenStore':
+        return cls.from_tokens(Tokenizer(sql, regex).tokens(), sql)
+
+    @classmethod
+    def open(cls, path: str, encoding: str='utf-8', chunk_size: int=1 << 16, regex: bool=True) -> 'TokenStore':
+        # The encoding must be ASCII-compatible (utf-8, cp1252, latin-1, ...).
+        with open(path, 'rb') as f:
+            try:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                buffer = b''
+        store = cls(buffer, encoding)
+        size_encoding = 'utf-8' if codecs.lookup(encoding).name == 'utf-8-sig' else encoding
+        position = len(codecs.BOM_UTF8) if size_encoding != encoding and buffer[:3] == codecs.BOM_UTF8 else 0
+        with open(path, encoding=encoding, newline='') as stream:
+            for token in Tokenizer.iter_tokens(stream, chunk_size, regex):
+                value = token.value
+                length = len(value) if value.isascii() else len(value.encode(size_encoding))
+                store.append(token.type, position, length)
+                position += length
+        return store
+
+    def append(self, type: str, start: int, length: int):
+        self.types.append(self.TYPE_IDS[type])
+        self.starts.append(start)
+        self.lengths.append(length)
+
+    def text(self, index: int) -> str:
+        start = self.starts[index]
+        value = self.source[start:start + self.lengths[index]]
+        if self.encoding is not None:
+            value = str(value, self.encoding)
+        return value
+
+    @property
+    def lines(self) -> LineIndex:
+        # Built once, on first use. Over a bytes-like source, columns are byte
+        # columns, like the offsets: 'é' counts as two in utf-8.
+        if self._lines is None:
+            self._lines = LineIndex(self.source)
+        return self._lines
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def __getitem__(self, index: int | slice) -> Token | list[Token]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if index == self._cached_index:
+            return self._cached_token
+        token = Token(self.TYPES[self.types[index]], self.text(index), self.starts[index])
+        self._cached_index = index
+        self._cached_token = token
+        return token
+
+    def __iter__(self) -> Iterator[Token]:
+        for i in range(len(self)):
+            yield self[i]
@@ -1,3 +1,10 @@
+from bisect import bisect_right
+import copy
+import re
+from typing import Generator, Iterable, TextIO
+from parsing.keywords import Keyword, classify
+
+
 class Token:
 
     QUOTED_IDENTIFIER = 'QUOTED_IDENTIFIER'
@@ -12,68 +19,299 @@ class Token:
     SYMBOL = 'SYMBOL'
     NUMBER = 'NUMBER'
 
-    def __init__(self, type: str, value: str):
+    CASELESS = (SYMBOL, NUMBER, WHITESPACE, NEWLINE)
+    TRIVIA = (WHITESPACE, NEWLINE, COMMENT)
+
+    __slots__ = ('type', 'value', 'start', 'lower', 'keyword', 'leading', 'trailing')
+
+    def __init__(self, type: str, value: str, start: int=None):
         self.type = type
         self.value = value
+        self.start = start
+        # Whitespace and comments around the token, when the tokenizer attaches
+        # them instead of emitting them as tokens of their own.
+        self.leading: tuple[Token, ...] = ()
+        self.trailing: tuple[Token, ...] = ()
+        if type == Token.WORD:
+            self.lower, self.keyword = classify(value)
+        else:
+            # Symbols, numbers and whitespace have no case to fold.
+            self.lower = value if type in Token.CASELESS else value.lower()
+            self.keyword = Keyword.NONE
 
     def __repr__(self):
         return f"Token({self.type}, '{self.value.replace('\n', '\\n').replace('\r', '\\r')}')"
     
     def __str__(self):
-        return self.value
+        return self.render(self.value)
     
     def uppercase(self):
-        return self.value.upper()
+        return self.render(self.value if self.type == Token.COMMENT else self.value.upper())
+
+    def lowercase(self):
+        return self.render(self.value if self.type == Token.COMMENT else self.value.lower())
+
+    def render(self, value: str) -> str:
+        if self.leading or self.trailing:
+            return ''.join(token.value for token in self.leading) + value + ''.join(token.value for token in self.trailing)
+        return value
+
+    def strip(self) -> 'Token':
+        if not (self.leading or self.trailing):
+            return self
+        token = copy.copy(self)
+        token.leading = token.trailing = ()
+        return token
+
+def with_attached_trivia(tokens: Iterable[Token]) -> Generator[Token]:
+    # Trivia goes to the trailing side of the token before it, the way
+    # TokenContext already collects it; only trivia at the very start of the
+    # script is leading.
+    trivia = []
+    previous = None
+    for token in tokens:
+        if token.type in Token.TRIVIA:
+            trivia.append(token)
+            continue
+        if trivia:
+            if previous is None:
+                token.leading = tuple(trivia)
+            else:
+                previous.trailing = tuple(trivia)
+            trivia = []
+        if previous is not None:
+            yield previous
+        previous = token
+    if previous is None:
+        # Nothing significant to attach to.
+        yield from trivia
+    else:
+        if trivia:
+            previous.trailing = tuple(trivia)
+        yield previous
+
+class LineIndex:
+
+    NEWLINE = re.compile(r'\n\r?|\r\n?')
+    BYTES_NEWLINE = re.compile(rb'\n\r?|\r\n?')
+
+    def __init__(self, sql: str, offset: int=0, line: int=0, line_start: int=0):
+        # offset is where sql starts in the whole script; line and line_start
+        # locate the line that is open at that point.
+        self.sql = sql
+        self.offset = offset
+        self.line = line
+        self.line_start = line_start
+        self._starts: list[int] = None
+
+    @property
+    def starts(self) -> list[int]:
+        if self._starts is None:
+            self._starts = [self.line_start]
+            pattern = self.NEWLINE if isinstance(self.sql, str) else self.BYTES_NEWLINE
+            self._starts.extend(self.offset + match.end() for match in pattern.finditer(self.sql))
+        return self._starts
+
+    def line_and_column(self, offset: int) -> tuple[int, int]:
+        index = bisect_right(self.starts, offset) - 1
+        return self.line + index, offset - self.starts[index]
+
+def build_trie(words: list[str]) -> dict:
+    root = {}
+    for word in words:
+        node = root
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = word
+    return root
+
+def compile_pattern(operators: list[str]) -> re.Pattern:
+    # One alternative per token type, named after the type it produces. Anything
+    # this pattern cannot decide on its own (non-ASCII words and numbers, errors)
+    # falls through to the character engine, so both engines emit the same stream.
+    compound = ''.join(re.escape(operator) + '|' for operator in sorted(operators, key=len, reverse=True))
+    return re.compile(r"""
+          (?P<COMMENT>--[^\n\r]*)
+        | (?P<NEWLINE>\n\r?|\r)
+        | (?P<WHITESPACE>[^\S\n\r]\s*)
+        | (?P<WORD>[A-Za-z_]\w*)
+        | (?P<QUOTED_IDENTIFIER>'[^']*'|"[^"]*"|`[^`]*`|\[[^\]]*\])
+        | (?P<NUMBER>(?>[0-9]+(?:\.[0-9]*)?)(?![^\x00-\x7f]))
+        | (?P<VARIABLE>@@?\w+)
+        | (?P<TEMP_TABLE>\#\w+)
+        | (?P<SYMBOL>""" + compound + r"""[-+*/=(),;.><!])
+    """, re.VERBOSE)
 
 class Tokenizer:
 
-    def __init__(self, sql: str):
+    OPERATORS = ['<>', '<=', '>=', '!=', '!<', '!>']
+    OPERATOR_TRIE = build_trie(OPERATORS)
+    PATTERN = compile_pattern(OPERATORS)
+    SPLIT_PATTERN = compile_pattern([])
+
+    def __init__(self, sql: str, regex: bool=False, offset: int=0, compound_operators: bool=True, attach_trivia: bool=False):
         self.sql = sql
         self._position = 0
         self.length = len(sql)
+        self.regex = regex
+        self.offset = offset
+        self.compound_operators = compound_operators
+        self.attach_trivia = attach_trivia
+        self.pattern = self.PATTERN if compound_operators else self.SPLIT_PATTERN
+        self.lines = LineIndex(sql, offset)
+        self._exhausted = False
 
     @property
     def _curr(self) -> str:
         if self._position < self.length:
             return self.sql[self._position]
+        self._exhausted = True
         return None
 
+    @classmethod
+    def iter_tokens(
+            cls,
+            stream: TextIO,
+            chunk_size: int=1 << 16,
+            regex: bool=True,
+            compound_operators: bool=True,
+            attach_trivia: bool=False
+        ) -> Generator[Token]:
+        tokens = cls._iter_chunks(stream, chunk_size, regex, compound_operators)
+        return with_attached_trivia(tokens) if attach_trivia else tokens
+
+    @classmethod
+    def _iter_chunks(cls, stream: TextIO, chunk_size: int, regex: bool, compound_operators: bool) -> Generator[Token]:
+        buffer = ''
+        offset = line = line_start = 0
+        size = chunk_size
+        eof = False
+        while not eof:
+            chunk = stream.read(size)
+            eof = not chunk
+            buffer += chunk
+            tokenizer = cls(buffer, regex, offset, compound_operators)
+            tokenizer.lines = LineIndex(buffer, offset, line, line_start)
+            yield from tokenizer._complete_tokens(eof)
+            consumed = tokenizer._position
+            if consumed:
+                line, column = tokenizer.lines.line_and_column(offset + consumed)
+                line_start = offset + consumed - column
+                buffer = buffer[consumed:]
+                offset += consumed
+                size = chunk_size
+            else:
+                # A single token is longer than the buffer; read more at a time
+                # so it is not rescanned once per chunk.
+                size *= 2
+
     def parse(self) -> list[Token]:
         tokens = []
-        while self._curr is not None:
-            char = self._curr
-            if char == '-':
-                tokens.append(self._consume_comment_or_dash())
-            elif char in '+-*/=(),;':
-                tokens.append(Token(Token.SYMBOL, char))
-                self._position += 1
-                continue
-            elif char in '\n\r':
-                tokens.append(self._consume_newline())
-            elif char.isspace():
-                tokens.append(self._consume_whitespace())
-            elif char.isalpha() or char == '_':
-                tokens.append(self._consume_word())
-            elif char in '\'"`':
-                tokens.append(self._consume_quoted_identifier(char))
-            elif char == '[':
-                tokens.append(self._consume_quoted_identifier(']'))
-            elif char.isdigit():
-                tokens.append(self._consume_number())
-            elif char == '@':
-                tokens.append(self._consume_variable())
-            elif char == '#':
-                tokens.append(self._consume_temp_table())
-            elif char in '.><=+-!':
-                tokens.append(self._consume_symbol())
-            elif char == ']':
-                print('\n'.join(map(repr, tokens)))
-                raise ValueError(f"Unmatched closing bracket at {self._get_line_and_column()}")
-            else:
-                line, col = self._get_line_and_column()
-                raise ValueError(f"Unexpected character '{char}' ({hex(ord(char))}) at line {line + 1}, column {col + 1}. {self.sql[:self._position + 1]}")
+        consume = self._consume_match if self.regex else self._consume_token
+        while self._position < self.length:
+            tokens.append(consume())
+        if self.attach_trivia:
+            return list(with_attached_trivia(tokens))
+        return tokens
+
+    def parse_range(self, start: int, end: int) -> list[Token]:
+        # Tokens from start, which must be a token boundary, until one reaches
+        # end. The last may run past end, as it would in the whole text.
+        self._position = start
+        tokens = []
+        consume = self._consume_match if self.regex else self._consume_token
+        while self._position < min(end, self.length):
+            tokens.append(consume())
         return tokens
 
+    def tokens(self) -> Generator[Token]:
+        tokens = self._complete_tokens(True)
+        return with_attached_trivia(tokens) if self.attach_trivia else tokens
+
+    def scan(self) -> Generator[Token]:
+        # Tokens for any text, for tools that look only at tokens and must not
+        # stop where the tokenizer would: /* */ comments are COMMENTs, an
+        # unterminated quote runs to the end of the text, and any character
+        # that cannot start a token is a SYMBOL of its own.
+        sql = self.sql
+        while self._position < self.length:
+            position = self._position
+            if sql.startswith('/*', position):
+                end = sql.find('*/', position + 2)
+                self._position = self.length if end < 0 else end + 2
+                yield Token(Token.COMMENT, sql[position:self._position], self.offset + position)
+                continue
+            try:
+                yield self._consume_match()
+            except (ValueError, AssertionError):
+                if sql[position] in '\'"`[':
+                    self._position = self.length
+                    yield Token(Token.QUOTED_IDENTIFIER, sql[position:], self.offset + position)
+                else:
+                    self._position = position + 1
+                    yield Token(Token.SYMBOL, sql[position], self.offset + position)
+
+    def _complete_tokens(self, final: bool) -> Generator[Token]:
+        # Unless this is the end of the input, a token that reaches the end of
+        # the buffer (or fails because it ran out of input) may continue in the
+        # next chunk, so it is left unconsumed for the next pass.
+        consume = self._consume_match if self.regex else self._consume_token
+        while self._position < self.length:
+            position = self._position
+            self._exhausted = False
+            try:
+                token = consume()
+            except (ValueError, AssertionError):
+                if final or not self._exhausted:
+                    raise
+                self._position = position
+                return
+            if not final and self._position == self.length:
+                self._position = position
+                return
+            yield token
+
+    def _consume_match(self) -> Token:
+        match = self.pattern.match(self.sql, self._position)
+        if match is None:
+            return self._consume_token()
+        self._position = match.end()
+        return Token(match.lastgroup, match.group(), self.offset + match.start())
+
+    def _consume_token(self) -> Token:
+        start = self._position
+        token = self._dispatch(self._curr)
+        token.start = self.offset + start
+        return token
+
+    def _dispatch(self, char: str) -> Token:
+        if char == '-':
+            return self._consume_comment_or_dash()
+        elif char in '+-*/=(),;':
+            return self._consume_symbol()
+        elif char in '\n\r':
+            return self._consume_newline()
+        elif char.isspace():
+            return self._consume_whitespace()
+        elif char.isalpha() or char == '_':
+            return self._consume_word()
+        elif char in '\'"`':
+            return self._consume_quoted_identifier(char)
+        elif char == '[':
+            return self._consume_quoted_identifier(']')
+        elif char.isdigit():
+            return self._consume_number()
+        elif char == '@':
+            return self._consume_variable()
+        elif char == '#':
+            return self._consume_temp_table()
+        elif char in '.><=+-!':
+            return self._consume_symbol()
+        elif char == ']':
+            self._raise_error("Unmatched closing bracket")
+        else:
+            self._raise_error(f"Unexpected character '{char}' ({hex(ord(char))})")
+
     def _consume_whitespace(self) -> Token:
         if not self._curr.isspace() or self._curr in '\n\r':
             raise Exception("Cannot call on non-whitespace")
@@ -98,6 +336,7 @@ class Tokenizer:
         if self._curr == quote_char:
             self._position += 1
             return Token(Token.QUOTED_IDENTIFIER, self.sql[start:self._position])
+        self._position = start
         self._raise_error("Unterminated quoted identifier")
 
     def _consume_comment_or_dash(self) -> Token:
@@ -125,18 +364,12 @@ class Tokenizer:
         assert ch == '@'
         if self._curr == '@':
             ch += self._read()
-        token = self._consume_word()
-        token.type = Token.VARIABLE
-        token.value = ch + token.value
-        return token
+        return Token(Token.VARIABLE, ch + self._consume_word().value)
 
     def _consume_temp_table(self) -> Token:
         ch = self._read()
         assert ch == '#'
-        token = self._consume_word()
-        token.type = Token.TEMP_TABLE
-        token.value = ch + token.value
-        return token
+        return Token(Token.TEMP_TABLE, ch + self._consume_word().value)
     
     def _consume_newline(self) -> Token:
         assert self._curr in '\n\r'
@@ -148,24 +381,12 @@ class Tokenizer:
         else:
             return Token(Token.NEWLINE, '\r')
     
-    def _get_line_and_column(self) -> Token:
-        pos = 0
-        line = 0
-        col = 0
-        while pos < self._position:
-            col += 1
-            if self.sql[pos] == '\n':
-                line += 1
-                col = 0
-                pos += 1
-                if self.sql[pos] == '\r':
-                    pos += 1
-            else:
-                if self.sql[pos] == '\r':
-                    line += 1
-                    col = 0
-                pos += 1
-        return line, col
+    def _get_line_and_column(self) -> tuple[int, int]:
+        return self.lines.line_and_column(self.offset + self._position)
+
+    def _raise_error(self, message: str):
+        line, col = self._get_line_and_column()
+        raise ValueError(f"{message} at line {line + 1}, column {col + 1}")
     
     def _read(self):
         ch = self._curr
@@ -173,4 +394,17 @@ class Tokenizer:
         return ch
 
     def _consume_symbol(self) -> Token:
-        return Token(Token.SYMBOL, self._read())
\ No newline at end of file
+        start = self._position
+        self._position += 1
+        if self.compound_operators:
+            # Longest operator in the trie that starts here, else the single symbol.
+            node = self.OPERATOR_TRIE.get(self.sql[start], {})
+            position = self._position
+            while True:
+                if '' in node:
+                    self._position = position
+                if position >= self.length or self.sql[position] not in node:
+                    break
+                node = node[self.sql[position]]
+                position += 1
+        return Token(Token.SYMBOL, self.sql[start:self._position])
\ No newline at end of file
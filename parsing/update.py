@@ -3,6 +3,7 @@ from parsing.expressions.scalar_expression import BooleanExpression, ColumnIdent
 from parsing.reader import Reader
 
 class ColumnUpdateExpression(Clause):
+    __slots__ = ('column', 'comma')
 
     def __init__(self, column, equals, val, comma):
         super().__init__([column, equals, val, comma])
@@ -23,6 +24,7 @@ class ColumnUpdateExpression(Clause):
         )
 
 class UpdateExpression(Clause):
+    __slots__ = ()
 
     def __init__(self, update, table, _set, updates, where, predicate):
         super().__init__([update, table, _set, *updates, where, predicate])
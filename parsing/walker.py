@@ -0,0 +1,104 @@
+from typing import Callable, Iterator
+from parsing.expressions.clause import Clause
+from parsing.expressions.token_context import TokenContext
+from parsing.tokenizer import Token
+
+# Walking a parse tree without recursing and without rendering it.
+#
+# A clause's children are its tokens, in source order: nested clauses, and the
+# TokenContexts of its keywords, names and symbols. Slots that were left empty
+# (an optional keyword that was absent) are None and never visited.
+
+PRE = 'pre'
+POST = 'post'
+
+def walk(
+        node: Clause,
+        types: type | tuple[type, ...]=None,
+        order: str=PRE,
+        tokens: bool=False,
+        prune: Callable[[Clause], bool]=None,
+    ) -> Iterator[Clause | TokenContext]:
+    # The node and its descendants, parents before children (PRE) or after
+    # them (POST). Only instances of types are yielded, when given, and
+    # TokenContexts only with tokens=True. Children of a clause prune accepts
+    # are skipped. Stop iterating to stop the walk.
+    if order not in (PRE, POST):
+        raise ValueError(f"Unknown order '{order}'")
+    pre = order == PRE
+    if pre and (types is None or isinstance(node, types)):
+        yield node
+    if prune is not None and prune(node):
+        if not pre and (types is None or isinstance(node, types)):
+            yield node
+        return
+    stack = [(node, iter(node.tokens))]
+    while stack:
+        clause, children = stack[-1]
+        for child in children:
+            if child is None:
+                continue
+            if isinstance(child, Clause):
+                if pre and (types is None or isinstance(child, types)):
+                    yield child
+                if prune is None or not prune(child):
+                    stack.append((child, iter(child.tokens)))
+                    break
+                if not pre and (types is None or isinstance(child, types)):
+                    yield child
+            elif tokens and isinstance(child, TokenContext) and (types is None or isinstance(child, types)):
+                yield child
+        else:
+            stack.pop()
+            if not pre and (types is None or isinstance(clause, types)):
+                yield clause
+
+def find(node: Clause, types: type | tuple[type, ...], predicate: Callable[[Clause], bool]=None) -> Clause | None:
+    # The first clause of types, in source order, that predicate accepts.
+    for clause in walk(node, types):
+        if predicate is None or predicate(clause):
+            return clause
+    return None
+
+class Visitor:
+    # Calls visit_<ClassName> for each clause, in source order, falling back
+    # on the methods for its base classes and then on generic_visit. A visit
+    # method returns SKIP to leave the clause's children out, or STOP to end
+    # the walk; anything else carries on.
+
+    SKIP = object()
+    STOP = object()
+
+    def visit(self, node: Clause):
+        stack = [iter((node,))]
+        while stack:
+            for child in stack[-1]:
+                if child is None or isinstance(child, Token):
+                    continue
+                result = self._dispatch(type(child))(self, child)
+                if result is Visitor.STOP:
+                    return
+                if result is not Visitor.SKIP and isinstance(child, Clause):
+                    stack.append(iter(child.tokens))
+                    break
+            else:
+                stack.pop()
+
+    def generic_visit(self, node: Clause | TokenContext):
+        pass
+
+    @classmethod
+    def _dispatch(cls, node_type: type) -> Callable:
+        # One lookup per visitor class and node class, built on first use.
+        table = cls.__dict__.get('_methods')
+        if table is None:
+            table = {}
+            setattr(cls, '_methods', table)
+        method = table.get(node_type)
+        if method is None:
+            method = next(
+                (getattr(cls, f'visit_{base.__name__}') for base in node_type.__mro__ if hasattr(cls, f'visit_{base.__name__}')),
+                cls.generic_visit,
+            )
+            table[node_type] = method
+        return method
@@ -0,0 +1,34 @@
+import unittest
+from benchmarks.corpus import DEEP_WORKLOADS, WORKLOADS, generate
+from benchmarks.run import benchmark
+from tests.utilities import parse
+
+
+class TestCorpus(unittest.TestCase):
+
+    def test_deterministic(self):
+        for workload in WORKLOADS:
+            with self.subTest(workload=workload):
+                self.assertEqual(generate(workload, 20, seed=1), generate(workload, 20, seed=1))
+                self.assertNotEqual(generate(workload, 20, seed=1), generate(workload, 20, seed=2))
+
+    def test_workloads_parse(self):
+        for workload in WORKLOADS:
+            with self.subTest(workload=workload):
+                parse(generate(workload, 20)).uppercase()
+
+    def test_deep_workloads_parse(self):
+        for workload, generate_deep in DEEP_WORKLOADS.items():
+            with self.subTest(workload=workload):
+                sql = generate_deep(50)
+                self.assertEqual(sql, str(parse(sql)))
+
+    def test_benchmark_reports_each_stage(self):
+        result = benchmark('inserts', generate('inserts', 10), repeat=1, regex=True)
+        self.assertEqual(10, result['statements'])
+        self.assertEqual(['tokenizer', 'parser', 'uppercase', 'format'], list(result['stages']))
+        for stage in result['stages'].values():
+            self.assertGreater(stage['tokens_per_second'], 0)
+            self.assertGreater(stage['peak_memory_bytes'], 0)
+        self.assertGreater(result['retained_memory_bytes'], 0)
+        self.assertEqual(result['retained_memory_bytes'] / result['tokens'], result['bytes_per_token'])
@@ -1,7 +1,7 @@
 from tests.utilities import read
 import unittest
 
-from parsing.expressions.scalar_expression import BooleanExpression, BooleanOperationExpression, ComparisonExpression, InExpression, ScalarExpression, ParentheticalScalarExpression
+from parsing.expressions.scalar_expression import AdditionSubtractionExpression, BooleanExpression, BooleanOperationExpression, ComparisonExpression, InExpression, LikeExpression, MultiplicationDivisionExpression, NegativeExpression, NotExpression, ScalarExpression, ParentheticalScalarExpression
 from parsing.expressions.select_expression import SelectExpression
 from parsing.reader import Reader
 from parsing.tokenizer import Tokenizer
@@ -51,4 +51,50 @@ class TestBooleanExpressionParsing(unittest.TestCase):
         # Left side should be a parenthesized NOT expression
         self.assertIsInstance(boolean.left, ParentheticalScalarExpression)
         # Right side should be a comparison expression
-        self.assertIsInstance(boolean.right, BooleanOperationExpression)
\ No newline at end of file
+        self.assertIsInstance(boolean.right, BooleanOperationExpression)
+
+    def test_and_binds_tighter_than_comparison_operands(self):
+        """A = 1 AND B = 2"""
+        boolean = ScalarExpression.consume(read("A = 1 AND B = 2"))
+        self.assertEqual(boolean.operator.operator.token.value, 'AND')
+        self.assertEqual(str(boolean.left), 'A = 1 ')
+        self.assertEqual(str(boolean.right), 'B = 2')
+
+    def test_or_binds_loosest(self):
+        """A = 1 OR B = 2 AND C = 3"""
+        boolean = ScalarExpression.consume(read("A = 1 OR B = 2 AND C = 3"))
+        self.assertEqual(boolean.operator.operator.token.value, 'OR')
+        self.assertEqual(boolean.right.operator.operator.token.value, 'AND')
+
+    def test_not_applies_to_comparison(self):
+        """A = 1 AND NOT B = 2 OR C = 3"""
+        boolean = ScalarExpression.consume(read("A = 1 AND NOT B = 2 OR C = 3"))
+        self.assertEqual(boolean.operator.operator.token.value, 'OR')
+        self.assertIsInstance(boolean.left.right, NotExpression)
+        self.assertIsInstance(boolean.left.right.expression, BooleanOperationExpression)
+
+    def test_arithmetic_precedence(self):
+        """A + B * C - D / 2"""
+        scalar = ScalarExpression.consume(read("A + B * C - D / 2"))
+        self.assertIsInstance(scalar, AdditionSubtractionExpression)
+        self.assertEqual(scalar.operator.token.value, '-')
+        self.assertIsInstance(scalar.left.right, MultiplicationDivisionExpression)
+        self.assertIsInstance(scalar.right, MultiplicationDivisionExpression)
+        self.assertEqual('A + B * C - D / 2', str(scalar))
+
+    def test_comparison_of_arithmetic(self):
+        """-A * 2 >= B + 1 AND C LIKE 'x%'"""
+        reader = read("-A * 2 >= B + 1 AND C LIKE 'x%'")
+        boolean = ScalarExpression.consume(reader)
+        self.assertTrue(reader.eof)
+        comparison = boolean.left
+        self.assertEqual(comparison.operator.operator.token.value, '>=')
+        self.assertIsInstance(comparison.left, MultiplicationDivisionExpression)
+        self.assertIsInstance(comparison.left.left, NegativeExpression)
+        self.assertIsInstance(comparison.right, AdditionSubtractionExpression)
+        self.assertIsInstance(boolean.right, LikeExpression)
+
+    def test_multiplication_in_select(self):
+        """select Price * Quantity as Total from Lines"""
+        select: SelectExpression = parse("select Price * Quantity as Total from Lines").expressions[0]
+        self.assertIsInstance(select.projection[0].expression, MultiplicationDivisionExpression)
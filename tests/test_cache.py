@@ -0,0 +1,87 @@
+import pickle
+import tempfile
+import unittest
+from unittest import mock
+from benchmarks.corpus import DEEP_WORKLOADS
+from parsing.cache import ParseCache, parse_sql, parser_version
+from parsing.expressions import block_expression
+from parsing.expressions.clause import Clause
+from parsing.keywords import keyword_id
+from parsing.tokenizer import Tokenizer
+from tests.utilities import keep_keywords
+
+
+class TestParseCache(unittest.TestCase):
+
+    SQL = "declare @id int\r\nselect a, b from #t t -- comment\r\nwhere t.a >= @id\r\n"
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_hit_skips_tokenizer(self):
+        block = ParseCache(self.directory.name).parse(self.SQL)
+        with mock.patch.object(Tokenizer, 'parse', side_effect=AssertionError('tokenized again')):
+            cached = ParseCache(self.directory.name).parse(self.SQL)
+        self.assertEqual(str(block), str(cached))
+        self.assertEqual(block.uppercase(), cached.uppercase())
+
+    def test_tokens_are_shared_with_tree(self):
+        cache = ParseCache(self.directory.name)
+        cache.parse(self.SQL)
+        tokens, block = cache.get(self.SQL)
+        self.assertEqual(self.SQL, ''.join(map(str, tokens)))
+        self.assertIs(tokens[0], block.expressions[0].tokens[0].token)
+
+    def test_changed_content_misses(self):
+        cache = ParseCache(self.directory.name)
+        cache.parse(self.SQL)
+        self.assertIsNone(cache.get(self.SQL + ' '))
+
+    def test_changed_parser_version_misses(self):
+        ParseCache(self.directory.name).parse(self.SQL)
+        self.assertIsNotNone(ParseCache(self.directory.name, parser_version()).get(self.SQL))
+        self.assertIsNone(ParseCache(self.directory.name, 'another version').get(self.SQL))
+
+    def test_registered_statement_misses(self):
+        """Registering a statement changes how scripts parse, so it changes the key."""
+        cache = ParseCache(self.directory.name)
+        cache.parse(self.SQL)
+        keep_keywords(self)
+        block_expression.register_statement('print', lambda reader: Clause([reader.expect_word('print')]))
+        self.addCleanup(block_expression.STATEMENTS.pop, keyword_id('print'))
+        self.assertIsNone(cache.get(self.SQL))
+        self.assertIsNone(ParseCache(self.directory.name).get(self.SQL))
+
+    def test_corrupt_entry_is_reparsed(self):
+        cache = ParseCache(self.directory.name)
+        cache.parse(self.SQL)
+        cache.path(self.SQL).write_bytes(b'not a pickle')
+        self.assertIsNone(cache.get(self.SQL))
+        self.assertEqual(self.SQL, str(cache.parse(self.SQL)))
+        self.assertIsNotNone(cache.get(self.SQL))
+
+    def test_deep_tree_is_parsed_but_not_cached(self):
+        """A tree too deep to pickle is still returned, and leaves nothing behind."""
+        sql = DEEP_WORKLOADS['blocks'](2000)
+        cache = ParseCache(self.directory.name)
+        self.assertEqual(sql, str(cache.parse(sql)))
+        self.assertIsNone(cache.get(sql))
+        self.assertEqual([], list(cache.directory.iterdir()))
+
+    def test_other_errors_are_raised(self):
+        cache = ParseCache(self.directory.name)
+        with mock.patch.object(pickle, 'dump', side_effect=OSError('disk full')):
+            with self.assertRaisesRegex(OSError, 'disk full'):
+                cache.parse(self.SQL)
+        self.assertEqual([], list(cache.directory.iterdir()))
+
+    def test_parallel_parse_is_cached(self):
+        sql = "select a from t x\r\ngo\r\nselect b from u y\r\n"
+        cache = ParseCache(self.directory.name)
+        self.assertEqual(sql, str(cache.parse(sql, jobs=2)))
+        tokens, block = cache.get(sql)
+        self.assertIsNone(tokens)
+        self.assertEqual(sql, str(block))
+        with mock.patch.object(Tokenizer, 'parse', side_effect=AssertionError('parsed again')):
+            self.assertEqual(sql, str(parse_sql(sql, jobs=2, cache=cache)))
@@ -0,0 +1,164 @@
+import io
+import os
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from unittest import mock
+from benchmarks.corpus import WORKLOADS, generate
+from formatting import KEYWORDS, FileFormatter, FormatCache, LowerCaseFormatter, UpperCaseFormatter, expand, write_sql
+from parsing.expressions.clause import Clause
+from parsing.keywords import KEYWORD_IDS
+
+
+class TestCaseFormatter(unittest.TestCase):
+
+    def test_keywords_are_cased(self):
+        self.assertEqual(
+            "SELECT a, b FROM dbo.Orders o WHERE a IS NOT NULL ORDER BY b DESC",
+            UpperCaseFormatter().format("select a, b from dbo.Orders o where a is not null order by b desc"))
+        self.assertEqual(
+            "insert into t (Id) values (1)",
+            LowerCaseFormatter().format("INSERT INTO t (Id) VALUES (1)"))
+
+    def test_identifiers_strings_and_comments_are_kept(self):
+        sql = "select [Select], 'from', @Where, #Temp from t -- order by\n/* group by */"
+        self.assertEqual(
+            "SELECT [Select], 'from', @Where, #Temp FROM t -- order by\n/* group by */",
+            UpperCaseFormatter().format(sql))
+
+    def test_members_are_identifiers(self):
+        self.assertEqual("SELECT o.key, o.Date FROM t o", UpperCaseFormatter().format("select o.key, o.Date from t o"))
+        self.assertEqual("select KEY.X from T", LowerCaseFormatter().format("SELECT KEY.X FROM T"))
+
+    def test_functions_are_keywords_when_called(self):
+        self.assertEqual(
+            "SELECT MAX(Year), YEAR(Date), Year FROM t",
+            UpperCaseFormatter().format("select max(Year), year(Date), Year from t"))
+
+    def test_types_are_keywords_where_declared(self):
+        self.assertEqual(
+            "DECLARE @d DATE, @n NVARCHAR(MAX)\n"
+            "CREATE TABLE #t (Id INT, Created DATE NOT NULL)\n"
+            "SELECT CAST(@d AS DATE), date FROM t",
+            UpperCaseFormatter().format(
+                "declare @d date, @n nvarchar(max)\n"
+                "create table #t (Id int, Created date not null)\n"
+                "select cast(@d as date), date from t"))
+
+    def test_contextual_keywords(self):
+        self.assertEqual(
+            "FETCH NEXT FROM c INTO @a\nSELECT next FROM t CROSS APPLY f(t.Id)\nBEGIN TRY SELECT 1 END TRY",
+            UpperCaseFormatter().format(
+                "fetch next from c into @a\nselect next from t cross apply f(t.Id)\nbegin try select 1 end try"))
+
+    def test_unsupported_syntax(self):
+        """Anything the parser or the tokenizer cannot read is kept as written."""
+        sql = "merge t using s on t.Id = s.Id when matched then update set a = b % 2;\nselect ~x, a & b from t where 'unterminated"
+        self.assertEqual(
+            "MERGE t using s ON t.Id = s.Id WHEN matched THEN UPDATE SET a = b % 2;\nSELECT ~x, a & b FROM t WHERE 'unterminated",
+            UpperCaseFormatter().format(sql))
+
+    def test_only_case_changes(self):
+        for workload in WORKLOADS:
+            with self.subTest(workload=workload):
+                sql = generate(workload, 20)
+                upper = UpperCaseFormatter().format(sql)
+                self.assertEqual(sql.lower(), upper.lower())
+                self.assertEqual(upper, UpperCaseFormatter().format(LowerCaseFormatter().format(upper)))
+
+    def test_write(self):
+        stream = io.StringIO()
+        UpperCaseFormatter().write("select 1", stream)
+        self.assertEqual("SELECT 1", stream.getvalue())
+
+    def test_parser_keywords_are_classified(self):
+        self.assertEqual([], [word for word in KEYWORD_IDS if word not in KEYWORDS])
+
+
+class TestFileFormatter(unittest.TestCase):
+
+    FILES = {
+        'one.sql': b"select a from t x\r\n",
+        'nested/two.sql': b"SELECT b FROM t y\n",
+        'nested/deeper/three.sql': b"select caf\xe9 from t z\n",
+        'notes.txt': b"select notes\n",
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        cls.executor = ProcessPoolExecutor(2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name)
+        for name, content in self.FILES.items():
+            (self.root / name).parent.mkdir(parents=True, exist_ok=True)
+            (self.root / name).write_bytes(content)
+
+    def path(self, name: str) -> str:
+        return str(self.root / name)
+
+    def test_expand(self):
+        sql = [self.path('nested/deeper/three.sql'), self.path('nested/two.sql'), self.path('one.sql')]
+        self.assertEqual(sql, expand([str(self.root)]))
+        self.assertEqual(sql[:2], expand([self.path('nested/**/*.sql')]))
+        self.assertEqual([self.path('notes.txt'), sql[1], sql[0], sql[2]], expand([self.path('notes.txt'), self.path('*/two.sql'), str(self.root)]))
+
+    def test_check_writes_nothing(self):
+        changed, errors = FileFormatter(Clause.UPPERCASE, executor=self.executor).run(expand([str(self.root)]))
+        self.assertEqual([self.path('nested/deeper/three.sql'), self.path('one.sql')], changed)
+        self.assertEqual([], errors)
+        for name, content in self.FILES.items():
+            self.assertEqual(content, (self.root / name).read_bytes())
+
+    def test_in_place(self):
+        """Files are rewritten whole, keeping their line endings and bytes that are not UTF-8."""
+        formatter = FileFormatter(Clause.UPPERCASE, executor=self.executor)
+        changed, _ = formatter.run(expand([str(self.root)]), write=True)
+        self.assertEqual(2, len(changed))
+        self.assertEqual(b"SELECT a FROM t x\r\n", (self.root / 'one.sql').read_bytes())
+        self.assertEqual(b"SELECT caf\xe9 FROM t z\n", (self.root / 'nested/deeper/three.sql').read_bytes())
+        self.assertEqual([], [name for name in os.listdir(self.root) if name.endswith('.tmp')])
+        self.assertEqual(([], []), formatter.run(expand([str(self.root)])))
+
+    def test_new_files_get_the_usual_mode(self):
+        umask = os.umask(0o022)
+        try:
+            write_sql(self.path('new.sql'), "SELECT 1\n")
+            os.chmod(self.path('one.sql'), 0o640)
+            write_sql(self.path('one.sql'), "SELECT 1\n")
+        finally:
+            os.umask(umask)
+        self.assertEqual(0o644, os.stat(self.path('new.sql')).st_mode & 0o777)
+        self.assertEqual(0o640, os.stat(self.path('one.sql')).st_mode & 0o777)
+
+    def test_errors_are_reported_per_file(self):
+        (self.root / 'bad.sql').write_text("select % from t\n")
+        paths = [self.path('bad.sql'), self.path('nested/two.sql'), self.path('one.sql')]
+        changed, errors = FileFormatter(Clause.LOWERCASE, parse=True, jobs=1).run(paths)
+        self.assertEqual([self.path('nested/two.sql')], changed)
+        self.assertEqual([self.path('bad.sql')], [path for path, _ in errors])
+        self.assertEqual([], FileFormatter(Clause.LOWERCASE, jobs=1).run([self.path('bad.sql')])[1])
+        self.assertEqual(1, len(FileFormatter(Clause.LOWERCASE, jobs=1).run([self.path('missing.sql')])[1]))
+
+    def test_cache_skips_formatted_files(self):
+        directory = self.root / 'cache'
+        paths = expand([str(self.root)])
+        FileFormatter(Clause.UPPERCASE, jobs=1, cache=FormatCache(directory, Clause.UPPERCASE)).run(paths, write=True)
+        with mock.patch('formatting.format_sql', side_effect=AssertionError('formatted again')):
+            cache = FormatCache(directory, Clause.UPPERCASE)
+            self.assertEqual(([], []), FileFormatter(Clause.UPPERCASE, jobs=1, cache=cache).run(paths))
+            self.assertEqual(3, len(cache.seen))
+        (self.root / 'one.sql').write_bytes(b"select 1\n")
+        changed, _ = FileFormatter(Clause.UPPERCASE, jobs=1, cache=FormatCache(directory, Clause.UPPERCASE)).run(paths)
+        self.assertEqual([self.path('one.sql')], changed)
+        # Other casings and formatter versions have keys of their own.
+        changed, _ = FileFormatter(Clause.LOWERCASE, jobs=1, cache=FormatCache(directory, Clause.LOWERCASE)).run(paths)
+        self.assertEqual([self.path('nested/deeper/three.sql'), self.path('nested/two.sql')], changed)
+        self.assertNotEqual(FormatCache(directory, Clause.UPPERCASE).key(b''), FormatCache(directory, Clause.UPPERCASE, version='other').key(b''))
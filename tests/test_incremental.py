@@ -0,0 +1,94 @@
+import unittest
+from parsing.expressions.token_context import TokenContext
+from parsing.incremental import IncrementalParser
+from tests.utilities import parse
+
+
+def shape(node):
+    if isinstance(node, TokenContext):
+        return (node.token.value, node.token.start, str(node))
+    if not hasattr(node, 'tokens'):
+        return (node.value, node.start)
+    return (type(node).__name__, [shape(child) for child in node.tokens if child is not None])
+
+
+class TestIncrementalParser(unittest.TestCase):
+
+    SQL = (
+        "declare @id int\n"
+        "set @id = 1\n"
+        "select a, b from t x where x.id = @id;\n"
+        "while @id < 10\n"
+        "begin\n"
+        "    set @id = @id + 1\n"
+        "end\n"
+        "go\n"
+        "update t set a = 2 where b = 3\n"
+    )
+
+    def edit(self, parser: IncrementalParser, old: str, new: str, occurrence: int=0):
+        start = -1
+        for _ in range(occurrence + 1):
+            start = parser.sql.index(old, start + 1)
+        before = list(parser.block.expressions) if parser.block else []
+        block = parser.edit(start, start + len(old), new)
+        self.assertEqual(shape(parse(parser.sql)), shape(block))
+        return before, block.expressions
+
+    def test_edit_inside_a_statement(self):
+        """Statements away from the edit are the same objects."""
+        parser = IncrementalParser(self.SQL)
+        before, after = self.edit(parser, '@id + 1', '@id + 2')
+        self.assertEqual(len(before), len(after))
+        self.assertIs(before[0], after[0])
+        self.assertIs(before[1], after[1])
+        self.assertIsNot(before[4], after[4])
+        self.assertIs(before[-1], after[-1])
+
+    def test_offsets_after_the_edit_move(self):
+        parser = IncrementalParser(self.SQL)
+        before, after = self.edit(parser, 'set @id = 1', 'set @id = 1000')
+        self.assertIs(before[-1], after[-1])
+        self.assertEqual(parser.sql.index('update'), after[-1].tokens[0].token.start)
+
+    def test_insert_and_delete_statements(self):
+        parser = IncrementalParser(self.SQL)
+        before, after = self.edit(parser, 'go\n', 'go\nset @id = 2\n')
+        self.assertEqual(len(before) + 1, len(after))
+        self.assertIs(before[-1], after[-1])
+        before, after = self.edit(parser, 'set @id = 2\n', '')
+        self.assertEqual(len(before) - 1, len(after))
+
+    def test_edit_that_changes_the_statement_before(self):
+        """Where a statement ends depends on what follows it."""
+        parser = IncrementalParser("set @b = 0\nselect a from t x\nwhile @a = 1 begin set @a = 2 end\nset @c = 3\n")
+        before, after = self.edit(parser, 'hile @a = 1 begin set @a = 2 end', 'here a = 1')
+        self.assertEqual(3, len(after))
+        self.assertIs(before[0], after[0])
+        self.assertIsNot(before[1], after[1])
+        self.assertIs(before[-1], after[-1])
+
+    def test_edit_that_runs_on(self):
+        """An edit can change the tokens after it: here, into a comment."""
+        parser = IncrementalParser("set @a = 1 set @b = 2\nset @c = 3\n")
+        before, after = self.edit(parser, ' set', ' -- set')
+        self.assertIs(before[-1], after[-1])
+
+    def test_semicolons(self):
+        parser = IncrementalParser("set @a = 1;\nset @b = 2;\nset @c = 3;\n")
+        before, after = self.edit(parser, '2', '20')
+        self.assertIs(before[0], after[0])
+        self.assertIs(before[-1], after[-1])
+
+    def test_error_then_fix(self):
+        parser = IncrementalParser(self.SQL)
+        with self.assertRaises(ValueError):
+            parser.edit(parser.sql.index('= 1'), parser.sql.index('= 1') + 1, '= =')
+        self.edit(parser, '= = 1', '= 1')
+        self.assertEqual(self.SQL, str(parser.block))
+
+    def test_stray_end(self):
+        parser = IncrementalParser("set @a = 1\nend\n")
+        self.edit(parser, '1', '2')
+        self.edit(parser, 'end\n', '')
+        self.edit(parser, '2', '3')
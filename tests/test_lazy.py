@@ -0,0 +1,93 @@
+import unittest
+from benchmarks.corpus import WORKLOADS, generate
+from parsing.expressions.block_expression import LazyStatement, StatementList
+from parsing.expressions.declare_expression import SetExpression
+from parsing.expressions.select_expression import SelectExpression
+from parsing.keywords import Keyword
+from parsing.parser import Parser
+from parsing.tokenizer import Tokenizer
+from tests.utilities import parse
+
+
+def lazy(sql: str, recover: bool=False):
+    return Parser(Tokenizer(sql).parse(), recover=recover, lazy=True).parse()
+
+
+def parsed(block) -> int:
+    return sum(isinstance(entry, LazyStatement) and entry.expression is not None
+        for entry in list.__iter__(block.expressions))
+
+
+class TestLazyParse(unittest.TestCase):
+
+    def test_matches_eager_parse(self):
+        for workload in WORKLOADS:
+            with self.subTest(workload=workload):
+                sql = generate(workload, 50)
+                self.assertEqual(parse(sql).uppercase(), lazy(sql).uppercase())
+
+    def test_statements_are_parsed_when_read(self):
+        block = lazy("set @a = 1\nselect a from t x;\nset @b = 2\n")
+        self.assertIsInstance(block.expressions, StatementList)
+        self.assertEqual(0, parsed(block))
+        self.assertIsInstance(block.expressions[1], SelectExpression)
+        self.assertEqual(1, parsed(block))
+        self.assertIs(block.expressions[1], block.expressions[1])
+
+    def test_statements_of_a_kind(self):
+        block = lazy("set @a = 1\nselect a from t x;\nset @b = 2\nselect b from t x\n")
+        selects = list(block.statements(Keyword.SELECT))
+        self.assertEqual(2, len(selects))
+        self.assertTrue(all(isinstance(select, SelectExpression) for select in selects))
+        self.assertEqual(2, parsed(block))
+        self.assertEqual(4, len(list(block.statements())))
+
+    def test_statements_of_an_eager_block(self):
+        block = parse("set @a = 1;\nselect a from t x;\nset @b = 2\n")
+        self.assertEqual([SetExpression, SetExpression], [type(s) for s in block.statements(Keyword.SET)])
+
+    def test_nested_statements(self):
+        """IF, WHILE and BEGIN ... END are one statement each, with whatever they hold."""
+        sql = (
+            "if @a = 1 set @b = 2 else if @a = 2 set @b = 3 else set @b = 4\n"
+            "while @a > 0 begin set @a = @a - 1 if @a = 3 begin select a from t x end end\n"
+            "declare c cursor for select a from t x\n"
+            "insert into t (a) select b from c y\n"
+            "update t set a = 1 where b = 2\n"
+            "select case when a = 1 then 2 else 3 end x from t x;select c from t x;\n"
+        )
+        block = lazy(sql)
+        self.assertEqual(
+            [Keyword.IF, Keyword.WHILE, Keyword.DECLARE, Keyword.INSERT, Keyword.UPDATE, Keyword.SELECT, Keyword.SELECT],
+            [entry.keyword for entry in list.__iter__(block.expressions) if isinstance(entry, LazyStatement)])
+        self.assertEqual(parse(sql).uppercase(), block.uppercase())
+
+    def test_scan_corrected_by_parse(self):
+        """A statement keyword used as a column name splits the scan; the parse puts it right."""
+        sql = "select a from t x where open = 1\nset @a = 1\n"
+        block = lazy(sql)
+        self.assertEqual(3, sum(isinstance(entry, LazyStatement) for entry in list.__iter__(block.expressions)))
+        self.assertIsInstance(block.expressions[0], SelectExpression)
+        self.assertEqual([SelectExpression, SetExpression], [type(s) for s in block.statements()])
+        self.assertEqual(sql, str(block))
+
+    def test_scan_corrected_out_of_order(self):
+        sql = "select a from t x where open = 1\nset @a = 1\n"
+        block = lazy(sql)
+        self.assertEqual(parse(sql).uppercase(), block.uppercase())
+        block = lazy(sql)
+        self.assertIsInstance(block.expressions[1], SetExpression)
+        self.assertEqual(sql, str(block))
+
+    def test_errors_when_read(self):
+        block = lazy("set @a = 1\nselect from\n")
+        self.assertIsInstance(block.expressions[0], SetExpression)
+        with self.assertRaises(ValueError):
+            block.expressions[1]
+
+    def test_recovery(self):
+        parser = Parser(Tokenizer("set @a = 1\nprint 'a'\nend\nselect a from t x\n").parse(), recover=True, lazy=True)
+        block = parser.parse()
+        self.assertEqual(['SetExpression', 'UnparsedExpression', 'UnparsedExpression', 'SelectExpression'],
+            [type(s).__name__ for s in block.statements()])
+        self.assertEqual(2, len(parser.diagnostics))
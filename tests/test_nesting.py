@@ -0,0 +1,57 @@
+import unittest
+from parsing.expressions.block_expression import BeginEndBlock, IfExpression
+from parsing.expressions.scalar_expression import CaseExpression, ParentheticalScalarExpression
+from parsing.reader import Reader
+from parsing.tokenizer import Tokenizer
+from tests.utilities import parse
+
+
+class TestNesting(unittest.TestCase):
+    """Nesting far deeper than the recursion limit parses and renders."""
+
+    DEPTH = 3000
+
+    def assert_round_trip(self, sql: str):
+        block = parse(sql)
+        self.assertEqual(sql, str(block))
+        self.assertEqual(sql.upper(), block.uppercase().upper())
+        self.assertEqual(sql.lower(), block.lowercase().lower())
+        return block
+
+    def test_parentheses(self):
+        sql = f"select {'(' * self.DEPTH}a + 1{')' * self.DEPTH} as x from t"
+        projection = self.assert_round_trip(sql).expressions[0].projection[0]
+        self.assertIsInstance(projection.expression, ParentheticalScalarExpression)
+
+    def test_case(self):
+        sql = f"select {'case when a = 1 then ' * self.DEPTH}1{' else 2 end' * self.DEPTH} as x from t"
+        projection = self.assert_round_trip(sql).expressions[0].projection[0]
+        self.assertIsInstance(projection.expression, CaseExpression)
+
+    def test_begin_end(self):
+        sql = f"{'begin\n' * self.DEPTH}set @a = 1\n{'end\n' * self.DEPTH}"
+        self.assertIsInstance(self.assert_round_trip(sql).expressions[0], BeginEndBlock)
+
+    def test_if_while(self):
+        sql = f"{'if @a = 1\nwhile @a < 2 begin\n' * self.DEPTH}set @a = 1\n{'end\n' * self.DEPTH}"
+        self.assertIsInstance(self.assert_round_trip(sql).expressions[0], IfExpression)
+
+    def test_not(self):
+        self.assert_round_trip(f"select a from t where {'not ' * self.DEPTH}a = 1")
+
+    def test_error_inside_nesting(self):
+        sql = f"select {'(' * self.DEPTH}a +{')' * self.DEPTH} as x from t"
+        with self.assertRaises(ValueError):
+            parse(sql)
+
+    def test_run_raises_nested_errors_at_the_yield(self):
+        def failing(reader: Reader):
+            reader.expect_word('missing')
+            yield
+        def recovering(reader: Reader):
+            try:
+                yield failing(reader)
+            except Exception:
+                return 'recovered'
+        reader = Reader(Tokenizer('a').parse())
+        self.assertEqual('recovered', reader.run(recovering(reader)))
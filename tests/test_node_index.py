@@ -0,0 +1,82 @@
+import unittest
+from analysis.tracer import Tracer
+from benchmarks.corpus import DEEP_WORKLOADS
+from parsing.expressions.block_expression import BeginEndBlock, BlockExpression, UnparsedExpression
+from parsing.expressions.clause import Clause
+from parsing.expressions.scalar_expression import ScalarExpression, TableIdentifierExpression
+from parsing.expressions.select_expression import SelectExpression
+from parsing.node_index import NodeIndex, normalize
+from parsing.parser import Parser
+from parsing.tokenizer import Tokenizer
+from parsing.update import UpdateExpression
+from parsing.walker import walk
+from tests.utilities import parse
+
+
+def parse_indexed(sql: str, **options):
+    return Parser(Tokenizer(sql).parse(), index=True, **options).parse()
+
+
+class TestNodeIndex(unittest.TestCase):
+
+    SQL = (
+        "select a into #t from [dbo].[Orders] o\n"
+        "if @a = 1\n"
+        "begin\n"
+        "    update dbo.orders set a = 1 where b = 2\n"
+        "    select b into #T from #t x\n"
+        "end\n"
+        "delete from #t where a = 1\n"
+    )
+
+    def test_normalize(self):
+        self.assertEqual('dbo.orders', normalize('[dbo].[Orders]'))
+        self.assertEqual('dbo.orders', normalize('"DBO"."orders"'))
+        self.assertEqual('#t', normalize('#T'))
+
+    def test_off_by_default(self):
+        self.assertIsNone(parse(self.SQL).index)
+
+    def test_nodes_by_type(self):
+        """Lookups match a full walk, nested blocks included, in source order."""
+        block = parse_indexed(self.SQL)
+        self.assertIsInstance(block.index, NodeIndex)
+        for types in (SelectExpression, UpdateExpression, TableIdentifierExpression, ScalarExpression, BlockExpression):
+            with self.subTest(types=types):
+                self.assertEqual(sorted(map(id, walk(block, types))), sorted(map(id, block.index.nodes(types))))
+        for types in (SelectExpression, UpdateExpression, BlockExpression):
+            self.assertEqual(list(walk(block, types)), block.index.nodes(types))
+
+    def test_nested_blocks_share_the_index(self):
+        block = parse_indexed(self.SQL)
+        inner = next(walk(block, BeginEndBlock)).block
+        self.assertIs(block.index, inner.index)
+        self.assertEqual([block, inner], block.index.nodes(BlockExpression))
+        nodes = block.index.nodes(Clause)
+        self.assertEqual(len(nodes), len(set(map(id, nodes))))
+
+    def test_deep_nesting(self):
+        """Each clause is indexed once however deeply blocks nest."""
+        sql = DEEP_WORKLOADS['blocks'](2000)
+        block = parse_indexed(sql)
+        self.assertEqual(sorted(map(id, walk(block))), sorted(map(id, block.index.nodes(Clause))))
+        self.assertEqual(list(walk(block, BlockExpression)), block.index.nodes(BlockExpression))
+
+    def test_table_references(self):
+        block = parse_indexed(self.SQL)
+        orders = block.index.references('dbo.Orders')
+        self.assertEqual(['[dbo].[Orders] ', 'dbo.orders '], [str(table) for table in orders])
+        temp = block.index.references('#t')
+        self.assertEqual([SelectExpression, SelectExpression, TableIdentifierExpression, TableIdentifierExpression], [type(clause) for clause in temp])
+        self.assertEqual([], block.index.references('dbo.Customers'))
+
+    def test_recovered_statements_are_indexed(self):
+        block = parse_indexed("select a from t x\nfoo bar;\nend\nupdate t set a = 1\n", recover=True)
+        self.assertEqual(2, len(block.index.nodes(UnparsedExpression)))
+        self.assertEqual(1, len(block.index.nodes(UpdateExpression)))
+
+    def test_tracer_uses_the_index(self):
+        block = parse_indexed(self.SQL)
+        select = Tracer(block).find_temp_table('#T')
+        self.assertIs(block.index.references('#t')[0], select)
+        self.assertEqual(str(Tracer(parse(self.SQL)).find_temp_table('#T')), str(select))
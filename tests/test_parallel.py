@@ -0,0 +1,88 @@
+from concurrent.futures import ProcessPoolExecutor
+import unittest
+from benchmarks.corpus import DEEP_WORKLOADS
+from parsing.expressions.block_expression import GoExpression
+from parsing.expressions.token_context import TokenContext
+from parsing.parallel import ParallelParser, find_batches, split_batches
+from tests.utilities import parse
+
+
+def shape(node):
+    if isinstance(node, TokenContext):
+        return (node.token.type, node.token.value, node.token.start, str(node))
+    return (type(node).__name__, [shape(child) for child in node.tokens if child is not None])
+
+
+class TestParallelParser(unittest.TestCase):
+
+    SQL = (
+        "use my_database\r\n"
+        "GO\r\n"
+        "declare @id int -- the id\r\n"
+        "set @id = 1\r\n"
+        "  go  -- end of batch\r\n"
+        "select a, 'go' from [go]\r\n"
+        "-- go\r\n"
+        "go\r\n"
+        "insert into #t (a) values (1)\r\n"
+        "select concat(a, b) x from #t t where t.a >= 1\r\n"
+        "go"
+    )
+
+    @classmethod
+    def setUpClass(cls):
+        cls.executor = ProcessPoolExecutor(2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+
+    def test_find_batches(self):
+        self.assertEqual(
+            [self.SQL.index('GO'), self.SQL.index('go  --'), self.SQL.index('go\r\ninsert'), len(self.SQL) - 2],
+            find_batches(self.SQL))
+
+    def test_go_inside_a_line_is_not_a_separator(self):
+        self.assertEqual([], find_batches("select go\nfrom t go\n'\ngo\n'\n[\ngo]\n"))
+
+    def test_segments_cover_the_script(self):
+        for count in (1, 2, 3, 100):
+            with self.subTest(count=count):
+                segments = split_batches(self.SQL, count)
+                self.assertLessEqual(len(segments), max(count, 1))
+                self.assertEqual(self.SQL, ''.join(text for text, _ in segments))
+                for text, offset in segments:
+                    self.assertTrue(self.SQL.startswith(text, offset))
+
+    def test_matches_serial_parse(self):
+        block = ParallelParser(self.SQL, jobs=4, executor=self.executor).parse()
+        self.assertEqual(shape(parse(self.SQL)), shape(block))
+        self.assertEqual(4, sum(isinstance(expression, GoExpression) for expression in block.expressions))
+
+    def test_go_inside_begin_end_falls_back_to_serial(self):
+        sql = "begin\r\nset @a = 1\r\ngo\r\nend\r\n"
+        block = ParallelParser(sql, jobs=4, executor=self.executor).parse()
+        self.assertEqual(shape(parse(sql)), shape(block))
+
+    def test_error_reported_against_whole_script(self):
+        sql = "set @a = 1\r\ngo\r\nselect ~\r\n"
+        with self.assertRaisesRegex(ValueError, 'line 3, column 8'):
+            ParallelParser(sql, jobs=4, executor=self.executor).parse()
+
+    def test_bad_character_in_a_middle_batch(self):
+        """The error is the serial parse's, against the whole script."""
+        sql = "set @a = 1\r\ngo\r\nset @b = 2\r\ngo\r\nset @c = 3\r\ngo\r\nselect @ from t\r\ngo\r\nset @d = 4\r\n"
+        with self.assertRaises(Exception) as serial:
+            parse(sql)
+        with self.assertRaises(type(serial.exception)) as parallel:
+            ParallelParser(sql, jobs=4, executor=self.executor).parse()
+        self.assertEqual(str(serial.exception), str(parallel.exception))
+        self.assertIn('(6, 8)', str(parallel.exception))
+
+    def test_batch_too_deep_to_pickle_is_parsed_here(self):
+        sql = DEEP_WORKLOADS['blocks'](1000) + "\r\ngo\r\nset @a = 1\r\n"
+        block = ParallelParser(sql, jobs=2, executor=self.executor).parse()
+        self.assertEqual(sql, str(block))
+        serial = parse(sql)
+        self.assertEqual([type(expression) for expression in serial.expressions], [type(expression) for expression in block.expressions])
+        self.assertEqual(serial.uppercase(), block.uppercase())
@@ -6,6 +6,7 @@ from parsing.expressions.use_expression import UseExpression
 from parsing.tokenizer import Token, Tokenizer
 import unittest
 from parsing.parser import Parser
+from tests.utilities import keep_keywords
 
 
 class TestParser(unittest.TestCase):
@@ -76,4 +77,50 @@ class TestParser(unittest.TestCase):
         self.assertEqual('description', column.name.token.value)
         self.assertIsInstance(column.datatype, TextDataTypeClause)
         self.assertEqual(column.datatype.datatype.token.value, 'NVARCHAR')
-        self.assertEqual(column.datatype.length.token.value, '100')
\ No newline at end of file
+        self.assertEqual(column.datatype.length.token.value, '100')
+
+    def test_register_statement(self):
+        """PRINT 'done'"""
+        from parsing.expressions import block_expression
+        from parsing.expressions.clause import Clause
+        from parsing.expressions.scalar_expression import ScalarExpression
+        from parsing.keywords import keyword_id
+        def consume_print(reader):
+            return Clause([reader.expect_word('print'), ScalarExpression.consume(reader)])
+        keep_keywords(self)
+        block_expression.register_statement('print', consume_print)
+        self.addCleanup(block_expression.STATEMENTS.pop, keyword_id('print'))
+        parsed_clauses = Parser(self.tokenize("PRINT 'done'\nselect a from t")).parse().expressions
+        self.assertEqual("PRINT 'done'\n", str(parsed_clauses[0]))
+        self.assertEqual('select a from t', str(parsed_clauses[1]))
+
+    def test_register_function(self):
+        """SELECT UPPER(Name) AS Name FROM t"""
+        from parsing.expressions import scalar_expression
+        from parsing.expressions.scalar_expression import ScalarExpression
+        from parsing.keywords import keyword_id
+        def consume_upper(reader):
+            upper = reader.expect_word('upper')
+            tokens, _ = reader.expect_args(ScalarExpression.consume)
+            return ScalarExpression('text', [upper, *tokens])
+        keep_keywords(self)
+        scalar_expression.register_function('upper', consume_upper)
+        self.addCleanup(scalar_expression.FUNCTIONS.pop, keyword_id('upper'))
+        select = Parser(self.tokenize("SELECT UPPER(Name) AS Name FROM t")).parse().expressions[0]
+        self.assertEqual('text', select.projection[0].type)
+        self.assertEqual('SELECT UPPER(Name) AS Name FROM t', str(select))
+
+    def test_nodes_have_no_instance_dict(self):
+        """Every clause, token context and token of a parsed script is slotted."""
+        from benchmarks.corpus import WORKLOADS, generate
+        from parsing.expressions.clause import Clause
+        for workload in WORKLOADS:
+            with self.subTest(workload=workload):
+                stack = [Parser(self.tokenize(generate(workload, 20))).parse()]
+                while stack:
+                    node = stack.pop()
+                    self.assertFalse(hasattr(node, '__dict__'), type(node).__name__)
+                    if isinstance(node, Clause):
+                        stack.extend(token for token in node.tokens if token is not None)
+                    else:
+                        self.assertFalse(hasattr(node.token, '__dict__'))
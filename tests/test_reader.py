@@ -1,7 +1,8 @@
 import unittest
 
 from parsing.reader import Reader
-from parsing.tokenizer import Tokenizer
+from parsing.keywords import Keyword
+from parsing.tokenizer import Token, Tokenizer
 
 
 class TestReader(unittest.TestCase):
@@ -9,4 +10,58 @@ class TestReader(unittest.TestCase):
     def test_expect_from_symbols(self):
         reader = Reader(Tokenizer(">='test'").parse())
         self.assertEqual(reader.consume_symbol_from(['>', '>=']).token.value, '>=')
-        self.assertEqual(reader.curr_value_lower, "'test'")
\ No newline at end of file
+        self.assertEqual(reader.curr_value_lower, "'test'")
+
+    def test_expect_from_split_symbols(self):
+        reader = Reader(Tokenizer("<>1", compound_operators=False).parse())
+        self.assertEqual(reader.consume_symbol_from(['<', '>', '<>']).token.value, '<>')
+        self.assertEqual(reader.curr_value_lower, "1")
+
+    def test_compound_symbol_not_split(self):
+        reader = Reader(Tokenizer("<=1").parse())
+        self.assertIsNone(reader.consume_symbol_from(['<', '=']))
+        self.assertEqual(reader.curr_value_lower, "<=")
+
+    def test_expect_reports_line_and_column(self):
+        tokenizer = Tokenizer("select\n  a")
+        reader = Reader(tokenizer.parse(), tokenizer.lines)
+        reader.expect_word('select')
+        with self.assertRaisesRegex(Exception, 'line 2, column 3'):
+            reader.expect_symbol('(')
+
+    def test_checkpoint_and_restore(self):
+        reader = Reader(Tokenizer("select a from t").parse())
+        checkpoint = reader.checkpoint()
+        reader.expect_word('select')
+        reader.expect_word('a')
+        reader.restore(checkpoint)
+        self.assertEqual(reader.curr_value_lower, 'select')
+
+    def test_peek_skips_trivia(self):
+        reader = Reader(Tokenizer("begin -- comment\n  tran").parse())
+        self.assertEqual(reader.peek(0).value, 'begin')
+        self.assertEqual(reader.peek().value, 'tran')
+        self.assertIsNone(reader.peek(2))
+        self.assertEqual(reader.peek_keyword(), Keyword.TRAN)
+        self.assertEqual(reader.peek_keyword(2), Keyword.NONE)
+        self.assertEqual(reader.curr_value_lower, 'begin')
+
+    def test_at(self):
+        reader = Reader(Tokenizer("in (select 1)").parse())
+        self.assertTrue(reader.at(Token.WORD))
+        self.assertTrue(reader.at(Token.SYMBOL, '(', 1))
+        self.assertFalse(reader.at(Token.SYMBOL, ')', 1))
+        self.assertFalse(reader.at(Token.WORD, k=10))
+
+    def test_match_keywords_and_words(self):
+        reader = Reader(Tokenizer("left join t").parse())
+        self.assertTrue(reader.match_keywords(Keyword.LEFT, Keyword.JOIN))
+        self.assertFalse(reader.match_keywords(Keyword.LEFT, Keyword.OUTER))
+        self.assertTrue(reader.match_words('left', 'join', 't'))
+        self.assertFalse(reader.match_words('left', 'join', 't', 'u'))
+        self.assertEqual(reader.curr_value_lower, 'left')
+
+    def test_optional_words_do_not_consume_partial_match(self):
+        reader = Reader(Tokenizer("left join t").parse())
+        self.assertIsNone(reader.consume_optional_words('left', 'outer'))
+        self.assertEqual(reader.curr_value_lower, 'left')
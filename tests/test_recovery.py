@@ -0,0 +1,73 @@
+import unittest
+from parsing.diagnostics import Diagnostic
+from parsing.expressions.block_expression import GoExpression, UnparsedExpression
+from parsing.expressions.select_expression import SelectExpression
+from parsing.expressions.declare_expression import SetExpression
+from parsing.parser import Parser
+from parsing.tokenizer import Tokenizer
+
+
+def parse(sql: str) -> Parser:
+    tokenizer = Tokenizer(sql)
+    parser = Parser(tokenizer.parse(), tokenizer.lines, recover=True)
+    parser.block = parser.parse()
+    return parser
+
+
+def statements(parser: Parser) -> list:
+    return [type(expression) for expression in parser.block.expressions if type(expression).__name__ != 'Clause']
+
+
+class TestRecovery(unittest.TestCase):
+
+    def test_unknown_statement_is_skipped(self):
+        """An unknown statement becomes opaque and the rest of the script still parses."""
+        sql = "set @a = 1\nprint 'hello'\nselect a from t\n"
+        parser = parse(sql)
+        self.assertEqual([SetExpression, UnparsedExpression, SelectExpression], statements(parser))
+        self.assertEqual(sql, str(parser.block))
+        self.assertEqual(1, len(parser.diagnostics))
+
+    def test_diagnostic_location(self):
+        parser = parse("set @a = 1\n  print 'hello'\n")
+        diagnostic = parser.diagnostics[0]
+        self.assertIsInstance(diagnostic, Diagnostic)
+        self.assertEqual((2, 3), (diagnostic.line, diagnostic.column))
+        self.assertIn('print', diagnostic.context)
+        self.assertTrue(str(diagnostic).startswith('line 2, column 3: '))
+
+    def test_error_inside_a_statement(self):
+        """A statement that fails part way is skipped from its start."""
+        parser = parse("select a from t where (b = 1; set @a = 1\nselect b from t\n")
+        self.assertEqual([UnparsedExpression, SetExpression, SelectExpression], statements(parser))
+        self.assertTrue(str(parser.block.expressions[0]).endswith(';'))
+
+    def test_recovers_at_go(self):
+        parser = parse("print 'a' + 'b'\ngo\nselect b from t\n")
+        self.assertEqual([UnparsedExpression, GoExpression, SelectExpression], statements(parser))
+
+    def test_recovers_at_statement_keyword(self):
+        parser = parse("create view v as select a from t\nselect b from t\n")
+        self.assertEqual([UnparsedExpression, SelectExpression, SelectExpression], statements(parser))
+
+    def test_stray_end(self):
+        sql = "set @a = 1\nend\nset @b = 2\n"
+        parser = parse(sql)
+        self.assertEqual([SetExpression, UnparsedExpression, SetExpression], statements(parser))
+        self.assertEqual(sql, str(parser.block))
+
+    def test_unparsed_statements_render_verbatim(self):
+        parser = parse("print 'Hello'\nselect a from t\n")
+        self.assertEqual("print 'Hello'\nSELECT a FROM t\n", parser.block.uppercase())
+
+    def test_context_is_bounded(self):
+        sql = "set @a = 1\n" * 5000 + "print 'hello'\n" + "set @a = 1\n" * 5000
+        parser = parse(sql)
+        self.assertEqual(1, len(parser.diagnostics))
+        self.assertLessEqual(len(parser.diagnostics[0].context), 200)
+
+    def test_error_message_is_bounded(self):
+        sql = "set @a = 1\n" * 5000 + "print 'hello'\n"
+        with self.assertRaises(ValueError) as raised:
+            Parser(Tokenizer(sql).parse()).parse()
+        self.assertLess(len(str(raised.exception)), 500)
@@ -0,0 +1,99 @@
+import io
+import unittest
+from unittest import mock
+from benchmarks.corpus import DEEP_WORKLOADS, WORKLOADS, generate
+from parsing.expressions.block_expression import UnparsedExpression
+from parsing.expressions.clause import Clause
+from parsing.parser import Parser
+from parsing.tokenizer import Tokenizer
+from tests.utilities import parse
+
+
+class CountingStream(io.StringIO):
+
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+def leaves(clause: Clause, method: str) -> str:
+    # Renders with each leaf's own method, as a reference.
+    parts = []
+    stack = [clause]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Clause) and getattr(type(node), method) is getattr(Clause, method):
+            stack.extend(reversed([token for token in node.tokens if token is not None]))
+        else:
+            parts.append(getattr(node, method)())
+    return ''.join(parts)
+
+
+class TestRender(unittest.TestCase):
+
+    def test_write_matches_rendering(self):
+        """Each casing policy writes what the leaves render, for every workload."""
+        for workload in WORKLOADS:
+            sql = generate(workload, 20)
+            for options in ({}, {'attach_trivia': True}):
+                block = Parser(Tokenizer(sql, **options).parse()).parse()
+                for casing in (Clause.PRESERVE, Clause.UPPERCASE, Clause.LOWERCASE):
+                    with self.subTest(workload=workload, casing=casing, **options):
+                        stream = io.StringIO()
+                        block.write(stream, casing)
+                        self.assertEqual(leaves(block, casing), stream.getvalue())
+                        self.assertEqual(getattr(block, casing)(), stream.getvalue())
+                self.assertEqual(sql, str(block))
+
+    def test_write_defaults_to_the_text_as_written(self):
+        stream = io.StringIO()
+        parse("SELECT a From t x").write(stream)
+        self.assertEqual("SELECT a From t x", stream.getvalue())
+
+    def test_writes_in_chunks(self):
+        block = Parser(Tokenizer(generate('inserts', 50)).parse()).parse()
+        stream = CountingStream()
+        chunk = Clause.CHUNK
+        Clause.CHUNK = 16
+        try:
+            block.write(stream, Clause.UPPERCASE)
+        finally:
+            Clause.CHUNK = chunk
+        self.assertGreater(stream.writes, 1)
+        self.assertEqual(block.uppercase(), stream.getvalue())
+
+    def test_unparsed_statements_are_kept_as_written(self):
+        block = Parser(Tokenizer("select a from t x\nfoo bar;\n").parse(), recover=True).parse()
+        stream = io.StringIO()
+        block.write(stream, Clause.UPPERCASE)
+        self.assertEqual(block.uppercase(), stream.getvalue())
+        self.assertTrue(stream.getvalue().endswith("\nfoo bar;\n"))
+        stream = io.StringIO()
+        unparsed = next(expression for expression in block.expressions if isinstance(expression, UnparsedExpression))
+        unparsed.write(stream, Clause.LOWERCASE)
+        self.assertEqual("foo bar;", stream.getvalue())
+
+    def test_deep_nesting(self):
+        for workload, generate_deep in DEEP_WORKLOADS.items():
+            with self.subTest(workload=workload):
+                block = parse(generate_deep(2000))
+                stream = io.StringIO()
+                block.write(stream, Clause.LOWERCASE)
+                self.assertEqual(block.lowercase(), stream.getvalue())
+
+    def test_errors_name_the_clause(self):
+        """A leaf that fails to render raises, noting the clause it is in."""
+        class Broken:
+            def uppercase(self):
+                raise ValueError('broken')
+        class Statement(Clause):
+            pass
+        with mock.patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            with self.assertRaisesRegex(ValueError, 'broken') as raised:
+                Clause([Statement([Broken()])]).uppercase()
+        self.assertEqual(['While rendering Statement'], raised.exception.__notes__)
+        self.assertEqual('', stdout.getvalue())
@@ -29,6 +29,13 @@ class TestSelect(unittest.TestCase):
         select: SelectExpression = block.expressions[0]
         self.assertIsInstance(select._from.joins[0].table, AliasedTableExpression)
 
+    def test_select_with_left_joins(self):
+        """select Id from Table1 left outer join Table2 on ... left join Table3 on ..."""
+        sql = "select Id from Table1 left outer join Table2 on Table1.Id = Table2.Id left join Table3 on Table1.Id = Table3.Id"
+        block = parse(sql)
+        self.assertEqual(sql, str(block))
+        self.assertEqual(2, len(block.expressions[0]._from.joins))
+
     def test_select_with_join(self):
         """select Id from Table T1 join Table t2"""
         select: SelectExpression = parse(
@@ -42,4 +49,24 @@ class TestSelect(unittest.TestCase):
             """select ID from table1\nselect Name from table2"""
         )
         self.assertIsInstance(block.expressions[0], SelectExpression)
-        self.assertIsInstance(block.expressions[1], SelectExpression)
\ No newline at end of file
+        self.assertIsInstance(block.expressions[1], SelectExpression)
+
+    def test_select_with_group_by_and_order_by(self):
+        """select Region, Amount from Orders o group by Region order by Region desc, Amount"""
+        sql = "select Region, Amount from Orders o group by Region order by Region desc, Amount"
+        block = parse(sql)
+        select: SelectExpression = block.expressions[0]
+        self.assertEqual(sql, str(block))
+        self.assertEqual(1, len(select.groupby.columns))
+        self.assertEqual(['Region ', 'Amount'], [str(column.column) for column in select.orderby.columns])
+        self.assertEqual('DESC', select.orderby.columns[0].asc.uppercase())
+
+    def test_select_top_star(self):
+        """select top 10 * from t"""
+        for sql in ("select top 10 * from t x", "select top (10) * from t x", "select top @n * from t x"):
+            with self.subTest(sql=sql):
+                block = parse(sql)
+                select: SelectExpression = block.expressions[0]
+                self.assertEqual(sql, str(block))
+                self.assertEqual(sql.split(' *')[0][len('select top '):], str(select.top_n).strip())
+                self.assertIsInstance(select._from.table, AliasedTableExpression)
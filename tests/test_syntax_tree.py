@@ -0,0 +1,133 @@
+import unittest
+from benchmarks.corpus import DEEP_WORKLOADS, WORKLOADS, generate
+from parsing.expressions.block_expression import BlockExpression, UnparsedExpression
+from parsing.expressions.clause import Clause
+from parsing.expressions.scalar_expression import BooleanOperationExpression, ColumnIdentifierExpression
+from parsing.expressions.select_expression import SelectExpression
+from parsing.expressions.token_context import TokenContext
+from parsing.parser import Parser
+from parsing.syntax_tree import SyntaxNode, SyntaxTree
+from parsing.tokenizer import Token, Tokenizer
+
+
+def nodes(node: SyntaxNode):
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(reversed(list(node.children)))
+
+
+class TestSyntaxTree(unittest.TestCase):
+
+    SQL = (
+        "-- Orders\n"
+        "declare @id int\n"
+        "select o.Id, o.Amount as Total from dbo.Orders o where o.Amount >= 10 and o.Id = @id;\n"
+        "insert into dbo.Orders (Id, Amount) values (1, 2)\n"
+        "select Id from dbo.Orders o where o.Amount >= 10 order by Id desc\n"
+    )
+
+    def test_renders_like_the_parse_tree(self):
+        """Text and casing read off the token array match the Clause tree, with and without the source."""
+        for workload in WORKLOADS:
+            sql = generate(workload, 20)
+            for options in ({}, {'compound_operators': False}, {'attach_trivia': True}):
+                with self.subTest(workload=workload, **options):
+                    tokens = Tokenizer(sql, **options).parse()
+                    block = Parser(tokens).parse()
+                    for source in (sql, None):
+                        root = SyntaxTree.build(block, tokens, source).root
+                        self.assertEqual(sql, root.text)
+                        self.assertEqual(block.uppercase(), root.uppercase())
+                        self.assertEqual(block.lowercase(), root.lowercase())
+
+    def test_nodes_mirror_clauses(self):
+        """Each node has the kind and text of the clause it was built from."""
+        tokens = Tokenizer(self.SQL).parse()
+        block = Parser(tokens).parse()
+        stack = [(SyntaxTree.build(block, tokens).root, block)]
+        while stack:
+            node, clause = stack.pop()
+            self.assertEqual(str(clause), node.text)
+            if isinstance(clause, Clause):
+                self.assertIs(type(clause), node.kind)
+                children = [child for child in clause.tokens if child is not None]
+                self.assertEqual(len(children), len(list(node.children)))
+                stack.extend(zip(node.children, children))
+            else:
+                self.assertTrue(node.is_token)
+
+    def test_spans_and_parents(self):
+        tree = SyntaxTree.parse(self.SQL)
+        root = tree.root
+        self.assertEqual((0, len(tree.tokens) - 1), root.span)
+        self.assertIsNone(root.parent)
+        for node in nodes(root):
+            for child in node.children:
+                self.assertEqual(node, child.parent)
+                self.assertGreaterEqual(child.first, node.first)
+                self.assertLessEqual(child.last, node.last)
+        comparison = next(node for node in nodes(root) if node.kind is BooleanOperationExpression)
+        self.assertEqual('o.Amount >= 10 and o.Id = @id', comparison.text)
+        self.assertEqual([SelectExpression, BlockExpression], [node.kind for node in comparison.ancestors()])
+        token = next(node for node in nodes(root) if node.is_token and node.token.value == '>=')
+        self.assertEqual(Token.SYMBOL, token.kind)
+        self.assertEqual('>= ', token.text)
+
+    def test_casing_follows_how_tokens_were_read(self):
+        """Identifiers, variables, comments and insert columns keep their case."""
+        root = SyntaxTree.parse(self.SQL).root
+        self.assertEqual(Parser(Tokenizer(self.SQL).parse()).parse().uppercase(), root.uppercase())
+        self.assertIn('-- Orders\nDECLARE @id INT', root.uppercase())
+        self.assertIn('INSERT INTO dbo.Orders (Id, Amount) VALUES', root.uppercase())
+
+    def test_unparsed_statements_are_kept_as_written(self):
+        sql = "select a from t x\nfoo bar;\nset @a = 1\n"
+        tokens = Tokenizer(sql).parse()
+        block = Parser(tokens, recover=True).parse()
+        root = SyntaxTree.build(block, tokens, sql).root
+        self.assertIn(UnparsedExpression, [node.kind for node in root.children])
+        self.assertEqual(block.uppercase(), root.uppercase())
+        self.assertIn('foo bar;', root.uppercase())
+
+    def test_equal_subtrees_have_equal_keys(self):
+        root = SyntaxTree.parse(self.SQL).root
+        # o.Amount >= 10 and o.Id = @id, o.Amount >= 10, o.Id = @id, o.Amount >= 10
+        comparisons = [node for node in nodes(root) if node.kind is BooleanOperationExpression]
+        self.assertNotEqual(comparisons[1].span, comparisons[3].span)
+        self.assertEqual(comparisons[1].key(), comparisons[3].key())
+        self.assertNotEqual(comparisons[1].key(), comparisons[2].key())
+        self.assertEqual(len(comparisons) - 1, len({node.key() for node in comparisons}))
+
+    def test_expression_is_a_typed_view(self):
+        """A node reads its clause back from the token array."""
+        tree = SyntaxTree.parse(self.SQL)
+        for node in nodes(tree.root):
+            with self.subTest(node=node):
+                expression = node.expression()
+                self.assertEqual(node.text, str(expression))
+                if not node.is_token:
+                    self.assertIs(node.kind, type(expression))
+        column = next(node for node in nodes(tree.root) if node.kind is ColumnIdentifierExpression)
+        self.assertEqual('Id', column.expression().column.token.value)
+        declare = next(node for node in nodes(tree.root) if node.is_token and node.token.value == 'declare')
+        self.assertIsInstance(declare.expression(), TokenContext)
+        self.assertIsInstance(next(node for node in nodes(tree.root) if node.is_token).expression(), Token)
+
+    def test_deep_nesting(self):
+        for workload, generate_deep in DEEP_WORKLOADS.items():
+            with self.subTest(workload=workload):
+                sql = generate_deep(2000)
+                tokens = Tokenizer(sql).parse()
+                block = Parser(tokens).parse()
+                root = SyntaxTree.build(block, tokens).root
+                self.assertEqual(sql, root.text)
+                self.assertEqual(block.uppercase(), root.uppercase())
+                self.assertGreater(sum(1 for _ in nodes(root)), 2000)
+
+    def test_tokens_not_in_the_list(self):
+        tokens = Tokenizer("select a from t x").parse()
+        block = Parser(tokens).parse()
+        with self.assertRaises(ValueError):
+            SyntaxTree.build(block, Tokenizer("select a from t x").parse())
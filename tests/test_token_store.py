@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+
+from parsing.parser import Parser
+from parsing.reader import Reader
+from parsing.token_store import TokenStore
+from parsing.tokenizer import Tokenizer
+
+
+class TestTokenStore(unittest.TestCase):
+
+    SQL = "select a, [b c] as x\r\nfrom #t where @v >= 'déjà vu' -- note\ngo"
+
+    def test_materializes_same_tokens(self):
+        store = TokenStore.tokenize(self.SQL)
+        tokens = Tokenizer(self.SQL).parse()
+        self.assertEqual(len(tokens), len(store))
+        self.assertEqual(
+            [(token.type, token.value, token.start) for token in tokens],
+            [(token.type, token.value, token.start) for token in store])
+        self.assertEqual(tokens[-1].value, store[-1].value)
+        self.assertEqual([token.value for token in tokens[2:5]], [token.value for token in store[2:5]])
+
+    def test_parses_same_tree(self):
+        sql = "declare @t as table(id int identity(1, 1))\nset @v = 1\nselect Id from Table T1 join Table t2 on T1.Id = T2.Id"
+        expected = Parser(Tokenizer(sql).parse()).parse()
+        parsed = Parser(TokenStore.tokenize(sql)).parse()
+        self.assertEqual(str(expected), str(parsed))
+        self.assertEqual(expected.uppercase(), parsed.uppercase())
+        self.assertEqual(
+            [expression.__class__ for expression in expected.expressions],
+            [expression.__class__ for expression in parsed.expressions])
+
+    def test_reader_reports_location(self):
+        store = TokenStore.tokenize("select\n  a")
+        reader = Reader(store, store.lines)
+        reader.expect_word('select')
+        with self.assertRaisesRegex(Exception, 'line 2, column 3'):
+            reader.expect_symbol('(')
+
+    def test_open_memory_maps_file(self):
+        with tempfile.NamedTemporaryFile('wb', suffix='.sql', delete=False) as f:
+            f.write(self.SQL.encode('utf-8'))
+        try:
+            store = TokenStore.open(f.name, chunk_size=7)
+            self.assertEqual(self.SQL, ''.join(map(str, store)))
+            self.assertEqual("'déjà vu'", [token.value for token in store if token.value.startswith("'")][0])
+            self.assertIs(store.lines, store.lines)
+            # Columns count bytes: the comment follows 'déjà vu', two letters of
+            # which are two bytes long.
+            comment = next(token for token in store if token.value.startswith('--'))
+            self.assertEqual((1, 32), store.lines.line_and_column(comment.start))
+            store.source.close()
+        finally:
+            os.unlink(f.name)
@@ -1,5 +1,7 @@
 import unittest
-from parsing.tokenizer import Token, Tokenizer
+from parsing.keywords import Keyword, register_keyword
+from parsing.tokenizer import LineIndex, Token, Tokenizer
+from tests.utilities import keep_keywords
 
 class TestTokenizer(unittest.TestCase):
 
@@ -31,9 +33,190 @@ class TestTokenizer(unittest.TestCase):
             Token(Token.SYMBOL, ')')
         ], tokens)
 
+    def test_compound_operators(self):
+        sql = "a<>b>=c!=d<=e!<f!>g<h>i=!j"
+        symbols = [token.value for token in Tokenizer(sql).parse() if token.type == Token.SYMBOL]
+        self.assertEqual(['<>', '>=', '!=', '<=', '!<', '!>', '<', '>', '=', '!'], symbols)
+        split = [token.value for token in Tokenizer(sql, compound_operators=False).parse() if token.type == Token.SYMBOL]
+        self.assertEqual(list('<>>=!=<=!<!><>=!'), split)
+
+    def test_token_offsets(self):
+        sql = "select a,\n  [b]"
+        tokens = Tokenizer(sql).parse()
+        self.assertEqual([0, 6, 7, 8, 9, 10, 12], [token.start for token in tokens])
+        for token in tokens:
+            self.assertEqual(token.value, sql[token.start:token.start + len(token.value)])
+
+    def test_words_are_lowered_and_classified(self):
+        select, _, column, _, variable = Tokenizer("SeLeCt MyCol @Var").parse()
+        self.assertEqual('select', select.lower)
+        self.assertEqual(Keyword.SELECT, select.keyword)
+        self.assertIs(Tokenizer("select").parse()[0].lower, select.lower)
+        self.assertEqual('mycol', column.lower)
+        self.assertEqual(Keyword.NONE, column.keyword)
+        self.assertEqual('@var', variable.lower)
+        self.assertEqual(Keyword.NONE, variable.keyword)
+
+    def test_registered_keyword(self):
+        keep_keywords(self)
+        keyword = register_keyword('DateDiff')
+        self.assertEqual(keyword, Tokenizer("DATEDIFF").parse()[0].keyword)
+        self.assertEqual(keyword, register_keyword('datediff'))
+
+    def test_line_index(self):
+        lines = LineIndex("ab\r\ncd\nef\rg")
+        self.assertEqual([0, 4, 7, 10], lines.starts)
+        self.assertEqual((0, 1), lines.line_and_column(1))
+        self.assertEqual((1, 0), lines.line_and_column(4))
+        self.assertEqual((3, 0), lines.line_and_column(10))
+
+    def test_error_position(self):
+        with self.assertRaisesRegex(ValueError, 'line 2, column 3'):
+            Tokenizer("select\n  ~").parse()
+        with self.assertRaisesRegex(ValueError, 'Unterminated quoted identifier at line 1, column 8'):
+            Tokenizer("select 'abc").parse()
+
+    def test_scan_reads_any_text(self):
+        """Scanning keeps going where parse would raise, and loses no text."""
+        sql = "select ~x /* a\n*/ % y 'abc"
+        tokens = list(Tokenizer(sql).scan())
+        self.assertEqual(sql, ''.join(token.value for token in tokens))
+        self.assert_tokens_equal([
+            Token(Token.WORD, 'select'),
+            Token(Token.WHITESPACE, ' '),
+            Token(Token.SYMBOL, '~'),
+            Token(Token.WORD, 'x'),
+            Token(Token.WHITESPACE, ' '),
+            Token(Token.COMMENT, '/* a\n*/'),
+            Token(Token.WHITESPACE, ' '),
+            Token(Token.SYMBOL, '%'),
+            Token(Token.WHITESPACE, ' '),
+            Token(Token.WORD, 'y'),
+            Token(Token.WHITESPACE, ' '),
+            Token(Token.QUOTED_IDENTIFIER, "'abc"),
+        ], tokens)
+        self.assertEqual([0, 7, 10], [tokens[0].start, tokens[2].start, tokens[5].start])
+        sql = "select a from t x"
+        self.assert_tokens_equal(Tokenizer(sql).parse(), list(Tokenizer(sql).scan()))
+
     def assert_tokens_equal(self, expected, found):
         self.assertEqual(len(expected), len(found), f"Incorrect number of tokens. Expected {expected}, found {found}")
 
         for expected_token, found_token in zip(expected, found):
             self.assertEqual(expected_token.type, found_token.type)
-            self.assertEqual(expected_token.value, found_token.value)
\ No newline at end of file
+            self.assertEqual(expected_token.value, found_token.value)
+
+class TestRegexTokenizer(unittest.TestCase):
+
+    EDGE_CASES = [
+        "select 1\r\n\n\rgo\r",
+        "  \n\t-- comment\r\n-1 - -2",
+        "a>=b <> c != d !< e",
+        "1.5 2. 3.x.4",
+        "@@fetch_status @var #temp [quoted id] 'string' \"dq\" `bt`",
+        "café été x² 1² ²3",
+        "　select from",
+        "'unterminated",
+        "@@@x",
+        "select ]",
+        "select ~",
+    ]
+
+    def corpus(self) -> list[str]:
+        import ast
+        import pathlib
+        samples = list(self.EDGE_CASES)
+        for path in sorted(pathlib.Path(__file__).parent.glob('test_*.py')):
+            for node in ast.walk(ast.parse(path.read_text())):
+                if isinstance(node, ast.Constant) and isinstance(node.value, str):
+                    samples.append(node.value)
+        return samples
+
+    def tokenize(self, sql: str, regex: bool, compound_operators: bool=True):
+        try:
+            tokenizer = Tokenizer(sql, regex=regex, compound_operators=compound_operators)
+            return [(token.type, token.value, token.start, token.lower, token.keyword) for token in tokenizer.parse()]
+        except Exception as e:
+            return type(e)
+
+    def test_engines_are_equivalent(self):
+        for sql in self.corpus():
+            for compound_operators in (True, False):
+                with self.subTest(sql=sql, compound_operators=compound_operators):
+                    self.assertEqual(
+                        self.tokenize(sql, False, compound_operators),
+                        self.tokenize(sql, True, compound_operators))
+
+    def test_regex_engine_round_trips(self):
+        sql = "select a, [b]  -- note\r\nfrom #t where @x >= 1.5\n"
+        self.assertEqual(sql, ''.join(map(str, Tokenizer(sql, regex=True).parse())))
+
+
+class TestStreamingTokenizer(unittest.TestCase):
+
+    SQL = "select [quoted id], 'a long string'\r\n  -- a comment\r\nfrom #t where @@x >= 12.5\n\r@v <> 1\r"
+
+    def stream(self, sql: str, chunk_size: int, regex: bool=True):
+        import io
+        return [(token.type, token.value, token.start)
+            for token in Tokenizer.iter_tokens(io.StringIO(sql), chunk_size, regex=regex)]
+
+    def test_matches_parse_at_every_chunk_size(self):
+        expected = [(token.type, token.value, token.start) for token in Tokenizer(self.SQL).parse()]
+        for chunk_size in range(1, len(self.SQL) + 2):
+            for regex in (True, False):
+                with self.subTest(chunk_size=chunk_size, regex=regex):
+                    self.assertEqual(expected, self.stream(self.SQL, chunk_size, regex))
+
+    def test_error_reports_absolute_line(self):
+        sql = "select 1\r\nselect 2\r\nselect ~"
+        for chunk_size in (1, 4, 100):
+            with self.subTest(chunk_size=chunk_size):
+                with self.assertRaisesRegex(ValueError, 'line 3, column 8'):
+                    self.stream(sql, chunk_size)
+
+    def test_unterminated_string_at_end(self):
+        with self.assertRaisesRegex(ValueError, 'Unterminated quoted identifier at line 1, column 8'):
+            self.stream("select 'abc", 3)
+
+
+class TestAttachedTrivia(unittest.TestCase):
+
+    SQL = "-- header\r\nselect a,  b -- trailing\nfrom t where x <  = 1\n"
+
+    def test_only_significant_tokens(self):
+        tokens = Tokenizer(self.SQL, attach_trivia=True).parse()
+        self.assertEqual(
+            ['select', 'a', ',', 'b', 'from', 't', 'where', 'x', '<', '=', '1'],
+            [token.value for token in tokens])
+        self.assertEqual(['-- header', '\r', '\n'], [token.value for token in tokens[0].leading])
+        self.assertEqual([' ', '-- trailing', '\n'], [token.value for token in tokens[3].trailing])
+
+    def test_round_trip(self):
+        tokens = Tokenizer(self.SQL, attach_trivia=True).parse()
+        self.assertEqual(self.SQL, ''.join(map(str, tokens)))
+
+    def test_trivia_only_script(self):
+        sql = "  -- nothing here\n"
+        self.assertEqual(sql, ''.join(map(str, Tokenizer(sql, attach_trivia=True).parse())))
+
+    def test_strip(self):
+        token = Tokenizer(self.SQL, attach_trivia=True).parse()[0]
+        self.assertEqual('select', str(token.strip()))
+        self.assertEqual(3, len(token.leading))
+
+    def test_streaming_matches_parse(self):
+        import io
+        expected = [str(token) for token in Tokenizer(self.SQL, attach_trivia=True).parse()]
+        for chunk_size in (1, 7, 100):
+            with self.subTest(chunk_size=chunk_size):
+                tokens = Tokenizer.iter_tokens(io.StringIO(self.SQL), chunk_size, attach_trivia=True)
+                self.assertEqual(expected, [str(token) for token in tokens])
+
+    def test_parse_renders_losslessly(self):
+        from parsing.parser import Parser
+        sql = "-- header\nselect a,  b -- trailing\nfrom t where x >= 1"
+        tokenizer = Tokenizer(sql, attach_trivia=True)
+        block = Parser(tokenizer.parse(), tokenizer.lines).parse()
+        self.assertEqual(sql, str(block))
+        self.assertEqual("-- header\nSELECT a,  b -- trailing\nFROM t WHERE x >= 1", block.uppercase())
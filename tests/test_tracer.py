@@ -4,6 +4,7 @@ from analysis.tracer import Node, Tracer, BinaryOperationNode, LiteralNode
 from parsing.expressions.scalar_expression import NumberLiteralExpression, ScalarExpression, TableIdentifierExpression
 from parsing.expressions.select_expression import SelectExpression
 from parsing.expressions.token_context import TokenContext
+from parsing.parser import Parser
 from parsing.tokenizer import Token, Tokenizer
 from tests.utilities import parse, read
 
@@ -20,6 +21,24 @@ class TestTracer(unittest.TestCase):
         self.assertIsInstance(node, NumberLiteralExpression)
         self.assertEqual(node.number.token.value, '1')
 
+    def test_trace_lazy_block(self):
+        """Only the SELECTs of a lazily parsed block are parsed to trace it."""
+        block = Parser(Tokenizer("declare @a int\nset @a = 1\nselect 1 as Col1 from Table1").parse(), lazy=True).parse()
+        node = Tracer(block).trace("Col1")
+        self.assertIsInstance(node, NumberLiteralExpression)
+        self.assertEqual([None, None], [entry.expression for entry in list.__iter__(block.expressions)][:2])
+
+    def test_find_temp_table(self):
+        """SELECT ... INTO a temp table is found inside blocks, and the first one wins."""
+        block = parse(
+            "select a into #other from t x\n"
+            "if @a = 1\nbegin\nselect a, b into #t from t x\nend\n"
+            "select c into #T from u y\n"
+        )
+        select = Tracer(block).find_temp_table('#T')
+        self.assertEqual('select a, b into #t from t x\n', str(select))
+        self.assertIsNone(Tracer(block).find_temp_table('#missing'))
+
 class TestUnaryOperationNode(unittest.TestCase):
     """Test cases for UnaryOperationNode."""
 
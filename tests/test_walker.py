@@ -0,0 +1,100 @@
+import unittest
+from parsing.expressions.block_expression import BeginEndBlock
+from parsing.expressions.clause import Clause
+from parsing.expressions.scalar_expression import ColumnIdentifierExpression, ScalarExpression
+from parsing.expressions.select_expression import SelectExpression
+from parsing.expressions.token_context import TokenContext
+from parsing.walker import POST, Visitor, find, walk
+from tests.utilities import parse
+
+
+class TestWalker(unittest.TestCase):
+
+    SQL = (
+        "select a, b from t x where a = 1\n"
+        "if @a = 1\n"
+        "begin\n"
+        "    select c from dbo.u y\n"
+        "end\n"
+        "else\n"
+        "    select top 1 d from v z\n"
+    )
+
+    def test_pre_order(self):
+        block = parse(self.SQL)
+        nodes = list(walk(block))
+        self.assertIs(block, nodes[0])
+        self.assertTrue(all(isinstance(node, Clause) for node in nodes))
+        selects = [str(node).split()[1] for node in walk(block, SelectExpression)]
+        self.assertEqual(['a,', 'c', 'top'], selects)
+        self.assertLess(nodes.index(block.expressions[1]), nodes.index(block.expressions[1].conditional_expression))
+
+    def test_post_order(self):
+        block = parse(self.SQL)
+        nodes = list(walk(block, order=POST))
+        self.assertIs(block, nodes[-1])
+        self.assertEqual(sorted(map(id, walk(block))), sorted(map(id, nodes)))
+        if_expression = block.expressions[1]
+        self.assertLess(nodes.index(if_expression.conditional_expression), nodes.index(if_expression))
+
+    def test_tokens_and_none(self):
+        """Tokens are only yielded when asked for; empty slots never are."""
+        block = parse("select a from t x")
+        tokens = list(walk(block, TokenContext, tokens=True))
+        self.assertEqual(['select', 'a', 'from', 't', 'x'], [token.token.value for token in tokens])
+        self.assertNotIn(None, list(walk(block, tokens=True)))
+
+    def test_prune(self):
+        block = parse(self.SQL)
+        columns = list(walk(block, ColumnIdentifierExpression, prune=lambda node: isinstance(node, BeginEndBlock)))
+        self.assertNotIn('c ', [str(column) for column in columns])
+        self.assertIn('d ', [str(column) for column in columns])
+
+    def test_find_stops_early(self):
+        visited = []
+        def predicate(select):
+            visited.append(select)
+            return True
+        block = parse(self.SQL)
+        self.assertIs(block.expressions[0], find(block, SelectExpression, predicate))
+        self.assertEqual(1, len(visited))
+        self.assertIsNone(find(block, SelectExpression, lambda select: select.into is not None))
+
+    def test_deep_nesting(self):
+        sql = f"select {'(' * 3000}1{')' * 3000} as x from t y"
+        self.assertEqual(1, sum(1 for _ in walk(parse(sql), SelectExpression)))
+
+
+class TestVisitor(unittest.TestCase):
+
+    def test_dispatch(self):
+        """Methods are looked up by class, then by base class, then generic_visit."""
+        class Tables(Visitor):
+            def __init__(self):
+                self.tables = []
+                self.scalars = 0
+            def visit_TableIdentifierExpression(self, node):
+                self.tables.append(str(node).strip())
+            def visit_ScalarExpression(self, node):
+                self.scalars += 1
+
+        visitor = Tables()
+        visitor.visit(parse(TestWalker.SQL))
+        self.assertEqual(['t', 'dbo.u', 'v'], visitor.tables)
+        self.assertEqual(sum(1 for _ in walk(parse(TestWalker.SQL), ScalarExpression)), visitor.scalars)
+
+    def test_skip_and_stop(self):
+        class Selects(Visitor):
+            def __init__(self):
+                self.selects = []
+            def visit_SelectExpression(self, node):
+                self.selects.append(node)
+                return Visitor.STOP if len(self.selects) == 2 else None
+            def visit_FromExpression(self, node):
+                return Visitor.SKIP
+            def visit_TableIdentifierExpression(self, node):
+                raise AssertionError('skipped')
+
+        visitor = Selects()
+        visitor.visit(parse(TestWalker.SQL))
+        self.assertEqual(2, len(visitor.selects))
@@ -1,5 +1,7 @@
+import unittest
 from parsing.expressions.block_expression import BlockExpression
 from parsing.expressions.clause import Clause
+from parsing.keywords import KEYWORD_IDS, _words
 from parsing.parser import Parser
 from parsing.reader import Reader
 from parsing.tokenizer import Tokenizer
@@ -9,4 +11,13 @@ def parse(sql: str) -> BlockExpression:
     return Parser(Tokenizer(sql).parse()).parse()
 
 def read(sql: str) -> Reader:
-    return Reader(Tokenizer(sql).parse())
\ No newline at end of file
+    return Reader(Tokenizer(sql).parse())
+
+def keep_keywords(test: unittest.TestCase):
+    # Forgets, once the test is done, the keywords it registers.
+    keywords = dict(KEYWORD_IDS)
+    def restore():
+        KEYWORD_IDS.clear()
+        KEYWORD_IDS.update(keywords)
+        _words.clear()
+    test.addCleanup(restore)